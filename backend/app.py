@@ -743,6 +743,9 @@ from routes.freelancer_routes import freelancer_bp
 from routes.recruiter_routes import recruiter_bp
 from routes.job_routes import jobs_bp
 from routes.notification_routes import notifications_bp
+from routes.debug_routes import debug_bp
+from routes.taxonomy_routes import taxonomy_bp
+from database import counters, db_config, migrate, percolator, search_index, suggest
 
 mail = Mail()
 
@@ -762,9 +765,17 @@ def create_app():
     app.config['MAIL_DEFAULT_SENDER'] = os.getenv('FROM_EMAIL', 'noreply@freelancehub.com')
     app.config['FROM_EMAIL'] = os.getenv('FROM_EMAIL')
 
-    CORS(app, origins=['http://localhost:3000'], supports_credentials=True)
+    CORS(app, origins=['http://localhost:3000'], supports_credentials=True,
+         expose_headers=[db_config.WROTE_AT_HEADER])
 
     mail.init_app(app)
+    # Fail fast instead of serving 500s from tables that do not exist yet
+    migrate.check_schema()
+    db_config.init_app(app)
+    counters.init_app(app)
+    search_index.init_app(app)
+    percolator.init_app(app)
+    suggest.init_app(app)
 
     # Initialize global email service
     with app.app_context():
@@ -781,13 +792,17 @@ def create_app():
     app.register_blueprint(recruiter_bp)
     app.register_blueprint(jobs_bp)
     app.register_blueprint(notifications_bp)
+    app.register_blueprint(taxonomy_bp)
+    app.register_blueprint(debug_bp)
 
     @app.route('/api/health')
     def health():
         return jsonify({
             'success': True,
             'status': 'healthy',
-            'blueprints': list(app.blueprints.keys())
+            'blueprints': list(app.blueprints.keys()),
+            'db_pool': db_config.get_pool().stats(),
+            'db_replicas': db_config.get_replicas().stats()
         })
 
     @app.route('/api/routes', methods=['GET'])
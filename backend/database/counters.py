@@ -0,0 +1,453 @@
+"""Counters for hot rows.
+
+BufferedCounter (write-behind): increments such as jobs.views_count are kept
+in memory and written in batches by a background thread, so the request path
+does no writes and a popular row is updated once per flush instead of once
+per hit.
+
+ShardedCounter: transactional counters such as jobs.applications_count are
+spread over slot rows in job_counter_slots, so concurrent writers to one job
+lock different rows. The value is the base column plus the sum of the slots;
+a background task folds slots into the base column and periodically resets it
+from COUNT(*) of the source table to correct any drift.
+
+ShardedColumns: the same for a set of columns of a per-user row, such as a
+recruiter's application counters in user_stats, which every applicant to any
+of the recruiter's jobs would otherwise lock. Slot rows live in a side table
+and are folded in by the same background task; UserStats.rebuild resets the
+row and its slots together.
+
+    python -m database.counters rollup
+    python -m database.counters reconcile
+"""
+import os
+import sys
+import time
+import random
+import atexit
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from database.db_config import get_pool
+
+FLUSH_INTERVAL = float(os.getenv('COUNTER_FLUSH_INTERVAL', 5))
+FLUSH_MAX_PENDING = int(os.getenv('COUNTER_FLUSH_MAX_PENDING', 1000))
+FLUSH_BATCH_SIZE = 500
+
+COUNTER_SLOTS = int(os.getenv('COUNTER_SLOTS', 8))
+ROLLUP_INTERVAL = float(os.getenv('COUNTER_ROLLUP_INTERVAL', 30))
+RECONCILE_INTERVAL = float(os.getenv('COUNTER_RECONCILE_INTERVAL', 600))
+MAINTENANCE_LOCK = 'freelancer_portal_counter_maintenance'
+
+
+class BufferedCounter:
+    """Per-row increments of table.column, flushed as one UPDATE per batch"""
+
+    def __init__(self, table, column, interval=FLUSH_INTERVAL, max_pending=FLUSH_MAX_PENDING):
+        self.table = table
+        self.column = column
+        self.interval = interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = Counter()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._suspended = 0
+
+    @contextmanager
+    def suspended(self):
+        """Ignore add() inside the block, e.g. for tools that must not write"""
+        with self._lock:
+            self._suspended += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._suspended -= 1
+
+    def add(self, row_id, n=1):
+        with self._lock:
+            if self._suspended:
+                return
+            self._pending[row_id] += n
+            full = len(self._pending) >= self.max_pending
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def pending(self, row_id):
+        """Increments not yet written for row_id"""
+        with self._lock:
+            return self._pending.get(row_id, 0)
+
+    def _ensure_thread(self):
+        # Threads do not survive fork; each worker process starts its own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'flush-{self.table}-{self.column}', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything pending; failed batches are put back for the next flush"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            if not pending:
+                return 0
+            items = sorted(pending.items())
+            written = 0
+            conn = None
+            try:
+                conn = get_pool().connection()
+                cur = conn.cursor()
+                try:
+                    for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                        batch = items[start:start + FLUSH_BATCH_SIZE]
+                        cases = ' '.join(['WHEN %s THEN %s'] * len(batch))
+                        placeholders = ','.join(['%s'] * len(batch))
+                        params = [v for item in batch for v in item] + [row_id for row_id, _ in batch]
+                        cur.execute(f"""
+                            UPDATE {self.table}
+                            SET {self.column} = {self.column} + CASE id {cases} ELSE 0 END
+                            WHERE id IN ({placeholders})
+                        """, params)
+                        conn.commit()
+                        written += len(batch)
+                finally:
+                    cur.close()
+            except Exception as e:
+                print(f"❌ Failed to flush {self.table}.{self.column}: {e}")
+                with self._lock:
+                    self._pending.update(dict(items[written:]))
+            finally:
+                if conn is not None:
+                    conn.close()
+            return written
+
+
+class ShardedCounter:
+    """jobs.<column> plus per-job slot rows named `name` in job_counter_slots"""
+
+    def __init__(self, name, column, source_table, source_key, slots=COUNTER_SLOTS):
+        self.name = name
+        self.column = column
+        self.source_table = source_table
+        self.source_key = source_key
+        self.slots = slots
+
+    def add(self, cur, job_id, n=1):
+        """Add n in the caller's transaction, on a random slot"""
+        cur.execute("""
+            INSERT INTO job_counter_slots (job_id, counter, slot, delta)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE delta = delta + VALUES(delta)
+        """, (job_id, self.name, random.randrange(self.slots), n))
+
+    def pending(self, cur, job_ids):
+        """{job_id: sum of slots} for the given jobs, in one query"""
+        if not job_ids:
+            return {}
+        placeholders = ','.join(['%s'] * len(job_ids))
+        cur.execute(f"""
+            SELECT job_id, SUM(delta) AS delta FROM job_counter_slots
+            WHERE job_id IN ({placeholders}) AND counter = %s
+            GROUP BY job_id
+        """, list(job_ids) + [self.name])
+        return {row['job_id']: int(row['delta']) for row in cur.fetchall()}
+
+    def attach(self, cur, jobs):
+        """Add unrolled slot values to each job's column"""
+        pending = self.pending(cur, [job['id'] for job in jobs])
+        for job in jobs:
+            job[self.column] = (job.get(self.column) or 0) + pending.get(job['id'], 0)
+        return jobs
+
+    def _lock_batch(self, cur, job_ids):
+        # Lock the jobs rows before the slots: writers take a shared lock on
+        # the job (foreign key check) before their slot, so this order cannot
+        # deadlock with them.
+        placeholders = ','.join(['%s'] * len(job_ids))
+        cur.execute(f"SELECT id FROM jobs WHERE id IN ({placeholders}) FOR UPDATE", job_ids)
+        locked = [row['id'] for row in cur.fetchall()]
+        if not locked:
+            return [], {}
+        placeholders = ','.join(['%s'] * len(locked))
+        cur.execute(f"""
+            SELECT job_id, SUM(delta) AS delta FROM job_counter_slots
+            WHERE job_id IN ({placeholders}) AND counter = %s
+            GROUP BY job_id
+            FOR UPDATE
+        """, locked + [self.name])
+        return locked, {row['job_id']: int(row['delta']) for row in cur.fetchall()}
+
+    def _clear_slots(self, cur, job_ids):
+        placeholders = ','.join(['%s'] * len(job_ids))
+        cur.execute(f"""
+            DELETE FROM job_counter_slots WHERE job_id IN ({placeholders}) AND counter = %s
+        """, list(job_ids) + [self.name])
+
+    def _set_column(self, cur, values, relative):
+        items = sorted(values.items())
+        cases = ' '.join(['WHEN %s THEN %s'] * len(items))
+        placeholders = ','.join(['%s'] * len(items))
+        value = f"{self.column} + CASE id {cases} END" if relative else f"CASE id {cases} END"
+        cur.execute(f"UPDATE jobs SET {self.column} = {value} WHERE id IN ({placeholders})",
+                    [v for item in items for v in item] + [job_id for job_id, _ in items])
+
+    def rollup(self, conn, batch_size=FLUSH_BATCH_SIZE):
+        """Fold slot rows into the base column; returns the number of jobs touched"""
+        cur = conn.cursor()
+        done = 0
+        try:
+            cur.execute("SELECT DISTINCT job_id FROM job_counter_slots WHERE counter = %s", (self.name,))
+            job_ids = sorted(row['job_id'] for row in cur.fetchall())
+            for start in range(0, len(job_ids), batch_size):
+                locked, deltas = self._lock_batch(cur, job_ids[start:start + batch_size])
+                deltas = {job_id: delta for job_id, delta in deltas.items() if delta}
+                if deltas:
+                    self._set_column(cur, deltas, relative=True)
+                if locked:
+                    self._clear_slots(cur, locked)
+                conn.commit()
+                done += len(deltas)
+            return done
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def reconcile(self, conn, batch_size=FLUSH_BATCH_SIZE):
+        """Reset the base column to COUNT(*) of the source and clear the slots;
+        returns the number of jobs whose value had drifted"""
+        cur = conn.cursor()
+        fixed = 0
+        try:
+            cur.execute("SELECT id FROM jobs ORDER BY id")
+            job_ids = [row['id'] for row in cur.fetchall()]
+            conn.commit()
+            for start in range(0, len(job_ids), batch_size):
+                locked, deltas = self._lock_batch(cur, job_ids[start:start + batch_size])
+                if not locked:
+                    conn.commit()
+                    continue
+                placeholders = ','.join(['%s'] * len(locked))
+                cur.execute(f"SELECT id, {self.column} AS value FROM jobs WHERE id IN ({placeholders})", locked)
+                current = {row['id']: (row['value'] or 0) + deltas.get(row['id'], 0) for row in cur.fetchall()}
+                # Writers need the jobs lock before touching a slot, so the
+                # source count and the slots we hold describe the same state.
+                cur.execute(f"""
+                    SELECT {self.source_key} AS job_id, COUNT(*) AS total FROM {self.source_table}
+                    WHERE {self.source_key} IN ({placeholders})
+                    GROUP BY {self.source_key}
+                """, locked)
+                actual = {row['job_id']: row['total'] for row in cur.fetchall()}
+                drifted = [job_id for job_id in locked if current.get(job_id, 0) != actual.get(job_id, 0)]
+                for job_id in drifted:
+                    print(f"⚠️ {self.name} for job {job_id} drifted: {current.get(job_id, 0)} != {actual.get(job_id, 0)}")
+                # Only touch jobs that drifted or have slots to fold in
+                reset = {job_id: actual.get(job_id, 0) for job_id in locked if job_id in deltas or job_id in drifted}
+                if reset:
+                    self._set_column(cur, reset, relative=False)
+                if deltas:
+                    self._clear_slots(cur, list(deltas))
+                conn.commit()
+                fixed += len(drifted)
+            return fixed
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+
+class ShardedColumns:
+    """Columns of table, keyed by key, plus slot rows in slot_table"""
+
+    def __init__(self, name, table, slot_table, key, columns, slots=COUNTER_SLOTS):
+        self.name = name
+        self.table = table
+        self.slot_table = slot_table
+        self.key = key
+        self.columns = tuple(columns)
+        self.slots = slots
+
+    def _check(self, columns):
+        unknown = [c for c in columns if c not in self.columns]
+        if unknown:
+            raise ValueError(f"Not a {self.name} counter: {', '.join(unknown)}")
+
+    def add(self, cur, key_sql, params, deltas):
+        """Add deltas (column=+n/-n) in the caller's transaction, on a random
+        slot of the row whose key key_sql selects (as its only column)"""
+        deltas = {c: d for c, d in deltas.items() if d}
+        if not deltas:
+            return
+        columns = list(deltas)
+        self._check(columns)
+        updates = ', '.join(f"{self.slot_table}.{c} = {self.slot_table}.{c} + VALUES({c})" for c in columns)
+        cur.execute(f"""
+            INSERT INTO {self.slot_table} ({self.key}, slot, {', '.join(columns)})
+            SELECT k.{self.key}, %s, {', '.join(['%s'] * len(columns))}
+            FROM ({key_sql}) AS k
+            ON DUPLICATE KEY UPDATE {updates}
+        """, [random.randrange(self.slots)] + [deltas[c] for c in columns] + list(params))
+
+    def pending(self, cur, keys):
+        """{key: {column: sum of slots}} for the given keys, in one query"""
+        if not keys:
+            return {}
+        placeholders = ','.join(['%s'] * len(keys))
+        sums = ', '.join(f"SUM({c}) AS {c}" for c in self.columns)
+        cur.execute(f"""
+            SELECT {self.key} AS row_key, {sums} FROM {self.slot_table}
+            WHERE {self.key} IN ({placeholders})
+            GROUP BY {self.key}
+        """, list(keys))
+        return {row['row_key']: {c: int(row[c] or 0) for c in self.columns} for row in cur.fetchall()}
+
+    def clear(self, cur, keys):
+        """Drop the slots of keys, after their row was reset from the source tables"""
+        if not keys:
+            return
+        placeholders = ','.join(['%s'] * len(keys))
+        cur.execute(f"DELETE FROM {self.slot_table} WHERE {self.key} IN ({placeholders})", list(keys))
+
+    def rollup(self, conn, batch_size=FLUSH_BATCH_SIZE):
+        """Fold slot rows into the base row; returns the number of rows touched"""
+        cur = conn.cursor()
+        done = 0
+        try:
+            cur.execute(f"SELECT DISTINCT {self.key} AS row_key FROM {self.slot_table}")
+            keys = sorted(row['row_key'] for row in cur.fetchall())
+            conn.commit()
+            sums = ', '.join(f"SUM({c}) AS {c}" for c in self.columns)
+            updates = ', '.join(f"{self.table}.{c} = {self.table}.{c} + VALUES({c})" for c in self.columns)
+            for start in range(0, len(keys), batch_size):
+                batch = keys[start:start + batch_size]
+                placeholders = ','.join(['%s'] * len(batch))
+                # Writers only ever lock one slot row, never the base row
+                # after it, so locking slots and then base rows cannot deadlock.
+                cur.execute(f"""
+                    SELECT {self.key} AS row_key, {sums} FROM {self.slot_table}
+                    WHERE {self.key} IN ({placeholders})
+                    GROUP BY {self.key}
+                    FOR UPDATE
+                """, batch)
+                rows = [[row['row_key']] + [int(row[c] or 0) for c in self.columns] for row in cur.fetchall()]
+                if rows:
+                    cur.executemany(f"""
+                        INSERT INTO {self.table} ({self.key}, {', '.join(self.columns)})
+                        VALUES ({', '.join(['%s'] * (len(self.columns) + 1))})
+                        ON DUPLICATE KEY UPDATE {updates}
+                    """, rows)
+                    self.clear(cur, [row[0] for row in rows])
+                conn.commit()
+                done += len(rows)
+            return done
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+
+job_views = BufferedCounter('jobs', 'views_count')
+job_applications = ShardedCounter('applications', 'applications_count', 'job_applications', 'job_id')
+SHARDED_COUNTERS = [job_applications]
+# A recruiter's application counters in user_stats (see UserStats.add_application)
+recruiter_applications = ShardedColumns('recruiter_applications', 'user_stats', 'user_stats_slots', 'user_id', (
+    'applications_total', 'applications_applied', 'applications_reviewed',
+    'applications_shortlisted', 'applications_accepted', 'applications_rejected'))
+SHARDED_COLUMNS = [recruiter_applications]
+
+
+@atexit.register
+def _flush_on_exit():
+    job_views.flush()
+
+
+# ==================== Background maintenance ====================
+def run_maintenance(reconcile=False):
+    """Roll up (or fully reconcile) every sharded counter, once across all processes"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK(%s, 0) AS got", (MAINTENANCE_LOCK,))
+        if not cur.fetchone()['got']:
+            return None
+        try:
+            result = {c.name: (c.reconcile(conn) if reconcile else c.rollup(conn)) for c in SHARDED_COUNTERS}
+            # Their reconcile is UserStats.rebuild (python -m database.reconcile_stats)
+            result.update((c.name, c.rollup(conn)) for c in SHARDED_COLUMNS)
+            return result
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (MAINTENANCE_LOCK,))
+    finally:
+        cur.close()
+        conn.close()
+
+
+class _Maintenance:
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='counter-maintenance', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_reconcile = time.monotonic() + RECONCILE_INTERVAL
+        while True:
+            time.sleep(ROLLUP_INTERVAL)
+            reconcile = time.monotonic() >= next_reconcile
+            if reconcile:
+                next_reconcile = time.monotonic() + RECONCILE_INTERVAL
+            try:
+                run_maintenance(reconcile=reconcile)
+            except Exception as e:
+                print(f"❌ Counter maintenance failed: {e}")
+
+
+_maintenance = _Maintenance()
+
+
+def init_app(app):
+    if os.getenv('COUNTER_MAINTENANCE', 'true').lower() == 'true':
+        _maintenance.start()
+
+
+def main(argv):
+    command = argv[0] if argv else 'rollup'
+    if command not in ('rollup', 'reconcile'):
+        print(__doc__)
+        return 1
+    result = run_maintenance(reconcile=command == 'reconcile')
+    if result is None:
+        print("⚠️ Counter maintenance is already running elsewhere")
+        return 1
+    job_views.flush()
+    print(f"✅ {command}: {result}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,30 +1,157 @@
 import os
+import time
+import threading
 import pymysql
 import pymysql.cursors
 from dotenv import load_dotenv
+from flask import g, has_request_context, request
+from database.pool import ConnectionPool
+from database.replicas import Replica, ReplicaSet, in_read_only_call, parse_replica_dsn
+from database import session as db_session
+from database import instrumentation
 
 load_dotenv()
 
+_pool = None
+_replicas = None
+_pool_lock = threading.Lock()
+
+# Time of the client's last write, handed out after each request that
+# committed and sent back by the client so that any worker keeps its reads
+# on the primary while replicas may not have that write yet
+WROTE_AT_HEADER = 'X-DB-Wrote-At'
+
+# Per pool (the primary's and each replica's); utils/executor sizes the
+# fan-out workers from these
+POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+
+def _connect_kwargs():
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'database': os.getenv('DB_NAME', 'freelancer_portal'),
+        'cursorclass': pymysql.cursors.DictCursor,
+        'charset': 'utf8mb4',
+        'autocommit': False
+    }
+
+def _make_pool(connect_kwargs):
+    pool = ConnectionPool(
+        connect_kwargs,
+        min_size=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+        max_size=POOL_MAX_SIZE,
+        timeout=POOL_TIMEOUT,
+        ping_after=float(os.getenv('DB_POOL_PING_AFTER', 30)),
+        max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+        cursor_wrapper=instrumentation.InstrumentedCursor
+        if os.getenv('DB_INSTRUMENTATION', 'true').lower() == 'true' else None
+    )
+    pool.prefill()
+    return pool
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _make_pool(_connect_kwargs())
+    return _pool
+
+def get_replicas():
+    """Return the ReplicaSet built from DB_REPLICAS (comma-separated DSNs or host[:port])"""
+    global _replicas
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                dsns = [d.strip() for d in os.getenv('DB_REPLICAS', '').split(',') if d.strip()]
+                replicas = []
+                for dsn in dsns:
+                    kwargs = parse_replica_dsn(dsn, _connect_kwargs())
+                    replicas.append(Replica(
+                        f"{kwargs['host']}:{kwargs['port']}",
+                        _make_pool(kwargs),
+                        max_lag=float(os.getenv('DB_REPLICA_MAX_LAG', 5)),
+                        check_interval=float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', 10))
+                    ))
+                _replicas = ReplicaSet(replicas, sticky_seconds=float(os.getenv('DB_REPLICA_STICKY_SECONDS', 5)))
+    return _replicas
+
+def _current_user_id():
+    return getattr(request, 'user_id', None) if has_request_context() else None
+
+def _client_wrote_at():
+    if not has_request_context():
+        return None
+    try:
+        return float(request.headers[WROTE_AT_HEADER])
+    except (KeyError, ValueError):
+        return None
+
+def _replica_connection(session):
+    """Pick a replica for a @read_only call, or None to stay on the primary"""
+    if not in_read_only_call():
+        return None
+    # Read-your-writes: once this request (or, recently, this user) has
+    # written, or while a transaction is open, everything goes to the primary.
+    if session.depth or session.wrote:
+        return None
+    replicas = get_replicas()
+    if not replicas or replicas.is_sticky(_current_user_id(), _client_wrote_at()):
+        return None
+    if session.replica_conn is not None:
+        return session.replica_connection(None)
+    replica = replicas.pick()
+    if replica is None:
+        return None
+    try:
+        return session.replica_connection(replica)
+    except Exception as e:
+        replica.mark_failed(e)
+        print(f"⚠️ Falling back to primary: {e}")
+        return None
+
 def get_db_connection():
-    """Create and return database connection"""
+    """Return a database connection.
+
+    Inside a Flask app context every caller shares the request's connection
+    (see database/session.py), and methods marked @read_only are routed to a
+    healthy read replica when DB_REPLICAS is configured; elsewhere a
+    connection is checked out of the primary pool and close() returns it.
+    """
     try:
-        connection = pymysql.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'freelancer_portal'),
-            cursorclass=pymysql.cursors.DictCursor,
-            charset='utf8mb4',
-            autocommit=False
-        )
-        return connection
+        session = db_session.current_session()
+        if session is not None:
+            return _replica_connection(session) or session.connection(get_pool)
+        return get_pool().connection()
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         raise e
 
+def init_app(app):
+    """Bind per-request connections, replica stickiness and SQL instrumentation to the Flask app"""
+    db_session.init_app(app)
+    instrumentation.init_app(app)
+
+    @app.after_request
+    def stamp_write(response):
+        session = g.get('_db_session')
+        if session is not None and session.wrote:
+            response.headers[WROTE_AT_HEADER] = f"{time.time():.3f}"
+        return response
+
+    @app.teardown_request
+    def remember_writer(exc):
+        session = g.get('_db_session')
+        if session is not None and session.wrote:
+            get_replicas().remember_write(_current_user_id())
+
 def init_database():
-    """Initialize database and create all tables"""
-    connection = get_db_connection()
+    """Initialize database, create the base tables and apply pending migrations"""
+    connection = get_pool().connection()
     cursor = connection.cursor()
     
     # Create Skills table
@@ -258,4 +385,8 @@ def init_database():
     connection.commit()
     cursor.close()
     connection.close()
+
+    # Everything after the base tables is versioned in database/migrations
+    from database.migrate import migrate
+    migrate()
     print("✅ Database initialized successfully!")
\ No newline at end of file
@@ -0,0 +1,436 @@
+"""EXPLAIN every statement the models and routes can emit and flag bad plans.
+
+    python -m database.explain_advisor [--init] [--seed JOBS] [--force] [--json]
+                                       [--fail-on full_scan,filesort,temporary]
+
+The advisor drives every model method, every Job.search filter combination,
+and the GET /api/jobs variants inside one transaction that is rolled back at
+the end, so it is safe to point at a database with data in it. It records
+each distinct statement (by fingerprint), runs EXPLAIN on it and reports
+full table scans, filesorts and temporary tables, with an index suggestion
+for each one.
+
+--seed fills an empty database with synthetic rows first, so the optimizer
+sees realistic cardinalities. Seeded rows are committed; use a scratch
+database.
+"""
+import os
+import re
+import sys
+import json
+import random
+import argparse
+from itertools import combinations
+from datetime import datetime, timedelta
+
+SKILLS = ['Python', 'Django', 'Flask', 'JavaScript', 'React', 'Vue', 'Node.js', 'SQL', 'MySQL',
+          'PostgreSQL', 'AWS', 'Docker', 'Kubernetes', 'Go', 'Rust', 'Java', 'Spring', 'PHP',
+          'Laravel', 'Ruby', 'Rails', 'TypeScript', 'GraphQL', 'Redis', 'Figma', 'SEO', 'Swift',
+          'Kotlin', 'Flutter', 'Machine Learning']
+TECH_STACKS = ['MERN', 'LAMP', 'Django + React', 'Flask + Vue', 'Spring Boot', 'Rails', '.NET',
+               'Serverless', 'JAMstack', 'Android', 'iOS']
+LEVELS = ['junior', 'mid', 'senior']
+JOB_TYPES = ['full-time', 'part-time', 'contract', 'freelance']
+WORDS = ['backend', 'frontend', 'api', 'developer', 'engineer', 'dashboard', 'mobile', 'data',
+         'platform', 'migration', 'payments', 'search', 'design', 'cloud', 'startup', 'ecommerce']
+
+SEARCH_FILTERS = {
+    'search': 'developer',
+    'experience_level': 'senior',
+    'min_pay': 20,
+    'max_pay': 120,
+    'job_type': 'contract',
+    'is_remote': True,
+    'skills': ['Python', 'Go'],
+    'tech_stack': ['MERN'],
+}
+# skills / tech_stack combinations are also run with each of these
+LINK_MATCHES = ('all', 'any')
+ROUTE_FILTERS = {
+    'search': 'developer',
+    'experience_level': 'mid',
+    'min_pay': '20',
+    'max_pay': '120',
+    'job_type': 'freelance',
+    'is_remote': 'true',
+    'skills': 'Python,Go',
+    'tech_stack': 'MERN',
+    'facets': 'true',
+}
+
+ISSUE_TYPES = ('full_scan', 'filesort', 'temporary')
+
+
+# ==================== Seeding ====================
+def seed(cur, jobs_count, rng):
+    cur.execute("SELECT COUNT(*) AS count FROM jobs")
+    if cur.fetchone()['count']:
+        raise RuntimeError("jobs table is not empty; refusing to seed (use --force to seed anyway)")
+    _seed(cur, jobs_count, rng)
+
+
+def _seed(cur, jobs_count, rng):
+    now = datetime.now()
+    recruiters = max(5, jobs_count // 20)
+    freelancers = max(20, jobs_count // 2)
+
+    cur.executemany("INSERT IGNORE INTO skills (name) VALUES (%s)", [(s,) for s in SKILLS])
+    cur.executemany("INSERT IGNORE INTO tech_stacks (name) VALUES (%s)", [(t,) for t in TECH_STACKS])
+    cur.execute("SELECT id FROM skills")
+    skill_ids = [r['id'] for r in cur.fetchall()]
+    cur.execute("SELECT id FROM tech_stacks")
+    tech_ids = [r['id'] for r in cur.fetchall()]
+
+    tag = rng.randrange(10 ** 9)
+    users = []
+    for i in range(recruiters + freelancers):
+        user_type = 'recruiter' if i < recruiters else 'freelancer'
+        users.append((f"seed{tag}_{i}", f"seed{tag}_{i}@example.com", 'x', 'Seed', f"User{i}",
+                      user_type, True, now - timedelta(days=rng.randrange(700))))
+    cur.executemany("""
+        INSERT INTO users (username, email, password_hash, first_name, last_name, user_type, is_verified, date_joined)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, users)
+    cur.execute("SELECT id, user_type FROM users WHERE username LIKE %s", (f"seed{tag}_%",))
+    rows = cur.fetchall()
+    recruiter_ids = [r['id'] for r in rows if r['user_type'] == 'recruiter']
+    freelancer_ids = [r['id'] for r in rows if r['user_type'] == 'freelancer']
+
+    cur.executemany("INSERT INTO recruiter_profiles (user_id, company_name) VALUES (%s, %s)",
+                    [(uid, f"Company {uid}") for uid in recruiter_ids])
+    cur.executemany("""
+        INSERT INTO freelancer_profiles (user_id, bio, hourly_rate, years_of_experience)
+        VALUES (%s, %s, %s, %s)
+    """, [(uid, 'Seeded freelancer', rng.randrange(10, 150), rng.randrange(15)) for uid in freelancer_ids])
+    cur.execute("SELECT id, user_id FROM recruiter_profiles")
+    recruiter_profile = {r['user_id']: r['id'] for r in cur.fetchall()}
+    cur.execute("SELECT id, user_id FROM freelancer_profiles")
+    freelancer_profile = {r['user_id']: r['id'] for r in cur.fetchall()}
+
+    cur.executemany("""
+        INSERT IGNORE INTO freelancer_skills (freelancer_profile_id, skill_id, proficiency_level)
+        VALUES (%s, %s, %s)
+    """, [(freelancer_profile[uid], sid, rng.choice(['beginner', 'intermediate', 'advanced', 'expert']))
+          for uid in freelancer_ids for sid in rng.sample(skill_ids, 4)])
+
+    jobs = []
+    for i in range(jobs_count):
+        recruiter_id = rng.choice(recruiter_ids)
+        title = ' '.join(rng.sample(WORDS, 3)).title()
+        jobs.append((recruiter_id, recruiter_profile[recruiter_id], title,
+                     ' '.join(rng.choice(WORDS) for _ in range(40)), rng.randrange(10, 200),
+                     rng.choice(LEVELS), rng.choice(JOB_TYPES), rng.random() < 0.7,
+                     ' '.join(rng.choice(WORDS) for _ in range(15)), rng.random() < 0.8,
+                     now - timedelta(minutes=rng.randrange(500000))))
+    cur.executemany("""
+        INSERT INTO jobs (recruiter_id, recruiter_profile_id, title, description, pay_per_hour,
+                          experience_level, job_type, is_remote, requirements, is_active, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, jobs)
+    cur.execute("SELECT id FROM jobs")
+    job_ids = [r['id'] for r in cur.fetchall()]
+
+    cur.executemany("INSERT IGNORE INTO job_skills (job_id, skill_id) VALUES (%s, %s)",
+                    [(jid, sid) for jid in job_ids for sid in rng.sample(skill_ids, 3)])
+    cur.executemany("INSERT IGNORE INTO job_tech_stacks (job_id, tech_stack_id) VALUES (%s, %s)",
+                    [(jid, tid) for jid in job_ids for tid in rng.sample(tech_ids, 1)])
+
+    applications = set()
+    for _ in range(jobs_count * 3):
+        applications.add((rng.choice(job_ids), rng.choice(freelancer_ids)))
+    cur.executemany("""
+        INSERT IGNORE INTO job_applications (job_id, freelancer_id, freelancer_profile_id, cover_letter, status, applied_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, [(jid, uid, freelancer_profile[uid], 'Seeded', rng.choice(['applied', 'reviewed', 'shortlisted', 'accepted', 'rejected']),
+           now - timedelta(minutes=rng.randrange(200000))) for jid, uid in applications])
+
+    cur.executemany("""
+        INSERT INTO notifications (user_id, title, message, notification_type, is_read, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, [(rng.choice(recruiter_ids + freelancer_ids), 'Seeded', 'Seeded notification', 'system',
+           rng.random() < 0.6, now - timedelta(minutes=rng.randrange(200000))) for _ in range(jobs_count * 4)])
+
+    for table in ('users', 'recruiter_profiles', 'freelancer_profiles', 'freelancer_skills', 'jobs',
+                  'job_skills', 'job_tech_stacks', 'job_applications', 'notifications'):
+        cur.execute(f"ANALYZE TABLE {table}")
+        cur.fetchall()
+
+
+# ==================== Catalog ====================
+def _sample_ids(cur):
+    cur.execute("""
+        SELECT j.id AS job_id, j.recruiter_id, ja.id AS application_id, ja.freelancer_id
+        FROM job_applications ja JOIN jobs j ON ja.job_id = j.id
+        ORDER BY ja.id LIMIT 1
+    """)
+    row = cur.fetchone()
+    if not row:
+        raise RuntimeError("No applications found; run with --seed on an empty database")
+    cur.execute("SELECT id FROM notifications WHERE user_id = %s LIMIT 1", (row['freelancer_id'],))
+    notification = cur.fetchone()
+    row['notification_id'] = notification['id'] if notification else 0
+    cur.execute("SELECT email FROM users WHERE id = %s", (row['freelancer_id'],))
+    row['freelancer_email'] = cur.fetchone()['email']
+    return row
+
+
+def run_catalog(app, ids):
+    """Call every model method and list route once (or once per filter combination)"""
+    from database.models import User, FreelancerProfile, RecruiterProfile, Job, JobApplication, Notification
+    from utils.auth_utils import generate_token
+
+    fid, rid = ids['freelancer_id'], ids['recruiter_id']
+    job_id, app_id = ids['job_id'], ids['application_id']
+
+    User.find_by_email(ids['freelancer_email'])
+    User.find_by_id(fid)
+    FreelancerProfile.get_by_user_id(fid)
+    FreelancerProfile.get_stats(fid)
+    FreelancerProfile.update(fid, {'bio': 'advisor', 'skills': ['Python', 'Go'],
+                                   'tech_stacks': [{'name': 'MERN', 'experience_years': 2}]})
+    RecruiterProfile.get_by_user_id(rid)
+    RecruiterProfile.get_stats(rid)
+    RecruiterProfile.update(rid, {'company_name': 'Advisor Inc'})
+
+    new_job_id = Job.create(rid, {'title': 'Advisor job', 'description': 'advisor', 'pay_per_hour': 50,
+                                  'experience_level': 'mid', 'required_skills': ['Python', 'Advisor skill'],
+                                  'tech_stack': ['MERN']})
+    Job.get_by_id(job_id)
+    Job.get_by_recruiter(rid)
+    Job.get_recent_by_recruiter(rid)
+    Job.get_recommended_for_freelancer(fid)
+    keys = list(SEARCH_FILTERS)
+    for size in range(len(keys) + 1):
+        for combo in combinations(keys, size):
+            filters = {k: SEARCH_FILTERS[k] for k in combo}
+            # facets=True adds the Job.facets() statements for the same filters
+            Job.search(filters, facets=True)
+            if 'skills' in filters or 'tech_stack' in filters:
+                for match in LINK_MATCHES[1:]:
+                    Job.search(dict(filters, skills_match=match, tech_match=match), facets=True)
+    Job.update(job_id, rid, {'title': 'Advisor title'})
+    Job.toggle_active(job_id, rid)
+    Job.toggle_active(job_id, rid)
+
+    JobApplication.get_by_id(app_id)
+    JobApplication.get_by_freelancer(fid)
+    JobApplication.get_recent_by_freelancer(fid)
+    JobApplication.get_by_job(job_id)
+    JobApplication.get_by_job_and_freelancer(job_id, fid)
+    JobApplication.get_recent_for_recruiter(rid)
+    JobApplication.get_by_job_ids([job_id, new_job_id or job_id])
+    JobApplication.update_status(app_id, 'reviewed', 'advisor')
+    if new_job_id:
+        JobApplication.create(new_job_id, fid, {'cover_letter': 'advisor'})
+
+    Notification.create(fid, 'Advisor', 'advisor', 'system')
+    Notification.get_by_user(fid)
+    Notification.get_by_user(fid, unread_only=True)
+    Notification.get_unread_count(fid)
+    Notification.mark_as_read(ids['notification_id'], fid)
+    Notification.mark_all_as_read(fid)
+
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {generate_token(fid, 'freelancer')}"}
+    route_keys = list(ROUTE_FILTERS)
+    for size in range(len(route_keys) + 1):
+        for combo in combinations(route_keys, size):
+            client.get('/api/jobs', query_string={k: ROUTE_FILTERS[k] for k in combo})
+    for match in LINK_MATCHES:
+        client.get('/api/jobs', query_string=dict(ROUTE_FILTERS, skills_match=match, tech_match=match))
+    client.get(f'/api/jobs/{job_id}')
+    client.get('/api/freelancer/dashboard', headers=headers)
+    client.get('/api/freelancer/jobs/search', headers=headers, query_string={'search': 'developer'})
+
+    JobApplication.withdraw(app_id, fid)
+    if new_job_id:
+        Job.delete(new_job_id)
+
+
+# ==================== Analysis ====================
+_ALIASES = re.compile(r'\b(?:FROM|JOIN|UPDATE)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|INNER\b|SET\b|ORDER\b|GROUP\b|LIMIT\b)(\w+))?', re.I)
+_ORDER_BY = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|$)', re.I | re.S)
+_EXPLAINABLE = re.compile(r'^\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE)\b', re.I)
+
+
+_WHERE = re.compile(r'\bWHERE\b(.+?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)', re.I | re.S)
+_ON = re.compile(r'\bON\b(.+?)(?:\b(?:LEFT|RIGHT|INNER)?\s*JOIN\b|\bWHERE\b|\bGROUP\b|\bORDER\b|$)', re.I | re.S)
+_PREDICATE = r'`?(\w+)`?\s*(=|IN\b|<=|>=|<|>|LIKE\b|BETWEEN\b)\s*(\w+\.\w+)?'
+
+
+def _columns_for(sql, table):
+    """Guess (equality, range, order) columns that touch `table` in `sql`"""
+    aliases = {table}
+    tables = _ALIASES.findall(sql)
+    for name, alias in tables:
+        if name == table and alias:
+            aliases.add(alias)
+    qualifier = '|'.join(re.escape(a) for a in aliases)
+    if len(tables) == 1:
+        prefix = rf'(?:\b(?:{qualifier})\.|(?<![\w.]))'
+    else:
+        prefix = rf'\b(?:{qualifier})\.'
+
+    def predicates(text, joins):
+        found = []
+        for col, op, other in re.findall(prefix + _PREDICATE, text, re.I):
+            # In WHERE, column-to-column comparisons are joins, not filters
+            if (other and not joins) or col.upper() in ('AND', 'OR', 'NOT'):
+                continue
+            found.append((col, op.upper()))
+        return found
+
+    match = _WHERE.search(sql)
+    found = predicates(match.group(1), False) if match else []
+    if not found:
+        for on_clause in _ON.findall(sql):
+            found += predicates(on_clause, True)
+    equality, ranges, order = [], [], []
+    for col, op in found:
+        target = equality if op in ('=', 'IN') else ranges
+        if col not in equality and col not in ranges:
+            target.append(col)
+    match = _ORDER_BY.search(sql)
+    if match:
+        for col in re.findall(prefix + r'`?(\w+)`?', match.group(1)):
+            if col.upper() not in ('ASC', 'DESC') and col not in order:
+                order.append(col)
+    return equality, ranges, order
+
+
+def suggest_index(sql, table):
+    equality, ranges, order = _columns_for(sql, table)
+    columns = list(equality)
+    # One range column can follow the equalities; otherwise the ORDER BY
+    # columns can, which removes the filesort.
+    if order and not ranges:
+        columns += [c for c in order if c not in columns]
+    elif ranges:
+        columns.append(ranges[0])
+    if not columns:
+        return None
+    return f"ALTER TABLE {table} ADD INDEX idx_{table}_{'_'.join(columns)} ({', '.join(columns)})"
+
+
+def explain(cur, sql, params, min_rows=100):
+    cur.execute("EXPLAIN " + sql, params)
+    plan = cur.fetchall()
+    issues = []
+    for row in plan:
+        table = row.get('table') or ''
+        extra = row.get('Extra') or ''
+        rows = row.get('rows') or 0
+        real_table = not table.startswith('<')
+        if row.get('type') == 'ALL' and rows >= min_rows and real_table:
+            issues.append({'type': 'full_scan', 'table': table, 'rows': rows,
+                           'suggestion': suggest_index(sql, table)})
+        if 'Using filesort' in extra:
+            issues.append({'type': 'filesort', 'table': table, 'rows': rows,
+                           'suggestion': suggest_index(sql, table) if real_table else None})
+        if 'Using temporary' in extra:
+            issues.append({'type': 'temporary', 'table': table, 'rows': rows, 'suggestion': None})
+    return plan, issues
+
+
+def collect(app, ids):
+    """Run the catalog and return {fingerprint: (sql, params)} for explainable statements"""
+    from database import instrumentation
+
+    statements = {}
+
+    def listener(fp, sql, params, ms, rows):
+        if fp not in statements and _EXPLAINABLE.match(sql) and not re.match(r'^\s*INSERT\b(?![\s\S]*\bSELECT\b)', sql, re.I):
+            statements[fp] = (sql, params)
+
+    instrumentation.listeners.append(listener)
+    try:
+        run_catalog(app, ids)
+    finally:
+        instrumentation.listeners.remove(listener)
+    return statements
+
+
+class _Rollback(Exception):
+    pass
+
+
+def advise(app, min_rows=100):
+    from database.counters import job_views
+    from database.db_config import get_db_connection
+    from database.session import transaction
+
+    report = []
+    # View counts are written outside the transaction by a background flush,
+    # so the job detail route's increment would survive the rollback
+    with app.app_context(), job_views.suspended():
+        try:
+            with transaction():
+                conn = get_db_connection()
+                cur = conn.cursor()
+                statements = collect(app, _sample_ids(cur))
+                for fp, (sql, params) in statements.items():
+                    try:
+                        plan, issues = explain(cur, sql, params, min_rows)
+                        report.append({'fingerprint': fp, 'issues': issues, 'plan': plan})
+                    except Exception as e:
+                        report.append({'fingerprint': fp, 'issues': [], 'error': str(e)})
+                raise _Rollback()
+        except _Rollback:
+            pass
+    return report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--init', action='store_true', help='create tables and apply migrations first')
+    parser.add_argument('--seed', type=int, metavar='JOBS', help='seed an empty database with JOBS synthetic jobs')
+    parser.add_argument('--force', action='store_true', help='seed even if the database already has jobs')
+    parser.add_argument('--min-rows', type=int, default=100, help='ignore full scans estimated below this many rows')
+    parser.add_argument('--fail-on', default='', help=f"comma-separated issue types that make the exit code 1 ({', '.join(ISSUE_TYPES)})")
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    # Every Job.search has to reach SQL to be explained, not the in-memory
+    # index, and the background threads would only add noise to the capture
+    for flag in ('JOB_SEARCH_INDEX', 'JOB_ALERTS', 'COUNTER_MAINTENANCE', 'TAXONOMY_SUGGEST_REFRESH'):
+        os.environ[flag] = 'false'
+    from app import create_app
+    from database.db_config import init_database, get_pool
+
+    if args.init:
+        init_database()
+    if args.seed:
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            rng = random.Random(42)
+            (_seed if args.force else seed)(cur, args.seed, rng)
+            conn.commit()
+            print(f"🌱 Seeded {args.seed} jobs")
+        finally:
+            cur.close()
+            conn.close()
+
+    report = advise(create_app(), args.min_rows)
+    fail_on = {t.strip() for t in args.fail_on.split(',') if t.strip()}
+    failing = [entry for entry in report if any(i['type'] in fail_on for i in entry['issues'])]
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        flagged = [entry for entry in report if entry['issues'] or entry.get('error')]
+        print(f"🔎 Explained {len(report)} distinct statements, {len(flagged)} with findings\n")
+        for entry in flagged:
+            print(entry['fingerprint'])
+            if entry.get('error'):
+                print(f"   ❌ EXPLAIN failed: {entry['error']}")
+            for issue in entry['issues']:
+                print(f"   ⚠️ {issue['type']} on {issue['table']} (~{issue['rows']} rows)")
+                if issue['suggestion']:
+                    print(f"      💡 {issue['suggestion']}")
+            print()
+    return 1 if failing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
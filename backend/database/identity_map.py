@@ -0,0 +1,87 @@
+"""Per-request identity map for single-row lookups.
+
+Job.get_by_id, User.find_by_id and JobApplication.get_by_id look here first,
+so within one request each row is read from the database at most once. The
+map lives on flask.g and goes away with the app context; calls made outside
+an app context (scripts, fan_out workers without a request) always hit the
+database. Model writes call forget() for what they change, and any rollback
+clears the whole map since rows read inside the failed transaction may show
+writes that never happened.
+"""
+import copy
+from functools import wraps
+from flask import g, has_app_context
+from database import loader
+
+
+def _entries():
+    if not has_app_context():
+        return None
+    entries = g.get('_identity_map')
+    if entries is None:
+        entries = g._identity_map = {}
+    return entries
+
+
+def mapped(kind):
+    """Cache a single-key getter's rows under (kind, key) for the request.
+
+    Callers get their own copy of the row, so a route that adds fields to it
+    does not change what the next lookup returns. Misses (None) are not
+    remembered.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(key):
+            entries = _entries()
+            if entries is None:
+                return f(key)
+            row = entries.get((kind, key))
+            if row is None:
+                row = f(key)
+                if row is None:
+                    return None
+                entries[(kind, key)] = row
+            return copy.deepcopy(row)
+        return decorated
+    return decorator
+
+
+def get_many(kind, keys):
+    """({key: row} already in the map, [keys still to load]); rows are copies"""
+    entries = _entries() or {}
+    found, missing = {}, []
+    for key in dict.fromkeys(keys):
+        row = entries.get((kind, key))
+        if row is None:
+            missing.append(key)
+        else:
+            found[key] = copy.deepcopy(row)
+    return found, missing
+
+
+def remember(kind, key, row):
+    """Seed the map with a row loaded some other way"""
+    entries = _entries()
+    if entries is not None and row is not None:
+        entries[(kind, key)] = copy.deepcopy(row)
+
+
+def forget(kind, key=None):
+    """Drop one row, or every row of a kind when key is None"""
+    # Loaders hold rows of every kind, some embedding others; start them over
+    loader.clear()
+    entries = _entries()
+    if not entries:
+        return
+    if key is not None:
+        entries.pop((kind, key), None)
+        return
+    for entry in [entry for entry in entries if entry[0] == kind]:
+        del entries[entry]
+
+
+def clear():
+    if has_app_context():
+        g.pop('_identity_map', None)
+    loader.clear()
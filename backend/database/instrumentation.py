@@ -0,0 +1,155 @@
+import os
+import re
+import time
+import threading
+from collections import Counter
+from functools import lru_cache
+from flask import g, has_app_context, request
+
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 200))
+N_PLUS_ONE_THRESHOLD = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', 3))
+MAX_FINGERPRINTS = 1000
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%s|%\(\w+\)s')
+_IN_LISTS = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+_VALUES_ROWS = re.compile(r'\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*', re.I)
+_SPACES = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """Normalize a statement so the same query shape always maps to one string"""
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _IN_LISTS.sub('IN (...)', sql)
+    sql = _VALUES_ROWS.sub('VALUES (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """Process-wide aggregate per fingerprint, served by /api/debug/queries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, fp, ms, rows):
+        with self._lock:
+            entry = self._stats.get(fp)
+            if entry is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    return
+                entry = self._stats[fp] = {
+                    'fingerprint': fp, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'rows': 0, 'slow': 0, 'n_plus_one_requests': 0
+                }
+            entry['count'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['rows'] += max(rows, 0)
+            if ms >= SLOW_QUERY_MS:
+                entry['slow'] += 1
+
+    def record_n_plus_one(self, fps):
+        with self._lock:
+            for fp in fps:
+                if fp in self._stats:
+                    self._stats[fp]['n_plus_one_requests'] += 1
+
+    def snapshot(self, order_by='total_ms'):
+        with self._lock:
+            rows = [dict(entry) for entry in self._stats.values()]
+        for row in rows:
+            row['avg_ms'] = round(row['total_ms'] / row['count'], 3) if row['count'] else 0.0
+            row['total_ms'] = round(row['total_ms'], 3)
+            row['max_ms'] = round(row['max_ms'], 3)
+        return sorted(rows, key=lambda r: r.get(order_by, 0), reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+# Extra listeners (fingerprint, sql, params, ms, rows); used by tools that
+# need every statement, e.g. the EXPLAIN advisor.
+listeners = []
+
+
+def _record(sql, params, ms, rows):
+    fp = fingerprint(sql if isinstance(sql, str) else sql.decode())
+    query_stats.record(fp, ms, rows)
+    if has_app_context():
+        log = g.get('_sql_queries')
+        if log is None:
+            log = g._sql_queries = []
+        log.append((fp, ms, rows))
+    if ms >= SLOW_QUERY_MS:
+        print(f"🐢 Slow query ({ms:.1f} ms, {rows} rows): {fp}")
+    for listener in listeners:
+        listener(fp, sql, params, ms, rows)
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times every statement and records its fingerprint"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(query, args)
+        finally:
+            _record(query, args, (time.perf_counter() - started) * 1000, self._cursor.rowcount)
+
+    def executemany(self, query, args):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, args)
+        finally:
+            _record(query, args, (time.perf_counter() - started) * 1000, self._cursor.rowcount)
+
+
+def request_summary():
+    """Queries recorded in the current app context: count, time and N+1 suspects"""
+    log = g.get('_sql_queries') or []
+    counts = Counter(fp for fp, _, _ in log)
+    return {
+        'count': len(log),
+        'total_ms': round(sum(ms for _, ms, _ in log), 3),
+        'n_plus_one': {fp: n for fp, n in counts.items() if n >= N_PLUS_ONE_THRESHOLD}
+    }
+
+
+def init_app(app):
+    @app.after_request
+    def report_queries(response):
+        summary = request_summary()
+        if summary['n_plus_one']:
+            query_stats.record_n_plus_one(summary['n_plus_one'])
+            for fp, n in summary['n_plus_one'].items():
+                print(f"⚠️ Possible N+1 in {request.method} {request.path}: {n}x {fp}")
+        if app.debug:
+            response.headers['X-SQL-Query-Count'] = str(summary['count'])
+            response.headers['X-SQL-Time-Ms'] = str(summary['total_ms'])
+            response.headers['X-SQL-N-Plus-One'] = str(len(summary['n_plus_one']))
+        return response
@@ -0,0 +1,96 @@
+"""Batch single-key lookups made during one request.
+
+A Loader wraps a multi-get such as User.find_by_ids. Code that needs one row
+calls defer(key) and reads the result later with .get(); every key deferred
+on the same loader before the first .get() is fetched in a single call:
+
+    loader = User.loader()
+    senders = [loader.defer(n['sender_id']) for n in notifications]
+    for n, sender in zip(notifications, senders):
+        n['sender'] = sender.get()
+
+load(key) is defer(key).get() for code that needs the row right away; it
+still picks up anything else deferred so far. Results are kept for the rest
+of the request, until a model write clears them (see identity_map.forget).
+Each .get() returns its own copy of the row.
+"""
+import copy
+from flask import g, has_app_context
+
+
+class Deferred:
+    def __init__(self, loader, key):
+        self._loader = loader
+        self.key = key
+
+    def get(self):
+        return self._loader._result(self.key)
+
+
+class Loader:
+    def __init__(self, batch_fn):
+        self.batch_fn = batch_fn
+        self._queue = []
+        self._results = {}
+
+    def defer(self, key):
+        if key is not None and key not in self._results:
+            self._queue.append(key)
+        return Deferred(self, key)
+
+    def load(self, key):
+        return self.defer(key).get()
+
+    def load_many(self, keys):
+        """{key: row} for the keys that exist"""
+        deferred = [self.defer(key) for key in keys]
+        rows = {d.key: d.get() for d in deferred}
+        return {key: row for key, row in rows.items() if row is not None}
+
+    def prime(self, key, row):
+        """Seed a row loaded some other way"""
+        self._results[key] = row
+
+    def clear(self, key=None):
+        if key is None:
+            self._results.clear()
+        else:
+            self._results.pop(key, None)
+
+    def dispatch(self):
+        queue = [key for key in dict.fromkeys(self._queue) if key not in self._results]
+        self._queue = []
+        if not queue:
+            return
+        rows = self.batch_fn(queue)
+        for key in queue:
+            self._results[key] = rows.get(key)
+
+    def _result(self, key):
+        if key is None:
+            return None
+        if key not in self._results:
+            self.dispatch()
+        return copy.deepcopy(self._results.get(key))
+
+
+def loader(name, batch_fn):
+    """The request's Loader for `name`, created on first use.
+
+    Outside an app context every call gets a fresh Loader.
+    """
+    if not has_app_context():
+        return Loader(batch_fn)
+    loaders = g.get('_loaders')
+    if loaders is None:
+        loaders = g._loaders = {}
+    if name not in loaders:
+        loaders[name] = Loader(batch_fn)
+    return loaders[name]
+
+
+def clear():
+    """Forget every loaded row; called when model writes may have changed them"""
+    if has_app_context():
+        for item in (g.get('_loaders') or {}).values():
+            item.clear()
@@ -0,0 +1,312 @@
+"""Versioned schema migrations.
+
+Migrations live in database/migrations/NNNN_description.py and define
+up(cur) and down(cur). Applied versions are recorded in schema_migrations.
+
+    python -m database.migrate status
+    python -m database.migrate up [version]
+    python -m database.migrate down [steps]
+
+Run `python -m database.migrate up` as a deploy step, before the new code
+starts serving: the models depend on tables that only migrations create
+(user_stats, job_counter_slots, job_alerts, ...). create_app() refuses to
+start while any migration is pending (see check_schema); set
+MIGRATE_ON_START=true to have it apply them instead, e.g. for a single-process
+development server.
+
+MySQL commits DDL implicitly, so a migration cannot be rolled back halfway.
+Use the helpers below (add_index, drop_index, add_column, ...). They check
+information_schema first, so re-running a half-applied migration is safe.
+"""
+import os
+import sys
+import hashlib
+import importlib.util
+import pymysql
+from database.db_config import get_pool
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+LOCK_NAME = 'freelancer_portal_schema_migrations'
+ER_DROP_INDEX_FK = 1553
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, 'rb') as f:
+            self.checksum = hashlib.sha256(f.read()).hexdigest()
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(f"database.migrations.m{self.version:04d}", self.path)
+            self._module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._module)
+        return self._module
+
+    def up(self, cur):
+        self.module.up(cur)
+
+    def down(self, cur):
+        self.module.down(cur)
+
+
+def discover():
+    """Return all migrations on disk, ordered by version"""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not filename.endswith('.py') or not filename[:4].isdigit():
+            continue
+        version = int(filename[:4])
+        migrations.append(Migration(version, filename[5:-3], os.path.join(MIGRATIONS_DIR, filename)))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {MIGRATIONS_DIR}")
+    return migrations
+
+
+# ==================== Online-safe DDL helpers ====================
+def index_exists(cur, table, index_name):
+    cur.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cur.fetchone() is not None
+
+
+def table_exists(cur, table):
+    cur.execute("""
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return cur.fetchone() is not None
+
+
+def column_exists(cur, table, column):
+    cur.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cur.fetchone() is not None
+
+
+def add_index(cur, table, index_name, columns, unique=False):
+    """Build an index in place without blocking reads or writes"""
+    if index_exists(cur, table, index_name):
+        return
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    cur.execute(
+        f"ALTER TABLE `{table}` ADD {kind} `{index_name}` ({', '.join(f'`{c}`' for c in columns)}), "
+        f"ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def drop_index(cur, table, index_name):
+    if not index_exists(cur, table, index_name):
+        return
+    try:
+        cur.execute(f"ALTER TABLE `{table}` DROP INDEX `{index_name}`, ALGORITHM=INPLACE, LOCK=NONE")
+    except pymysql.err.OperationalError as e:
+        if e.args[0] != ER_DROP_INDEX_FK:
+            raise
+        # MySQL silently drops the implicit index of a foreign key once a
+        # composite index can serve it; put a single-column one back first.
+        cur.execute("""
+            SELECT column_name AS column_name FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s AND seq_in_index = 1
+        """, (table, index_name))
+        column = cur.fetchone()['column_name']
+        cur.execute(
+            f"ALTER TABLE `{table}` ADD INDEX `{column}` (`{column}`), DROP INDEX `{index_name}`, "
+            f"ALGORITHM=INPLACE, LOCK=NONE"
+        )
+
+
+def add_column(cur, table, column, definition):
+    if column_exists(cur, table, column):
+        return
+    cur.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}, ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def drop_column(cur, table, column):
+    if not column_exists(cur, table, column):
+        return
+    cur.execute(f"ALTER TABLE `{table}` DROP COLUMN `{column}`, ALGORITHM=INPLACE, LOCK=NONE")
+
+
+# ==================== Runner ====================
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+
+
+def _applied(cur):
+    cur.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row['version']: row for row in cur.fetchall()}
+
+
+class _MigrationLock:
+    """MySQL advisory lock so concurrent deploys don't migrate twice"""
+
+    def __init__(self, cur, timeout=60):
+        self.cur = cur
+        self.timeout = timeout
+
+    def __enter__(self):
+        self.cur.execute("SELECT GET_LOCK(%s, %s) AS got", (LOCK_NAME, self.timeout))
+        if not self.cur.fetchone()['got']:
+            raise RuntimeError("Another process is running migrations")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+
+
+def _session_setup(cur):
+    # Give up quickly instead of queueing behind long transactions on a
+    # metadata lock (which would in turn block every query on the table).
+    cur.execute("SET SESSION lock_wait_timeout = %s", (int(os.getenv('MIGRATION_LOCK_WAIT_TIMEOUT', 10)),))
+
+
+def status():
+    """Return [(migration, applied_row_or_None)] for every known migration"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    try:
+        _ensure_version_table(cur)
+        applied = _applied(cur)
+        return [(m, applied.get(m.version)) for m in discover()]
+    finally:
+        cur.close()
+        conn.close()
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def pending():
+    """Migrations on disk that the database has not applied; read-only"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT 1 FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = 'schema_migrations'
+        """)
+        applied = _applied(cur) if cur.fetchone() else {}
+        conn.commit()
+        return [m for m in discover() if m.version not in applied]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def check_schema():
+    """Apply pending migrations if MIGRATE_ON_START is set, otherwise raise
+    SchemaOutOfDate when there are any (SCHEMA_CHECK=false skips the check)"""
+    if os.getenv('MIGRATE_ON_START', 'false').lower() == 'true':
+        migrate()
+        return
+    if os.getenv('SCHEMA_CHECK', 'true').lower() != 'true':
+        return
+    missing = pending()
+    if missing:
+        names = ', '.join(f"{m.version:04d}_{m.name}" for m in missing)
+        raise SchemaOutOfDate(f"Database schema is out of date; run `python -m database.migrate up` ({names})")
+
+
+def migrate(target=None):
+    """Apply pending migrations up to and including `target` (default: all)"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    done = []
+    try:
+        _ensure_version_table(cur)
+        _session_setup(cur)
+        with _MigrationLock(cur):
+            applied = _applied(cur)
+            for migration in discover():
+                if target is not None and migration.version > target:
+                    break
+                row = applied.get(migration.version)
+                if row:
+                    if row['checksum'] != migration.checksum:
+                        print(f"⚠️ Migration {migration.version:04d} changed after it was applied")
+                    continue
+                print(f"⏫ Applying migration {migration.version:04d}_{migration.name}")
+                migration.up(cur)
+                cur.execute("""
+                    INSERT INTO schema_migrations (version, name, checksum)
+                    VALUES (%s, %s, %s)
+                """, (migration.version, migration.name, migration.checksum))
+                conn.commit()
+                done.append(migration.version)
+        return done
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def rollback(steps=1):
+    """Revert the most recently applied `steps` migrations"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    done = []
+    try:
+        _ensure_version_table(cur)
+        _session_setup(cur)
+        with _MigrationLock(cur):
+            applied = _applied(cur)
+            by_version = {m.version: m for m in discover()}
+            for version in sorted(applied, reverse=True)[:steps]:
+                migration = by_version.get(version)
+                if migration is None:
+                    raise RuntimeError(f"Migration {version:04d} is applied but missing on disk")
+                print(f"⏬ Reverting migration {version:04d}_{migration.name}")
+                migration.down(cur)
+                cur.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+                conn.commit()
+                done.append(version)
+        return done
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def main(argv):
+    command = argv[0] if argv else 'status'
+    if command == 'status':
+        for migration, row in status():
+            state = f"applied {row['applied_at']}" if row else 'pending'
+            print(f"{migration.version:04d}  {migration.name:<40} {state}")
+    elif command == 'up':
+        done = migrate(int(argv[1]) if len(argv) > 1 else None)
+        print(f"✅ Applied {len(done)} migration(s)")
+    elif command == 'down':
+        done = rollback(int(argv[1]) if len(argv) > 1 else 1)
+        print(f"✅ Reverted {len(done)} migration(s)")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
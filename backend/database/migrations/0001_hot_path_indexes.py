@@ -0,0 +1,39 @@
+"""Composite indexes for the access patterns in database/models.py"""
+from database.migrate import add_index, drop_index
+
+INDEXES = [
+    # Job.get_by_recruiter / get_recent_by_recruiter: recruiter_id = ? ORDER BY created_at DESC
+    ('jobs', 'idx_jobs_recruiter_created', ['recruiter_id', 'created_at']),
+    # RecruiterProfile.get_stats: recruiter_id = ? AND is_active = TRUE
+    ('jobs', 'idx_jobs_recruiter_active', ['recruiter_id', 'is_active']),
+    # Job.search / get_recommended_for_freelancer / GET /api/jobs: is_active = TRUE ORDER BY created_at DESC
+    ('jobs', 'idx_jobs_active_created', ['is_active', 'created_at']),
+    # Job.search filtered by experience level
+    ('jobs', 'idx_jobs_active_level_created', ['is_active', 'experience_level', 'created_at']),
+    # JobApplication.get_by_freelancer / get_recent_by_freelancer: freelancer_id = ? ORDER BY applied_at DESC
+    ('job_applications', 'idx_applications_freelancer_applied', ['freelancer_id', 'applied_at']),
+    # FreelancerProfile.get_stats: freelancer_id = ? AND status IN (...)
+    ('job_applications', 'idx_applications_freelancer_status', ['freelancer_id', 'status']),
+    # JobApplication.get_by_job / get_by_job_ids / get_recent_for_recruiter: job_id = ? ORDER BY applied_at DESC
+    ('job_applications', 'idx_applications_job_applied', ['job_id', 'applied_at']),
+    # RecruiterProfile.get_stats: job_id = ? AND status = ?
+    ('job_applications', 'idx_applications_job_status', ['job_id', 'status']),
+    # Notification.get_by_user: user_id = ? ORDER BY created_at DESC
+    ('notifications', 'idx_notifications_user_created', ['user_id', 'created_at']),
+    # Notification.get_by_user(unread_only) / get_unread_count / mark_all_as_read
+    ('notifications', 'idx_notifications_user_read_created', ['user_id', 'is_read', 'created_at']),
+    # FreelancerProfile.get_by_user_id and friends join skills from the skill side too
+    ('freelancer_skills', 'idx_freelancer_skills_skill', ['skill_id', 'freelancer_profile_id']),
+    ('job_skills', 'idx_job_skills_skill', ['skill_id', 'job_id']),
+    ('job_tech_stacks', 'idx_job_tech_stacks_tech', ['tech_stack_id', 'job_id']),
+]
+
+
+def up(cur):
+    for table, name, columns in INDEXES:
+        add_index(cur, table, name, columns)
+
+
+def down(cur):
+    for table, name, _ in reversed(INDEXES):
+        drop_index(cur, table, name)
@@ -0,0 +1,70 @@
+"""Materialized per-user dashboard counters (see UserStats in database/models.py)"""
+from database.migrate import table_exists
+
+STATUSES = ('applied', 'reviewed', 'shortlisted', 'accepted', 'rejected')
+APPLICATION_COLUMNS = ['applications_total'] + [f'applications_{s}' for s in STATUSES]
+COUNTER_COLUMNS = ['jobs_total', 'jobs_active'] + APPLICATION_COLUMNS
+STATUS_SUMS = ', '.join(f"SUM(ja.status = '{s}') AS applications_{s}" for s in STATUSES)
+
+
+def up(cur):
+    if not table_exists(cur, 'user_stats'):
+        cur.execute("""
+            CREATE TABLE user_stats (
+                user_id INT PRIMARY KEY,
+                jobs_total INT NOT NULL DEFAULT 0,
+                jobs_active INT NOT NULL DEFAULT 0,
+                applications_total INT NOT NULL DEFAULT 0,
+                applications_applied INT NOT NULL DEFAULT 0,
+                applications_reviewed INT NOT NULL DEFAULT 0,
+                applications_shortlisted INT NOT NULL DEFAULT 0,
+                applications_accepted INT NOT NULL DEFAULT 0,
+                applications_rejected INT NOT NULL DEFAULT 0,
+                profile_completion TINYINT UNSIGNED NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+    # Backfill from the source tables. This is a copy of what the counters
+    # meant when this migration was written, not a call into the models, so
+    # replaying it always gives the same result.
+    cur.execute(f"""
+        INSERT INTO user_stats (user_id, jobs_total, jobs_active, {', '.join(APPLICATION_COLUMNS)})
+        SELECT u.id, COALESCE(posted.jobs_total, 0), COALESCE(posted.jobs_active, 0),
+               {', '.join(f'COALESCE(sent.{c}, 0) + COALESCE(received.{c}, 0)' for c in APPLICATION_COLUMNS)}
+        FROM users u
+        LEFT JOIN (
+            SELECT recruiter_id, COUNT(*) AS jobs_total, SUM(is_active) AS jobs_active
+            FROM jobs GROUP BY recruiter_id
+        ) posted ON posted.recruiter_id = u.id
+        LEFT JOIN (
+            SELECT ja.freelancer_id AS user_id, COUNT(*) AS applications_total, {STATUS_SUMS}
+            FROM job_applications ja GROUP BY ja.freelancer_id
+        ) sent ON sent.user_id = u.id
+        LEFT JOIN (
+            SELECT j.recruiter_id AS user_id, COUNT(*) AS applications_total, {STATUS_SUMS}
+            FROM job_applications ja JOIN jobs j ON ja.job_id = j.id GROUP BY j.recruiter_id
+        ) received ON received.user_id = u.id
+        ON DUPLICATE KEY UPDATE {', '.join(f'user_stats.{c} = VALUES({c})' for c in COUNTER_COLUMNS)}
+    """)
+    # Percentage of bio, hourly_rate, education, experience,
+    # years_of_experience and (if any) skills that are filled in
+    filled = ' + '.join(f"COALESCE({check}, 0)" for check in (
+        "CHAR_LENGTH(fp.bio) > 0", "fp.hourly_rate <> 0", "CHAR_LENGTH(fp.education) > 0",
+        "CHAR_LENGTH(fp.experience) > 0", "fp.years_of_experience <> 0"))
+    cur.execute(f"""
+        INSERT INTO user_stats (user_id, profile_completion)
+        SELECT * FROM (
+            SELECT fp.user_id,
+                   CASE WHEN EXISTS(SELECT 1 FROM freelancer_skills fs WHERE fs.freelancer_profile_id = fp.id)
+                        THEN ({filled} + 1) * 100 DIV 6
+                        ELSE ({filled}) * 100 DIV 5
+                   END AS profile_completion
+            FROM freelancer_profiles fp
+        ) AS completion
+        ON DUPLICATE KEY UPDATE profile_completion = VALUES(profile_completion)
+    """)
+
+
+def down(cur):
+    cur.execute("DROP TABLE IF EXISTS user_stats")
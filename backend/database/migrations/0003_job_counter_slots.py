@@ -0,0 +1,31 @@
+"""Slot rows for sharded per-job counters (see database/counters.py)"""
+from database.migrate import table_exists
+
+
+def up(cur):
+    if not table_exists(cur, 'job_counter_slots'):
+        cur.execute("""
+            CREATE TABLE job_counter_slots (
+                job_id INT NOT NULL,
+                counter VARCHAR(32) NOT NULL,
+                slot TINYINT UNSIGNED NOT NULL,
+                delta INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (job_id, counter, slot),
+                FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+    # Withdrawals never decremented applications_count; start from the truth
+    cur.execute("""
+        UPDATE jobs j
+        SET j.applications_count = (SELECT COUNT(*) FROM job_applications ja WHERE ja.job_id = j.id)
+    """)
+
+
+def down(cur):
+    cur.execute("""
+        UPDATE jobs j
+        SET j.applications_count = j.applications_count + COALESCE(
+            (SELECT SUM(s.delta) FROM job_counter_slots s
+             WHERE s.job_id = j.id AND s.counter = 'applications'), 0)
+    """)
+    cur.execute("DROP TABLE IF EXISTS job_counter_slots")
@@ -0,0 +1,39 @@
+"""Saved job searches and the alerts sent for them (see database/percolator.py)"""
+from database.migrate import table_exists
+
+
+def up(cur):
+    if not table_exists(cur, 'saved_searches'):
+        cur.execute("""
+            CREATE TABLE saved_searches (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                filters JSON NOT NULL,
+                is_active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                INDEX idx_saved_searches_user (user_id),
+                INDEX idx_saved_searches_active (is_active, updated_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+    # One alert per user and job, however many of their searches match it
+    if not table_exists(cur, 'job_alerts'):
+        cur.execute("""
+            CREATE TABLE job_alerts (
+                user_id INT NOT NULL,
+                job_id INT NOT NULL,
+                saved_search_id INT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (job_id, user_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
+                FOREIGN KEY (saved_search_id) REFERENCES saved_searches(id) ON DELETE SET NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+
+
+def down(cur):
+    cur.execute("DROP TABLE IF EXISTS job_alerts")
+    cur.execute("DROP TABLE IF EXISTS saved_searches")
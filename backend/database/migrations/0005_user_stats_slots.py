@@ -0,0 +1,35 @@
+"""Slot rows for recruiters' application counters in user_stats (see database/counters.py)"""
+from database.migrate import table_exists
+
+
+def up(cur):
+    if not table_exists(cur, 'user_stats_slots'):
+        cur.execute("""
+            CREATE TABLE user_stats_slots (
+                user_id INT NOT NULL,
+                slot TINYINT UNSIGNED NOT NULL,
+                applications_total INT NOT NULL DEFAULT 0,
+                applications_applied INT NOT NULL DEFAULT 0,
+                applications_reviewed INT NOT NULL DEFAULT 0,
+                applications_shortlisted INT NOT NULL DEFAULT 0,
+                applications_accepted INT NOT NULL DEFAULT 0,
+                applications_rejected INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, slot),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+
+
+def down(cur):
+    # Fold outstanding slots into user_stats before dropping them
+    columns = ('applications_total', 'applications_applied', 'applications_reviewed',
+               'applications_shortlisted', 'applications_accepted', 'applications_rejected')
+    cur.execute(f"""
+        INSERT INTO user_stats (user_id, {', '.join(columns)})
+        SELECT * FROM (
+            SELECT user_id, {', '.join(f'SUM({c}) AS {c}' for c in columns)}
+            FROM user_stats_slots GROUP BY user_id
+        ) AS delta
+        ON DUPLICATE KEY UPDATE {', '.join(f'user_stats.{c} = user_stats.{c} + VALUES({c})' for c in columns)}
+    """)
+    cur.execute("DROP TABLE IF EXISTS user_stats_slots")
@@ -6719,11 +6719,108 @@
 
 
 
+import re
 import json
 import traceback
+from collections import Counter
 from datetime import datetime
+from pymysql.err import IntegrityError
 from utils.auth_utils import hash_password, check_password
 from database.db_config import get_db_connection as get_connection
+from database.replicas import read_only
+from database import identity_map
+from database.loader import loader
+from database import taxonomy
+from database.taxonomy import name_key
+from database.counters import job_applications as applications_counter, recruiter_applications
+from database import percolator as job_alerts
+from database.search_index import job_index, facet_result, pay_bucket_sql, FACET_TOP_SKILLS, \
+    FT_MIN_TOKEN_SIZE, FT_STOPWORDS, FT_TOKEN_RE
+from utils.pagination import Page, InvalidCursor, page_size, keyset_condition, order_by
+
+# Upper bound on ids per IN (...) list; larger batches are split
+IN_CHUNK_SIZE = 1000
+
+ER_DUP_ENTRY = 1062
+
+
+def _chunks(ids):
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        yield ids[start:start + IN_CHUNK_SIZE]
+
+
+
+def _json_list(value):
+    """Decode a JSON_ARRAYAGG column; NULL (no matching rows) becomes []"""
+    if value is None:
+        return []
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+# Keyset pagination order (newest first) for list methods
+JOB_PAGE_KEY = ('j.created_at', 'j.id')
+APPLICATION_PAGE_KEY = ('ja.applied_at', 'ja.id')
+NOTIFICATION_PAGE_KEY = ('created_at', 'id')
+
+# ==================== Full-text search ====================
+JOB_SEARCH_COLUMNS = 'j.title, j.description, j.requirements'
+SEARCH_MODES = ('natural', 'boolean')
+FULLTEXT_CURSOR_TAG = 'fulltext'
+# A boolean-mode term: an optional operator at the start of a word, then a
+# closed "phrase" or a word with an optional trailing * (see boolean_query)
+BOOLEAN_TERM_RE = re.compile(r'(?:(?<![^\s(])([+\-~<>]))?(?:"([^"]*)"|(\w+)(\*?))', re.UNICODE)
+# How a list of skill / tech stack names is matched
+MATCH_MODES = ('all', 'any')
+
+
+def parse_names(value):
+    """A comma-separated query parameter as a list of names"""
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def parse_choice(value):
+    """A select filter's value, or '' for none and for the UI's "All ..."
+    options (All Types, All Levels)"""
+    value = str(value or '').strip()
+    return '' if value.lower().startswith('all ') else value
+
+
+def boolean_query(search):
+    """Rebuild a boolean-mode search from its well-formed terms.
+
+    User text goes straight into AGAINST (... IN BOOLEAN MODE), where a stray
+    operator (a lone ", +-, a trailing *( ) is a syntax error. Only words,
+    closed phrases, a leading + - ~ < > and a trailing * are kept; grouping
+    parentheses and anything else are dropped.
+    """
+    terms = []
+    for operator, phrase, word, star in BOOLEAN_TERM_RE.findall(search.lower()):
+        if word:
+            terms.append(f"{operator}{word}{star}")
+        elif FT_TOKEN_RE.findall(phrase):
+            terms.append(f'{operator}"{" ".join(FT_TOKEN_RE.findall(phrase))}"')
+    return ' '.join(terms)
+
+
+def job_search_match(search, mode='natural'):
+    """Build the MATCH ... AGAINST expression for idx_job_search.
+
+    Returns (sql, params), or (None, []) when the text has no searchable words.
+    Queries made only of short words or stopwords would match nothing, so they
+    fall back to boolean prefix matching (word*), which InnoDB applies
+    regardless of token size and stopwords.
+    """
+    tokens = FT_TOKEN_RE.findall(search.lower())
+    if not tokens:
+        return None, []
+    if not any(len(t) >= FT_MIN_TOKEN_SIZE and t not in FT_STOPWORDS for t in tokens):
+        against, modifier = ' '.join(f'+{t}*' for t in tokens), 'IN BOOLEAN MODE'
+    elif mode == 'boolean':
+        against, modifier = boolean_query(search), 'IN BOOLEAN MODE'
+    else:
+        against, modifier = search.strip(), 'IN NATURAL LANGUAGE MODE'
+    return f"MATCH({JOB_SEARCH_COLUMNS}) AGAINST (%s {modifier})", [against]
 
 # ==================== User Model ====================
 # class User:
@@ -6879,33 +6976,66 @@ class User:
             cur.close()
             conn.close()
 
+    _SELECT = """
+        SELECT id, username, email, first_name, last_name, user_type,
+               is_verified, date_joined
+        FROM users
+    """
+
+    @staticmethod
+    def _from_row(row):
+        return {
+            'id': row['id'],
+            'username': row['username'],
+            'email': row['email'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'user_type': row['user_type'],
+            'is_verified': row['is_verified'],
+            'date_joined': row['date_joined'].isoformat() if row['date_joined'] else None
+        }
+
     @staticmethod
+    @identity_map.mapped('user')
     def find_by_id(user_id):
         conn = get_connection()
         cur = conn.cursor()
         try:
-            cur.execute("""
-                SELECT id, username, email, first_name, last_name, user_type,
-                       is_verified, date_joined
-                FROM users WHERE id = %s
-            """, (user_id,))
+            cur.execute(User._SELECT + " WHERE id = %s", (user_id,))
             row = cur.fetchone()
             if row:
-                return {
-                    'id': row['id'],
-                    'username': row['username'],
-                    'email': row['email'],
-                    'first_name': row['first_name'],
-                    'last_name': row['last_name'],
-                    'user_type': row['user_type'],
-                    'is_verified': row['is_verified'],
-                    'date_joined': row['date_joined'].isoformat() if row['date_joined'] else None
-                }
+                return User._from_row(row)
             return None
         finally:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def find_by_ids(user_ids):
+        """{id: user} for the ids that exist, one query per IN_CHUNK_SIZE ids"""
+        users, missing = identity_map.get_many('user', user_ids)
+        if not missing:
+            return users
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            for chunk in _chunks(missing):
+                placeholders = ','.join(['%s'] * len(chunk))
+                cur.execute(User._SELECT + f" WHERE id IN ({placeholders})", chunk)
+                for row in cur.fetchall():
+                    user = User._from_row(row)
+                    identity_map.remember('user', user['id'], user)
+                    users[user['id']] = user
+            return users
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def loader():
+        """The request's batching loader for find_by_id"""
+        return loader('user', User.find_by_ids)
+
     @staticmethod
     def authenticate(email, password):
         user = User.find_by_email(email)
@@ -6923,6 +7053,7 @@ class User:
                 UPDATE users SET is_verified = TRUE, last_login = %s
                 WHERE id = %s
             """, (datetime.now(), user_id))
+            identity_map.forget('user', user_id)
             conn.commit()
             return True
         except:
@@ -6951,62 +7082,71 @@ class User:
 
 # ==================== FreelancerProfile Model ====================
 class FreelancerProfile:
+    # Profile, skills and tech stacks in one round trip
+    _SELECT = """
+        SELECT fp.id, fp.user_id, fp.bio, fp.hourly_rate, fp.education, fp.experience,
+               fp.years_of_experience, fp.github_url, fp.linkedin_url, fp.portfolio_url,
+               fp.is_available, fp.created_at, fp.updated_at,
+               (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                           'id', s.id, 'name', s.name, 'proficiency_level', fs.proficiency_level))
+                FROM freelancer_skills fs
+                JOIN skills s ON fs.skill_id = s.id
+                WHERE fs.freelancer_profile_id = fp.id) AS skills,
+               (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                           'id', ts.id, 'name', ts.name, 'experience_years', fts.experience_years))
+                FROM freelancer_tech_stacks fts
+                JOIN tech_stacks ts ON fts.tech_stack_id = ts.id
+                WHERE fts.freelancer_profile_id = fp.id) AS tech_stacks
+        FROM freelancer_profiles fp
+    """
+
     @staticmethod
+    def _from_row(row):
+        profile = dict(row)
+        profile['created_at'] = profile['created_at'].isoformat() if profile['created_at'] else None
+        profile['updated_at'] = profile['updated_at'].isoformat() if profile['updated_at'] else None
+        profile['skills'] = _json_list(profile['skills'])
+        profile['tech_stacks'] = _json_list(profile['tech_stacks'])
+        return profile
+
+    @staticmethod
+    @read_only
     def get_by_user_id(user_id):
         conn = get_connection()
         cur = conn.cursor()
         try:
-            cur.execute("""
-                SELECT id, user_id, bio, hourly_rate, education, experience,
-                       years_of_experience, github_url, linkedin_url, portfolio_url,
-                       is_available, created_at, updated_at
-                FROM freelancer_profiles WHERE user_id = %s
-            """, (user_id,))
+            cur.execute(FreelancerProfile._SELECT + " WHERE fp.user_id = %s", (user_id,))
             profile_row = cur.fetchone()
             if not profile_row:
                 return None
+            return FreelancerProfile._from_row(profile_row)
+        finally:
+            cur.close()
+            conn.close()
 
-            profile = dict(profile_row)
-            profile['created_at'] = profile['created_at'].isoformat() if profile['created_at'] else None
-            profile['updated_at'] = profile['updated_at'].isoformat() if profile['updated_at'] else None
-
-            # Fetch skills
-            cur.execute("""
-                SELECT s.id, s.name, fs.proficiency_level
-                FROM freelancer_skills fs
-                JOIN skills s ON fs.skill_id = s.id
-                WHERE fs.freelancer_profile_id = %s
-            """, (profile['id'],))
-            skills = []
-            for row in cur.fetchall():
-                skills.append({
-                    'id': row['id'],
-                    'name': row['name'],
-                    'proficiency_level': row['proficiency_level']
-                })
-            profile['skills'] = skills
-
-            # Fetch tech stacks
-            cur.execute("""
-                SELECT ts.id, ts.name, fts.experience_years
-                FROM freelancer_tech_stacks fts
-                JOIN tech_stacks ts ON fts.tech_stack_id = ts.id
-                WHERE fts.freelancer_profile_id = %s
-            """, (profile['id'],))
-            tech_stacks = []
-            for row in cur.fetchall():
-                tech_stacks.append({
-                    'id': row['id'],
-                    'name': row['name'],
-                    'experience_years': row['experience_years']
-                })
-            profile['tech_stacks'] = tech_stacks
-
-            return profile
+    @staticmethod
+    @read_only
+    def get_by_user_ids(user_ids):
+        """{user_id: profile} for the users that have one, one query per IN_CHUNK_SIZE ids"""
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            profiles = {}
+            for chunk in _chunks(user_ids):
+                placeholders = ','.join(['%s'] * len(chunk))
+                cur.execute(FreelancerProfile._SELECT + f" WHERE fp.user_id IN ({placeholders})", chunk)
+                for row in cur.fetchall():
+                    profiles[row['user_id']] = FreelancerProfile._from_row(row)
+            return profiles
         finally:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def loader():
+        """The request's batching loader for get_by_user_id"""
+        return loader('freelancer_profile', FreelancerProfile.get_by_user_ids)
+
     @staticmethod
     def create_empty(user_id):
         conn = get_connection()
@@ -7027,6 +7167,37 @@ class FreelancerProfile:
             cur.close()
             conn.close()
 
+    @staticmethod
+    def _sync_links(cur, table, item_column, value_column, profile_id, desired):
+        """Bring a profile's link rows in line with desired {item_id: value}.
+
+        Only the difference is written: one DELETE for removed items and one
+        batched upsert for new or changed ones. Unchanged rows cost nothing.
+        """
+        cur.execute(f"""
+            SELECT {item_column} AS item_id, {value_column} AS value
+            FROM {table}
+            WHERE freelancer_profile_id = %s
+        """, (profile_id,))
+        stored = {row['item_id']: row['value'] for row in cur.fetchall()}
+
+        removed = [item_id for item_id in stored if item_id not in desired]
+        if removed:
+            placeholders = ','.join(['%s'] * len(removed))
+            cur.execute(f"""
+                DELETE FROM {table}
+                WHERE freelancer_profile_id = %s AND {item_column} IN ({placeholders})
+            """, [profile_id] + removed)
+
+        upserts = [(profile_id, item_id, value) for item_id, value in desired.items()
+                   if item_id not in stored or stored[item_id] != value]
+        if upserts:
+            cur.executemany(f"""
+                INSERT INTO {table} (freelancer_profile_id, {item_column}, {value_column})
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE {value_column} = VALUES({value_column})
+            """, upserts)
+
     @staticmethod
     def update(user_id, data):
         conn = get_connection()
@@ -7054,52 +7225,43 @@ class FreelancerProfile:
                 query = f"UPDATE freelancer_profiles SET {', '.join(fields)}, updated_at = %s WHERE id = %s"
                 cur.execute(query, tuple(values))
 
-            # Update skills (replace all)
+            # Update skills (only what changed)
             if 'skills' in data:
-                # Delete existing
-                cur.execute("DELETE FROM freelancer_skills WHERE freelancer_profile_id = %s", (profile_id,))
-                # Insert new
+                skills = []
                 for skill in data['skills']:
                     if isinstance(skill, dict):
-                        skill_name = skill.get('name')
-                        proficiency = skill.get('proficiency_level', 'intermediate')
-                    else:
-                        skill_name = skill
-                        proficiency = 'intermediate'
-                    # Get or create skill
-                    cur.execute("SELECT id FROM skills WHERE name = %s", (skill_name,))
-                    skill_row = cur.fetchone()
-                    if skill_row:
-                        skill_id = skill_row['id']
+                        skills.append((skill.get('name'), skill.get('proficiency_level', 'intermediate')))
                     else:
-                        cur.execute("INSERT INTO skills (name) VALUES (%s)", (skill_name,))
-                        skill_id = cur.lastrowid
-                    cur.execute("""
-                        INSERT INTO freelancer_skills (freelancer_profile_id, skill_id, proficiency_level)
-                        VALUES (%s, %s, %s)
-                    """, (profile_id, skill_id, proficiency))
+                        skills.append((skill, 'intermediate'))
+                skill_ids = taxonomy.skills.resolve(conn, cur, [name for name, _ in skills])
+                # One row per skill; a repeated name keeps its last proficiency
+                desired = {}
+                for name, proficiency in skills:
+                    if name and name.strip():
+                        desired[skill_ids[name_key(name)]] = proficiency
+                FreelancerProfile._sync_links(cur, 'freelancer_skills', 'skill_id', 'proficiency_level',
+                                              profile_id, desired)
 
             # Update tech stacks
             if 'tech_stacks' in data:
-                cur.execute("DELETE FROM freelancer_tech_stacks WHERE freelancer_profile_id = %s", (profile_id,))
+                techs = []
                 for tech in data['tech_stacks']:
                     if isinstance(tech, dict):
-                        tech_name = tech.get('name')
-                        exp_years = tech.get('experience_years', 0)
+                        techs.append((tech.get('name'), tech.get('experience_years', 0)))
                     else:
-                        tech_name = tech
-                        exp_years = 0
-                    cur.execute("SELECT id FROM tech_stacks WHERE name = %s", (tech_name,))
-                    tech_row = cur.fetchone()
-                    if tech_row:
-                        tech_id = tech_row['id']
-                    else:
-                        cur.execute("INSERT INTO tech_stacks (name) VALUES (%s)", (tech_name,))
-                        tech_id = cur.lastrowid
-                    cur.execute("""
-                        INSERT INTO freelancer_tech_stacks (freelancer_profile_id, tech_stack_id, experience_years)
-                        VALUES (%s, %s, %s)
-                    """, (profile_id, tech_id, exp_years))
+                        techs.append((tech, 0))
+                tech_ids = taxonomy.tech_stacks.resolve(conn, cur, [name for name, _ in techs])
+                desired = {}
+                for name, exp_years in techs:
+                    if name and name.strip():
+                        desired[tech_ids[name_key(name)]] = int(exp_years or 0)
+                FreelancerProfile._sync_links(cur, 'freelancer_tech_stacks', 'tech_stack_id', 'experience_years',
+                                              profile_id, desired)
+
+            if fields or 'skills' in data:
+                UserStats.refresh_profile_completion(cur, profile_id)
+            # Application rows carry the freelancer's hourly rate
+            identity_map.forget('application')
 
             conn.commit()
             return True
@@ -7113,57 +7275,21 @@ class FreelancerProfile:
             conn.close()
 
     @staticmethod
+    @read_only
     def get_stats(user_id):
         """Return dashboard stats for a freelancer"""
-        conn = get_connection()
-        cur = conn.cursor()
-        try:
-            # Total applications
-            cur.execute("SELECT COUNT(*) as count FROM job_applications WHERE freelancer_id = %s", (user_id,))
-            total_applications = cur.fetchone()['count']
-
-            # Pending applications (status = 'applied' or 'reviewed')
-            cur.execute("""
-                SELECT COUNT(*) as count FROM job_applications
-                WHERE freelancer_id = %s AND status IN ('applied', 'reviewed')
-            """, (user_id,))
-            pending_applications = cur.fetchone()['count']
-
-            # Accepted applications
-            cur.execute("""
-                SELECT COUNT(*) as count FROM job_applications
-                WHERE freelancer_id = %s AND status = 'accepted'
-            """, (user_id,))
-            accepted_applications = cur.fetchone()['count']
-
-            # Profile completion (count filled fields)
-            cur.execute("SELECT * FROM freelancer_profiles WHERE user_id = %s", (user_id,))
-            profile = cur.fetchone()
-            completion = 0
-            if profile:
-                fields = ['bio', 'hourly_rate', 'education', 'experience', 'years_of_experience']
-                filled = sum(1 for f in fields if profile.get(f))
-                # Also check if at least one skill exists
-                cur.execute("SELECT COUNT(*) as cnt FROM freelancer_skills WHERE freelancer_profile_id = %s", (profile['id'],))
-                skill_count = cur.fetchone()['cnt']
-                if skill_count > 0:
-                    filled += 1
-                    fields.append('skills')
-                completion = int((filled / len(fields)) * 100) if fields else 0
-
-            return {
-                'total_applications': total_applications,
-                'pending_applications': pending_applications,
-                'accepted_applications': accepted_applications,
-                'profile_completion': completion
-            }
-        finally:
-            cur.close()
-            conn.close()
+        stats = UserStats.get(user_id)
+        return {
+            'total_applications': stats['applications_total'],
+            'pending_applications': stats['applications_applied'] + stats['applications_reviewed'],
+            'accepted_applications': stats['applications_accepted'],
+            'profile_completion': stats['profile_completion']
+        }
 
 # ==================== RecruiterProfile Model ====================
 class RecruiterProfile:
     @staticmethod
+    @read_only
     def get_by_user_id(user_id):
         conn = get_connection()
         cur = conn.cursor()
@@ -7226,6 +7352,8 @@ class RecruiterProfile:
         query = f"UPDATE recruiter_profiles SET {', '.join(fields)}, updated_at = %s WHERE user_id = %s"
         try:
             cur.execute(query, tuple(values))
+            # Job rows carry the recruiter's company name
+            identity_map.forget('job')
             conn.commit()
             return cur.rowcount > 0
         except Exception as e:
@@ -7237,53 +7365,17 @@ class RecruiterProfile:
             conn.close()
 
     @staticmethod
+    @read_only
     def get_stats(user_id):
         """Return dashboard stats for a recruiter"""
-        conn = get_connection()
-        cur = conn.cursor()
-        try:
-            # Total jobs posted
-            cur.execute("SELECT COUNT(*) as count FROM jobs WHERE recruiter_id = %s", (user_id,))
-            total_jobs = cur.fetchone()['count']
-
-            # Active jobs
-            cur.execute("SELECT COUNT(*) as count FROM jobs WHERE recruiter_id = %s AND is_active = TRUE", (user_id,))
-            active_jobs = cur.fetchone()['count']
-
-            # Total applications received
-            cur.execute("""
-                SELECT COUNT(*) as count FROM job_applications ja
-                JOIN jobs j ON ja.job_id = j.id
-                WHERE j.recruiter_id = %s
-            """, (user_id,))
-            total_applications = cur.fetchone()['count']
-
-            # Pending applications (status = 'applied')
-            cur.execute("""
-                SELECT COUNT(*) as count FROM job_applications ja
-                JOIN jobs j ON ja.job_id = j.id
-                WHERE j.recruiter_id = %s AND ja.status = 'applied'
-            """, (user_id,))
-            pending_applications = cur.fetchone()['count']
-
-            # Accepted applications
-            cur.execute("""
-                SELECT COUNT(*) as count FROM job_applications ja
-                JOIN jobs j ON ja.job_id = j.id
-                WHERE j.recruiter_id = %s AND ja.status = 'accepted'
-            """, (user_id,))
-            accepted_applications = cur.fetchone()['count']
-
-            return {
-                'total_jobs': total_jobs,
-                'active_jobs': active_jobs,
-                'total_applications': total_applications,
-                'pending_applications': pending_applications,
-                'accepted_applications': accepted_applications
-            }
-        finally:
-            cur.close()
-            conn.close()
+        stats = UserStats.get(user_id)
+        return {
+            'total_jobs': stats['jobs_total'],
+            'active_jobs': stats['jobs_active'],
+            'total_applications': stats['applications_total'],
+            'pending_applications': stats['applications_applied'],
+            'accepted_applications': stats['applications_accepted']
+        }
 
 # ==================== Job Model ====================
 class Job:
@@ -7328,33 +7420,23 @@ class Job:
 
             # Insert skills
             if 'required_skills' in data and data['required_skills']:
-                for skill_name in data['required_skills']:
-                    cur.execute("SELECT id FROM skills WHERE name = %s", (skill_name,))
-                    skill_row = cur.fetchone()
-                    if skill_row:
-                        skill_id = skill_row['id']
-                    else:
-                        cur.execute("INSERT INTO skills (name) VALUES (%s)", (skill_name,))
-                        skill_id = cur.lastrowid
-                    cur.execute("""
-                        INSERT INTO job_skills (job_id, skill_id, is_required)
-                        VALUES (%s, %s, %s)
-                    """, (job_id, skill_id, True))
+                skill_ids = taxonomy.skills.resolve(conn, cur, data['required_skills'])
+                cur.executemany("""
+                    INSERT INTO job_skills (job_id, skill_id, is_required)
+                    VALUES (%s, %s, %s)
+                """, [(job_id, skill_id, True) for skill_id in set(skill_ids.values())])
 
             # Insert tech stacks
             if 'tech_stack' in data and data['tech_stack']:
-                for tech_name in data['tech_stack']:
-                    cur.execute("SELECT id FROM tech_stacks WHERE name = %s", (tech_name,))
-                    tech_row = cur.fetchone()
-                    if tech_row:
-                        tech_id = tech_row['id']
-                    else:
-                        cur.execute("INSERT INTO tech_stacks (name) VALUES (%s)", (tech_name,))
-                        tech_id = cur.lastrowid
-                    cur.execute("""
-                        INSERT INTO job_tech_stacks (job_id, tech_stack_id, is_required)
-                        VALUES (%s, %s, %s)
-                    """, (job_id, tech_id, True))
+                tech_ids = taxonomy.tech_stacks.resolve(conn, cur, data['tech_stack'])
+                cur.executemany("""
+                    INSERT INTO job_tech_stacks (job_id, tech_stack_id, is_required)
+                    VALUES (%s, %s, %s)
+                """, [(job_id, tech_id, True) for tech_id in set(tech_ids.values())])
+
+            UserStats.add(cur, recruiter_id, jobs_total=1, jobs_active=1)
+            conn.on_commit(lambda: job_index.refresh([job_id]))
+            conn.on_commit(lambda: job_alerts.enqueue(job_id))
 
             conn.commit()
             return job_id
@@ -7368,68 +7450,157 @@ class Job:
             conn.close()
 
     @staticmethod
+    def attach_skills(cur, jobs):
+        """Load required_skills and tech_stack for a list of jobs in one query"""
+        if not jobs:
+            return jobs
+        by_id = {}
+        for job in jobs:
+            job['required_skills'] = []
+            job['tech_stack'] = []
+            by_id[job['id']] = job
+        job_ids = list(by_id)
+        for start in range(0, len(job_ids), IN_CHUNK_SIZE):
+            chunk = job_ids[start:start + IN_CHUNK_SIZE]
+            placeholders = ','.join(['%s'] * len(chunk))
+            cur.execute(f"""
+                SELECT js.job_id, 'required_skills' AS relation, s.name
+                FROM job_skills js
+                JOIN skills s ON js.skill_id = s.id
+                WHERE js.job_id IN ({placeholders})
+                UNION ALL
+                SELECT jts.job_id, 'tech_stack' AS relation, ts.name
+                FROM job_tech_stacks jts
+                JOIN tech_stacks ts ON jts.tech_stack_id = ts.id
+                WHERE jts.job_id IN ({placeholders})
+            """, chunk + chunk)
+            for row in cur.fetchall():
+                by_id[row['job_id']][row['relation']].append(row['name'])
+        return jobs
+
+    _SELECT = """
+        SELECT j.*, u.first_name, u.last_name, u.email,
+               rp.company_name,
+               (SELECT JSON_ARRAYAGG(s.name)
+                FROM job_skills js
+                JOIN skills s ON js.skill_id = s.id
+                WHERE js.job_id = j.id) AS required_skills,
+               (SELECT JSON_ARRAYAGG(ts.name)
+                FROM job_tech_stacks jts
+                JOIN tech_stacks ts ON jts.tech_stack_id = ts.id
+                WHERE jts.job_id = j.id) AS tech_stack,
+               (SELECT COALESCE(SUM(cs.delta), 0)
+                FROM job_counter_slots cs
+                WHERE cs.job_id = j.id AND cs.counter = 'applications') AS applications_pending
+        FROM jobs j
+        JOIN users u ON j.recruiter_id = u.id
+        LEFT JOIN recruiter_profiles rp ON u.id = rp.user_id
+    """
+
+    @staticmethod
+    def _from_row(row):
+        job = dict(row)
+        job['required_skills'] = _json_list(job['required_skills'])
+        job['tech_stack'] = _json_list(job['tech_stack'])
+        job['applications_count'] += int(job.pop('applications_pending'))
+        return job
+
+    @staticmethod
+    @identity_map.mapped('job')
+    @read_only
     def get_by_id(job_id):
         conn = get_connection()
         cur = conn.cursor()
         try:
-            cur.execute("""
-                SELECT j.*, u.first_name, u.last_name, u.email,
-                       rp.company_name
-                FROM jobs j
-                JOIN users u ON j.recruiter_id = u.id
-                LEFT JOIN recruiter_profiles rp ON u.id = rp.user_id
-                WHERE j.id = %s
-            """, (job_id,))
+            cur.execute(Job._SELECT + " WHERE j.id = %s", (job_id,))
             row = cur.fetchone()
             if not row:
                 return None
-            job = dict(row)
-
-            # Fetch skills
-            cur.execute("""
-                SELECT s.id, s.name
-                FROM job_skills js
-                JOIN skills s ON js.skill_id = s.id
-                WHERE js.job_id = %s
-            """, (job_id,))
-            job['required_skills'] = [r['name'] for r in cur.fetchall()]
+            return Job._from_row(row)
+        finally:
+            cur.close()
+            conn.close()
 
-            # Fetch tech stacks
-            cur.execute("""
-                SELECT ts.id, ts.name
-                FROM job_tech_stacks jts
-                JOIN tech_stacks ts ON jts.tech_stack_id = ts.id
-                WHERE jts.job_id = %s
-            """, (job_id,))
-            job['tech_stack'] = [r['name'] for r in cur.fetchall()]
+    @staticmethod
+    def get_by_ids(job_ids):
+        """{id: job} for the ids that exist, one query per IN_CHUNK_SIZE ids"""
+        jobs, missing = identity_map.get_many('job', job_ids)
+        if missing:
+            jobs.update(Job._select_by_ids(missing))
+        return jobs
 
-            return job
+    @staticmethod
+    @read_only
+    def _select_by_ids(job_ids):
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            jobs = {}
+            for chunk in _chunks(job_ids):
+                placeholders = ','.join(['%s'] * len(chunk))
+                cur.execute(Job._SELECT + f" WHERE j.id IN ({placeholders})", chunk)
+                for row in cur.fetchall():
+                    job = Job._from_row(row)
+                    identity_map.remember('job', job['id'], job)
+                    jobs[job['id']] = job
+            return jobs
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
-    def get_by_recruiter(recruiter_id):
+    def loader():
+        """The request's batching loader for get_by_id"""
+        return loader('job', Job.get_by_ids)
+
+    @staticmethod
+    @read_only
+    def get_by_recruiter(recruiter_id, limit=None, cursor=None):
         conn = get_connection()
         cur = conn.cursor()
+        size = page_size(limit)
         try:
-            cur.execute("""
+            query = """
                 SELECT j.*
                 FROM jobs j
                 WHERE j.recruiter_id = %s
-                ORDER BY j.created_at DESC
-            """, (recruiter_id,))
-            rows = cur.fetchall()
-            return rows
+            """
+            params = [recruiter_id]
+            if cursor:
+                condition, cursor_params = keyset_condition(JOB_PAGE_KEY, cursor)
+                query += f" AND {condition}"
+                params.extend(cursor_params)
+            query += order_by(JOB_PAGE_KEY) + " LIMIT %s"
+            params.append(size + 1)
+            cur.execute(query, params)
+            page = Page.from_rows(cur.fetchall(), size, ('created_at', 'id'))
+            applications_counter.attach(cur, page)
+            return page
+        except InvalidCursor:
+            raise
         except Exception as e:
             print(f"Error in get_by_recruiter: {e}")
             traceback.print_exc()
-            return []
+            return Page()
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
+    @read_only
+    def get_ids_by_recruiter(recruiter_id):
+        """Ids of all the recruiter's jobs (index-only scan)"""
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT id FROM jobs WHERE recruiter_id = %s", (recruiter_id,))
+            return [row['id'] for row in cur.fetchall()]
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    @read_only
     def get_recent_by_recruiter(recruiter_id, limit=5):
         conn = get_connection()
         cur = conn.cursor()
@@ -7442,7 +7613,7 @@ class Job:
                 LIMIT %s
             """, (recruiter_id, limit))
             rows = cur.fetchall()
-            return rows
+            return applications_counter.attach(cur, rows)
         except Exception as e:
             print(f"Error in get_recent_by_recruiter: {e}")
             traceback.print_exc()
@@ -7452,47 +7623,231 @@ class Job:
             conn.close()
 
     @staticmethod
-    def search(filters):
-        conn = get_connection()
-        cur = conn.cursor()
-        query = """
-            SELECT j.*, u.first_name, u.last_name,
-                   rp.company_name
-            FROM jobs j
-            JOIN users u ON j.recruiter_id = u.id
-            LEFT JOIN recruiter_profiles rp ON u.id = rp.user_id
-            WHERE j.is_active = TRUE
+    def search(filters, limit=None, cursor=None, facets=False):
+        """A page of matching jobs; with facets=True, page.facets holds the
+        counts from Job.facets() for the whole result set"""
+        page = Job._search(filters, limit, cursor)
+        if facets:
+            page.facets = Job.facets(filters)
+        return page
+
+    @staticmethod
+    def _link_condition(link_table, link_column, name_table, names, match):
+        """Condition on j.id for jobs linked to all (or any) of names"""
+        names = list({name_key(name): name.strip() for name in names}.values())
+        placeholders = ','.join(['%s'] * len(names))
+        if match == 'any':
+            return f"""
+                AND EXISTS (SELECT 1 FROM {link_table} l
+                            JOIN {name_table} n ON l.{link_column} = n.id
+                            WHERE l.job_id = j.id AND n.name IN ({placeholders}))
+            """, names
+        return f"""
+            AND j.id IN (SELECT l.job_id FROM {link_table} l
+                         JOIN {name_table} n ON l.{link_column} = n.id
+                         WHERE n.name IN ({placeholders})
+                         GROUP BY l.job_id
+                         HAVING COUNT(DISTINCT n.id) = %s)
+        """, names + [len(names)]
+
+    @staticmethod
+    def search_conditions(filters):
+        """' AND ...' conditions and params for the non-text search filters.
+
+        skills / tech_stack are lists of names; skills_match / tech_match pick
+        'all' (the default) or 'any'.
         """
-        params = []
-        if filters.get('search'):
-            query += " AND (j.title LIKE %s OR j.description LIKE %s)"
-            search_term = f"%{filters['search']}%"
-            params.extend([search_term, search_term])
+        sql, params = '', []
         if filters.get('experience_level'):
-            query += " AND j.experience_level = %s"
+            sql += " AND j.experience_level = %s"
             params.append(filters['experience_level'])
         if filters.get('min_pay'):
-            query += " AND j.pay_per_hour >= %s"
+            sql += " AND j.pay_per_hour >= %s"
             params.append(filters['min_pay'])
         if filters.get('max_pay'):
-            query += " AND j.pay_per_hour <= %s"
+            sql += " AND j.pay_per_hour <= %s"
             params.append(filters['max_pay'])
         if filters.get('job_type'):
-            query += " AND j.job_type = %s"
+            sql += " AND j.job_type = %s"
             params.append(filters['job_type'])
         if filters.get('is_remote'):
-            query += " AND j.is_remote = TRUE"
-        query += " ORDER BY j.created_at DESC"
+            sql += " AND j.is_remote = TRUE"
+        for link_table, link_column, name_table, names_key, match_key in (
+                ('job_skills', 'skill_id', 'skills', 'skills', 'skills_match'),
+                ('job_tech_stacks', 'tech_stack_id', 'tech_stacks', 'tech_stack', 'tech_match')):
+            names = [name for name in filters.get(names_key) or () if name and name.strip()]
+            if names:
+                link_sql, link_params = Job._link_condition(
+                    link_table, link_column, name_table, names, filters.get(match_key))
+                sql += link_sql
+                params.extend(link_params)
+        return sql, params
+
+    @staticmethod
+    @read_only
+    def _search(filters, limit=None, cursor=None):
+        # Filters and natural-language keyword searches are answered in
+        # memory once the index is built; boolean searches go to FULLTEXT.
+        if filters.get('search_mode', 'natural') == 'natural' or not filters.get('search'):
+            indexed = job_index.search_page(filters.get('search'), filters, page_size(limit), cursor)
+            if indexed is not None:
+                return Job._page_from_index(*indexed, filters)
+
+        conn = get_connection()
+        cur = conn.cursor()
+        match_sql, match_params = None, []
+        if filters.get('search'):
+            match_sql, match_params = job_search_match(filters['search'], filters.get('search_mode', 'natural'))
+        query = f"""
+            SELECT j.*, u.first_name, u.last_name,
+                   rp.company_name{f', {match_sql} AS relevance' if match_sql else ''}
+            FROM jobs j
+            JOIN users u ON j.recruiter_id = u.id
+            LEFT JOIN recruiter_profiles rp ON u.id = rp.user_id
+            WHERE j.is_active = TRUE
+        """
+        params = list(match_params)
+        if match_sql:
+            query += f" AND {match_sql}"
+            params.extend(match_params)
+        filter_sql, filter_params = Job.search_conditions(filters)
+        query += filter_sql
+        params.extend(filter_params)
+        size = page_size(limit)
+        if match_sql:
+            key_columns = ((match_sql, match_params),) + JOB_PAGE_KEY
+            key_order, row_keys = ('relevance',) + JOB_PAGE_KEY, ('relevance', 'created_at', 'id')
+            # Relevance is only comparable within one ranking; see search_page
+            tag = FULLTEXT_CURSOR_TAG
+        else:
+            key_columns = key_order = JOB_PAGE_KEY
+            row_keys, tag = ('created_at', 'id'), None
 
         try:
+            if cursor:
+                condition, cursor_params = keyset_condition(key_columns, cursor, tag)
+                query += f" AND {condition}"
+                params.extend(cursor_params)
+            query += order_by(key_order) + " LIMIT %s"
+            params.append(size + 1)
             cur.execute(query, params)
-            rows = cur.fetchall()
-            return rows
+            page = Page.from_rows(cur.fetchall(), size, row_keys, tag)
+            Job.attach_skills(cur, page)
+            return page
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
+    def facets(filters):
+        """Counts per experience_level, job_type, is_remote and pay_per_hour
+        bucket, plus the most required skills, over every job matching filters.
+
+        Served from the in-memory index when it can answer; otherwise two
+        grouped queries over the matching jobs.
+        """
+        search = filters.get('search')
+        if not search or filters.get('search_mode', 'natural') == 'natural':
+            counts = job_index.facets(search, filters)
+            if counts is not None:
+                return counts
+        return Job._facets_from_db(filters)
+
+    @staticmethod
+    @read_only
+    def _facets_from_db(filters):
+        conn = get_connection()
+        cur = conn.cursor()
+        match_sql, match_params = None, []
+        if filters.get('search'):
+            match_sql, match_params = job_search_match(filters['search'], filters.get('search_mode', 'natural'))
+        filter_sql, filter_params = Job.search_conditions(filters)
+        try:
+            # Derived tables rather than a CTE, which MySQL only has from 8.0
+            matched = f"""
+                SELECT j.id, j.experience_level, j.job_type, j.is_remote,
+                       {pay_bucket_sql('j.pay_per_hour')} AS pay_bucket
+                FROM jobs j
+                WHERE j.is_active = TRUE{f' AND {match_sql}' if match_sql else ''}{filter_sql}
+            """
+            params = list(match_params) + filter_params
+            counts = {'experience_level': Counter(), 'job_type': Counter(), 'is_remote': Counter(),
+                      'pay_per_hour': Counter(), 'skills': Counter()}
+            cur.execute(f"""
+                SELECT experience_level, job_type, is_remote, pay_bucket, COUNT(*) AS count
+                FROM ({matched}) AS matched
+                GROUP BY experience_level, job_type, is_remote, pay_bucket
+            """, params)
+            for row in cur.fetchall():
+                counts['experience_level'][row['experience_level'] or ''] += row['count']
+                counts['job_type'][row['job_type'] or ''] += row['count']
+                counts['is_remote'][bool(row['is_remote'])] += row['count']
+                counts['pay_per_hour'][row['pay_bucket']] += row['count']
+            cur.execute(f"""
+                SELECT s.name, COUNT(*) AS count
+                FROM ({matched}) AS matched
+                JOIN job_skills js ON js.job_id = matched.id
+                JOIN skills s ON js.skill_id = s.id
+                GROUP BY s.name
+                ORDER BY count DESC
+                LIMIT %s
+            """, params + [FACET_TOP_SKILLS])
+            for row in cur.fetchall():
+                counts['skills'][row['name']] += row['count']
+            return facet_result(counts['experience_level'], counts['job_type'], counts['is_remote'],
+                                counts['pay_per_hour'], counts['skills'])
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def matches_filters(job, filters):
+        """Whether a loaded job (with required_skills and tech_stack names)
+        passes the non-text filters, as search_conditions() would have it"""
+        if filters.get('experience_level') and job['experience_level'] != filters['experience_level']:
+            return False
+        if filters.get('job_type') and job['job_type'] != filters['job_type']:
+            return False
+        if filters.get('is_remote') and not job['is_remote']:
+            return False
+        pay = float(job['pay_per_hour'] or 0)
+        if filters.get('min_pay') and pay < float(filters['min_pay']):
+            return False
+        if filters.get('max_pay') and pay > float(filters['max_pay']):
+            return False
+        for names_key, match_key, job_key in (('skills', 'skills_match', 'required_skills'),
+                                              ('tech_stack', 'tech_match', 'tech_stack')):
+            wanted = {name_key(name) for name in filters.get(names_key) or () if name and name.strip()}
+            if not wanted:
+                continue
+            have = {name_key(name) for name in job.get(job_key) or ()}
+            if not (wanted & have if filters.get(match_key) == 'any' else wanted <= have):
+                return False
+        return True
+
+    @staticmethod
+    def _page_from_index(ranked, next_cursor, filters):
+        """Job.search results for a page from job_index.search_page().
+
+        The index can trail changes made by other processes by up to one
+        sync, so the reloaded rows are checked against the filters again and
+        jobs that no longer match are dropped (the page may come out short;
+        its cursor is still right). Keyword relevance is not rechecked: a
+        job whose text changed keeps its old rank until the next sync.
+        """
+        jobs = Job.get_by_ids([entry[-1] for entry in ranked])
+        page = Page(next_cursor=next_cursor)
+        for entry in ranked:
+            job = jobs.get(entry[-1])
+            if job and job['is_active'] and Job.matches_filters(job, filters):
+                job.pop('email', None)
+                if len(entry) == 3:
+                    job['relevance'] = entry[0]
+                page.append(job)
+        return page
+
+    @staticmethod
+    @read_only
     def get_recommended_for_freelancer(freelancer_id, limit=5):
         conn = get_connection()
         cur = conn.cursor()
@@ -7537,6 +7892,10 @@ class Job:
         query = f"UPDATE jobs SET {', '.join(fields)} WHERE id = %s AND recruiter_id = %s"
         try:
             cur.execute(query, tuple(values))
+            identity_map.forget('job', job_id)
+            # Application rows carry the job title
+            identity_map.forget('application')
+            conn.on_commit(lambda: job_index.refresh([job_id]))
             conn.commit()
             return cur.rowcount > 0
         except Exception as e:
@@ -7556,9 +7915,16 @@ class Job:
                 UPDATE jobs SET is_active = NOT is_active, updated_at = %s
                 WHERE id = %s AND recruiter_id = %s
             """, (datetime.now(), job_id, recruiter_id))
-            conn.commit()
+            toggled = cur.rowcount > 0
             cur.execute("SELECT is_active FROM jobs WHERE id = %s", (job_id,))
             row = cur.fetchone()
+            if toggled and row:
+                UserStats.add(cur, recruiter_id, jobs_active=1 if row['is_active'] else -1)
+                identity_map.forget('job', job_id)
+                conn.on_commit(lambda: job_index.refresh([job_id]))
+                if row['is_active']:
+                    conn.on_commit(lambda: job_alerts.enqueue(job_id))
+            conn.commit()
             return row['is_active'] if row else None
         except Exception as e:
             conn.rollback()
@@ -7573,9 +7939,19 @@ class Job:
         conn = get_connection()
         cur = conn.cursor()
         try:
+            cur.execute("SELECT recruiter_id, is_active FROM jobs WHERE id = %s FOR UPDATE", (job_id,))
+            job = cur.fetchone()
+            if not job:
+                return False
+            # Applications go with the job (ON DELETE CASCADE)
+            UserStats.remove_job_applications(cur, job_id)
             cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
+            UserStats.add(cur, job['recruiter_id'], jobs_total=-1, jobs_active=-1 if job['is_active'] else 0)
+            identity_map.forget('job', job_id)
+            identity_map.forget('application')
+            conn.on_commit(lambda: job_index.refresh([job_id]))
             conn.commit()
-            return cur.rowcount > 0
+            return True
         except Exception as e:
             conn.rollback()
             print(f"Error deleting job: {e}")
@@ -7586,59 +7962,77 @@ class Job:
 
 # ==================== JobApplication Model ====================
 class JobApplication:
+    # Reasons JobApplication.apply() can fail
+    ALREADY_APPLIED = 'already_applied'
+    NOT_FOUND = 'not_found'
+
     @staticmethod
-    def create(job_id, freelancer_id, application_data):
+    def apply(job_id, freelancer_id, application_data):
+        """Insert an application in one statement; returns (application_id, error).
+
+        The profile id is taken by INSERT ... SELECT, so a missing job or
+        profile inserts nothing (NOT_FOUND), and a second application for the
+        same job is rejected by the unique_application key (ALREADY_APPLIED)
+        rather than by a racy SELECT beforehand.
+        """
         conn = get_connection()
         cur = conn.cursor()
         try:
-            # Check if already applied
-            cur.execute("""
-                SELECT id FROM job_applications
-                WHERE job_id = %s AND freelancer_id = %s
-            """, (job_id, freelancer_id))
-            if cur.fetchone():
-                return None
-
-            # Get freelancer profile id
-            cur.execute("SELECT id FROM freelancer_profiles WHERE user_id = %s", (freelancer_id,))
-            profile_row = cur.fetchone()
-            if not profile_row:
-                return None
-            freelancer_profile_id = profile_row['id']
-
-            cur.execute("""
-                INSERT INTO job_applications (
-                    job_id, freelancer_id, freelancer_profile_id, cover_letter,
-                    proposed_rate, availability_date, status, applied_at, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                job_id,
-                freelancer_id,
-                freelancer_profile_id,
-                application_data.get('cover_letter', ''),
-                application_data.get('proposed_rate'),
-                application_data.get('availability_date'),
-                'applied',
-                datetime.now(),
-                datetime.now()
-            ))
+            now = datetime.now()
+            try:
+                cur.execute("""
+                    INSERT INTO job_applications (
+                        job_id, freelancer_id, freelancer_profile_id, cover_letter,
+                        proposed_rate, availability_date, status, applied_at, updated_at
+                    )
+                    SELECT j.id, fp.user_id, fp.id, %s, %s, %s, 'applied', %s, %s
+                    FROM jobs j
+                    JOIN freelancer_profiles fp ON fp.user_id = %s
+                    WHERE j.id = %s
+                """, (
+                    application_data.get('cover_letter', ''),
+                    application_data.get('proposed_rate'),
+                    application_data.get('availability_date'),
+                    now,
+                    now,
+                    freelancer_id,
+                    job_id
+                ))
+            except IntegrityError as e:
+                if e.args[0] != ER_DUP_ENTRY:
+                    raise
+                # Only the failed statement is undone; the caller's
+                # transaction is left as it was.
+                return None, JobApplication.ALREADY_APPLIED
+            if not cur.rowcount:
+                return None, JobApplication.NOT_FOUND
             app_id = cur.lastrowid
 
-            # ✅ Update the job's applications_count
-            cur.execute("UPDATE jobs SET applications_count = applications_count + 1 WHERE id = %s", (job_id,))
+            # ✅ Update the job's applications_count (sharded, no hot row lock)
+            applications_counter.add(cur, job_id, 1)
+            UserStats.add_application(cur, freelancer_id, job_id, applications_total=1, applications_applied=1)
+            identity_map.forget('job', job_id)
 
             conn.commit()
-            return app_id
+            return app_id, None
         except Exception as e:
             conn.rollback()
             print(f"Error creating job application: {e}")
             traceback.print_exc()
-            return None
+            return None, None
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
+    def create(job_id, freelancer_id, application_data):
+        """Application id, or None if it could not be created"""
+        app_id, _ = JobApplication.apply(job_id, freelancer_id, application_data)
+        return app_id
+
+    @staticmethod
+    @identity_map.mapped('application')
+    @read_only
     def get_by_id(application_id):
         conn = get_connection()
         cur = conn.cursor()
@@ -7666,11 +8060,13 @@ class JobApplication:
             conn.close()
 
     @staticmethod
-    def get_by_freelancer(freelancer_id):
+    @read_only
+    def get_by_freelancer(freelancer_id, limit=None, cursor=None):
         conn = get_connection()
         cur = conn.cursor()
+        size = page_size(limit)
         try:
-            cur.execute("""
+            query = """
                 SELECT ja.*, j.title, j.pay_per_hour, j.experience_level, j.job_type,
                        u.first_name, u.last_name, rp.company_name
                 FROM job_applications ja
@@ -7678,15 +8074,22 @@ class JobApplication:
                 JOIN users u ON j.recruiter_id = u.id
                 LEFT JOIN recruiter_profiles rp ON u.id = rp.user_id
                 WHERE ja.freelancer_id = %s
-                ORDER BY ja.applied_at DESC
-            """, (freelancer_id,))
-            rows = cur.fetchall()
-            return rows
+            """
+            params = [freelancer_id]
+            if cursor:
+                condition, cursor_params = keyset_condition(APPLICATION_PAGE_KEY, cursor)
+                query += f" AND {condition}"
+                params.extend(cursor_params)
+            query += order_by(APPLICATION_PAGE_KEY) + " LIMIT %s"
+            params.append(size + 1)
+            cur.execute(query, params)
+            return Page.from_rows(cur.fetchall(), size, ('applied_at', 'id'))
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
+    @read_only
     def get_recent_by_freelancer(freelancer_id, limit=5):
         conn = get_connection()
         cur = conn.cursor()
@@ -7708,40 +8111,73 @@ class JobApplication:
             conn.close()
 
     @staticmethod
-    def get_by_job(job_id):
+    @read_only
+    def get_by_job(job_id, include_details=False, limit=None, cursor=None):
+        """Applicants for a job with their skills; include_details adds
+        proficiency levels and tech stacks. Always 2-3 queries in total."""
         conn = get_connection()
         cur = conn.cursor()
+        size = page_size(limit)
         try:
-            cur.execute("""
+            query = """
                 SELECT ja.*, u.first_name, u.last_name, u.email as freelancer_email,
-                       fp.hourly_rate
+                       fp.hourly_rate, fp.id as freelancer_profile_id
                 FROM job_applications ja
                 JOIN users u ON ja.freelancer_id = u.id
                 LEFT JOIN freelancer_profiles fp ON u.id = fp.user_id
                 WHERE ja.job_id = %s
-                ORDER BY ja.applied_at DESC
-            """, (job_id,))
-            rows = cur.fetchall()
-            apps = []
-            for row in rows:
-                app = dict(row)
-                # Fetch skills separately if needed
-                cur2 = conn.cursor()
-                cur2.execute("""
-                    SELECT s.name
+            """
+            params = [job_id]
+            if cursor:
+                condition, cursor_params = keyset_condition(APPLICATION_PAGE_KEY, cursor)
+                query += f" AND {condition}"
+                params.extend(cursor_params)
+            query += order_by(APPLICATION_PAGE_KEY) + " LIMIT %s"
+            params.append(size + 1)
+            cur.execute(query, params)
+            apps = Page.from_rows((dict(row) for row in cur.fetchall()), size, ('applied_at', 'id'))
+            by_profile = {}
+            for app in apps:
+                app['skills'] = []
+                if include_details:
+                    app['skill_details'] = []
+                    app['tech_stack'] = []
+                if app['freelancer_profile_id'] is not None:
+                    by_profile.setdefault(app['freelancer_profile_id'], []).append(app)
+            profile_ids = list(by_profile)
+
+            for start in range(0, len(profile_ids), IN_CHUNK_SIZE):
+                chunk = profile_ids[start:start + IN_CHUNK_SIZE]
+                placeholders = ','.join(['%s'] * len(chunk))
+                cur.execute(f"""
+                    SELECT fs.freelancer_profile_id, s.name, fs.proficiency_level
                     FROM freelancer_skills fs
                     JOIN skills s ON fs.skill_id = s.id
-                    WHERE fs.freelancer_profile_id = (SELECT id FROM freelancer_profiles WHERE user_id = %s)
-                """, (app['freelancer_id'],))
-                app['skills'] = [r['name'] for r in cur2.fetchall()]
-                cur2.close()
-                apps.append(app)
+                    WHERE fs.freelancer_profile_id IN ({placeholders})
+                """, chunk)
+                for r in cur.fetchall():
+                    for app in by_profile[r['freelancer_profile_id']]:
+                        app['skills'].append(r['name'])
+                        if include_details:
+                            app['skill_details'].append({'name': r['name'], 'proficiency_level': r['proficiency_level']})
+
+                if include_details:
+                    cur.execute(f"""
+                        SELECT fts.freelancer_profile_id, ts.name, fts.experience_years
+                        FROM freelancer_tech_stacks fts
+                        JOIN tech_stacks ts ON fts.tech_stack_id = ts.id
+                        WHERE fts.freelancer_profile_id IN ({placeholders})
+                    """, chunk)
+                    for r in cur.fetchall():
+                        for app in by_profile[r['freelancer_profile_id']]:
+                            app['tech_stack'].append({'name': r['name'], 'experience_years': r['experience_years']})
             return apps
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
+    @read_only
     def get_by_job_and_freelancer(job_id, freelancer_id):
         conn = get_connection()
         cur = conn.cursor()
@@ -7757,6 +8193,7 @@ class JobApplication:
             conn.close()
 
     @staticmethod
+    @read_only
     def get_recent_for_recruiter(recruiter_id, limit=5):
         conn = get_connection()
         cur = conn.cursor()
@@ -7791,6 +8228,13 @@ class JobApplication:
             elif status == 'rejected':
                 rejected_at = datetime.now()
 
+            cur.execute("""
+                SELECT freelancer_id, job_id, status FROM job_applications WHERE id = %s FOR UPDATE
+            """, (application_id,))
+            current = cur.fetchone()
+            if not current:
+                return None
+
             cur.execute("""
                 UPDATE job_applications
                 SET status = %s, recruiter_notes = %s, updated_at = %s,
@@ -7799,8 +8243,15 @@ class JobApplication:
                     rejected_at = COALESCE(%s, rejected_at)
                 WHERE id = %s
             """, (status, recruiter_notes, datetime.now(), reviewed_at, accepted_at, rejected_at, application_id))
+            updated = cur.rowcount
+            identity_map.forget('application', application_id)
+            if updated and current['status'] != status:
+                UserStats.add_application(cur, current['freelancer_id'], current['job_id'], **{
+                    f"applications_{current['status']}": -1,
+                    f"applications_{status}": 1
+                })
             conn.commit()
-            if cur.rowcount > 0:
+            if updated > 0:
                 return JobApplication.get_by_id(application_id)
             return None
         except Exception as e:
@@ -7816,12 +8267,27 @@ class JobApplication:
         conn = get_connection()
         cur = conn.cursor()
         try:
+            cur.execute("""
+                SELECT job_id, status FROM job_applications
+                WHERE id = %s AND freelancer_id = %s
+                FOR UPDATE
+            """, (application_id, freelancer_id))
+            application = cur.fetchone()
+            if not application:
+                return False
             cur.execute("""
                 DELETE FROM job_applications
                 WHERE id = %s AND freelancer_id = %s
             """, (application_id, freelancer_id))
+            applications_counter.add(cur, application['job_id'], -1)
+            UserStats.add_application(cur, freelancer_id, application['job_id'], **{
+                'applications_total': -1,
+                f"applications_{application['status']}": -1
+            })
+            identity_map.forget('application', application_id)
+            identity_map.forget('job', application['job_id'])
             conn.commit()
-            return cur.rowcount > 0
+            return True
         except Exception as e:
             conn.rollback()
             print(f"Error withdrawing application: {e}")
@@ -7831,14 +8297,16 @@ class JobApplication:
             conn.close()
 
     @staticmethod
-    def get_by_job_ids(job_ids):
+    @read_only
+    def get_by_job_ids(job_ids, limit=None, cursor=None):
         if not job_ids:
-            return []
+            return Page()
         placeholders = ','.join(['%s'] * len(job_ids))
         conn = get_connection()
         cur = conn.cursor()
+        size = page_size(limit)
         try:
-            cur.execute(f"""
+            query = f"""
                 SELECT ja.*, j.title as job_title,
                        CONCAT(u.first_name, ' ', u.last_name) as freelancer_name,
                        u.email as freelancer_email
@@ -7846,10 +8314,16 @@ class JobApplication:
                 JOIN jobs j ON ja.job_id = j.id
                 JOIN users u ON ja.freelancer_id = u.id
                 WHERE ja.job_id IN ({placeholders})
-                ORDER BY ja.applied_at DESC
-            """, job_ids)
-            rows = cur.fetchall()
-            return rows
+            """
+            params = list(job_ids)
+            if cursor:
+                condition, cursor_params = keyset_condition(APPLICATION_PAGE_KEY, cursor)
+                query += f" AND {condition}"
+                params.extend(cursor_params)
+            query += order_by(APPLICATION_PAGE_KEY) + " LIMIT %s"
+            params.append(size + 1)
+            cur.execute(query, params)
+            return Page.from_rows(cur.fetchall(), size, ('applied_at', 'id'))
         finally:
             cur.close()
             conn.close()
@@ -7884,9 +8358,30 @@ class Notification:
             conn.close()
 
     @staticmethod
-    def get_by_user(user_id, unread_only=False, limit=50):
+    def create_many(cur, notifications):
+        """Insert notifications (dicts of create()'s arguments) in the caller's transaction"""
+        if not notifications:
+            return 0
+        now = datetime.now()
+        cur.executemany("""
+            INSERT INTO notifications (
+                user_id, title, message, notification_type,
+                related_application_id, related_job_id,
+                is_read, created_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, [(
+            n['user_id'], n['title'], n['message'], n['notification_type'],
+            n.get('related_application_id'), n.get('related_job_id'),
+            False, now
+        ) for n in notifications])
+        return len(notifications)
+
+    @staticmethod
+    @read_only
+    def get_by_user(user_id, unread_only=False, limit=None, cursor=None):
         conn = get_connection()
         cur = conn.cursor()
+        size = page_size(limit)
         try:
             query = """
                 SELECT id, user_id, title, message, notification_type,
@@ -7897,22 +8392,24 @@ class Notification:
             params = [user_id]
             if unread_only:
                 query += " AND is_read = FALSE"
-            query += " ORDER BY created_at DESC LIMIT %s"
-            params.append(limit)
+            if cursor:
+                condition, cursor_params = keyset_condition(NOTIFICATION_PAGE_KEY, cursor)
+                query += f" AND {condition}"
+                params.extend(cursor_params)
+            query += order_by(NOTIFICATION_PAGE_KEY) + " LIMIT %s"
+            params.append(size + 1)
 
             cur.execute(query, params)
-            rows = cur.fetchall()
-            notifs = []
-            for row in rows:
-                notif = dict(row)
+            notifs = Page.from_rows((dict(row) for row in cur.fetchall()), size, ('created_at', 'id'))
+            for notif in notifs:
                 notif['created_at'] = notif['created_at'].isoformat() if notif['created_at'] else None
-                notifs.append(notif)
             return notifs
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
+    @read_only
     def get_unread_count(user_id):
         conn = get_connection()
         cur = conn.cursor()
@@ -7963,4 +8460,286 @@ class Notification:
             return 0
         finally:
             cur.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+# ==================== SavedSearch Model ====================
+MAX_SAVED_SEARCHES = 20
+# Job.search filters a saved search may hold
+SAVED_SEARCH_FILTERS = ('search', 'search_mode', 'experience_level', 'min_pay', 'max_pay', 'job_type',
+                        'is_remote', 'skills', 'skills_match', 'tech_stack', 'tech_match')
+
+
+class SavedSearch:
+    @staticmethod
+    def normalize(filters):
+        """The Job.search filters in filters, with empty ones dropped; raises
+        ValueError for values Job.search would reject"""
+        if not isinstance(filters, dict):
+            raise ValueError('filters must be an object')
+        unknown = sorted(set(filters) - set(SAVED_SEARCH_FILTERS))
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(unknown)}")
+        result = {}
+        if filters.get('search') and str(filters['search']).strip():
+            result['search'] = str(filters['search']).strip()
+        for key in ('experience_level', 'job_type'):
+            if parse_choice(filters.get(key)):
+                result[key] = parse_choice(filters[key])
+        for key in ('min_pay', 'max_pay'):
+            if filters.get(key) not in (None, ''):
+                try:
+                    result[key] = float(filters[key])
+                except (TypeError, ValueError):
+                    raise ValueError(f"{key} must be a number")
+        if filters.get('is_remote') in (True, 'true'):
+            result['is_remote'] = True
+        for key in ('skills', 'tech_stack'):
+            value = filters.get(key)
+            names = parse_names(value) if isinstance(value, str) else [
+                str(name).strip() for name in value or () if str(name).strip()]
+            if names:
+                result[key] = names
+        if result.get('search'):
+            result['search_mode'] = filters.get('search_mode') or 'natural'
+            if result['search_mode'] not in SEARCH_MODES:
+                raise ValueError(f"search_mode must be one of: {', '.join(SEARCH_MODES)}")
+        for key in ('skills_match', 'tech_match'):
+            mode = filters.get(key) or 'all'
+            if mode not in MATCH_MODES:
+                raise ValueError(f"{key} must be one of: {', '.join(MATCH_MODES)}")
+            if mode != 'all':
+                result[key] = mode
+        if not result:
+            raise ValueError('At least one filter is required')
+        return result
+
+    @staticmethod
+    def _from_row(row):
+        row['filters'] = json.loads(row['filters']) if isinstance(row['filters'], (str, bytes)) else row['filters']
+        return row
+
+    @staticmethod
+    def create(user_id, name, filters):
+        """Id of the new saved search; raises ValueError for invalid filters or
+        when the user already has MAX_SAVED_SEARCHES"""
+        filters = SavedSearch.normalize(filters)
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT COUNT(*) AS total FROM saved_searches WHERE user_id = %s FOR UPDATE", (user_id,))
+            if cur.fetchone()['total'] >= MAX_SAVED_SEARCHES:
+                raise ValueError(f"You can save at most {MAX_SAVED_SEARCHES} searches")
+            cur.execute("""
+                INSERT INTO saved_searches (user_id, name, filters, is_active)
+                VALUES (%s, %s, %s, TRUE)
+            """, (user_id, name, json.dumps(filters)))
+            search_id = cur.lastrowid
+            conn.on_commit(lambda: job_alerts.refresh_searches([search_id]))
+            conn.commit()
+            return search_id
+        except ValueError:
+            conn.rollback()
+            raise
+        except Exception as e:
+            conn.rollback()
+            print(f"Error creating saved search: {e}")
+            return None
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    @read_only
+    def get_by_user(user_id):
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT id, name, filters, is_active, created_at, updated_at
+                FROM saved_searches
+                WHERE user_id = %s
+                ORDER BY created_at DESC, id DESC
+            """, (user_id,))
+            return [SavedSearch._from_row(row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def delete(search_id, user_id):
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("DELETE FROM saved_searches WHERE id = %s AND user_id = %s", (search_id, user_id))
+            deleted = cur.rowcount > 0
+            if deleted:
+                conn.on_commit(lambda: job_alerts.refresh_searches([search_id]))
+            conn.commit()
+            return deleted
+        except Exception as e:
+            conn.rollback()
+            print(f"Error deleting saved search: {e}")
+            return False
+        finally:
+            cur.close()
+            conn.close()
+
+# ==================== UserStats Model ====================
+APPLICATION_STATUSES = ('applied', 'reviewed', 'shortlisted', 'accepted', 'rejected')
+APPLICATION_COUNTERS = ('applications_total',) + tuple(f'applications_{status}' for status in APPLICATION_STATUSES)
+USER_STATS_COUNTERS = ('jobs_total', 'jobs_active') + APPLICATION_COUNTERS
+PROFILE_COMPLETION_FIELDS = ['bio', 'hourly_rate', 'education', 'experience', 'years_of_experience']
+
+
+def profile_completion(profile, has_skills):
+    """Percentage of the freelancer profile that is filled in"""
+    fields = list(PROFILE_COMPLETION_FIELDS)
+    filled = sum(1 for f in fields if profile.get(f))
+    if has_skills:
+        filled += 1
+        fields.append('skills')
+    return int((filled / len(fields)) * 100) if fields else 0
+
+
+class UserStats:
+    """Dashboard counters per user, maintained in the same transaction as the
+    writes they count. Applications count once for the freelancer who sent
+    them and once for the recruiter who received them; the recruiter's side
+    goes to slot rows (counters.recruiter_applications) so that applicants to
+    the same recruiter do not queue on one row."""
+
+    @staticmethod
+    def _upsert_sql(columns, select_sql):
+        # The SELECT (possibly a UNION) goes in a derived table so that the
+        # UPDATE clause can only mean user_stats columns and inserted VALUES().
+        updates = ', '.join(f"user_stats.{c} = user_stats.{c} + VALUES({c})" for c in columns)
+        return f"""
+            INSERT INTO user_stats (user_id, {', '.join(columns)})
+            SELECT * FROM ({select_sql}) AS delta
+            ON DUPLICATE KEY UPDATE {updates}
+        """
+
+    @staticmethod
+    def _check(columns, allowed):
+        # Column names go into the SQL text; only ever our own
+        unknown = [c for c in columns if c not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown user_stats counters: {', '.join(unknown)}")
+
+    @staticmethod
+    def add(cur, user_id, **deltas):
+        """Add deltas (column=+n/-n) to one user's counters"""
+        deltas = {c: d for c, d in deltas.items() if d}
+        if not deltas:
+            return
+        columns = list(deltas)
+        UserStats._check(columns, USER_STATS_COUNTERS)
+        select_sql = f"SELECT %s AS user_id, {', '.join(f'%s AS {c}' for c in columns)}"
+        cur.execute(UserStats._upsert_sql(columns, select_sql), [user_id] + [deltas[c] for c in columns])
+
+    @staticmethod
+    def add_application(cur, freelancer_id, job_id, **deltas):
+        """Add the same deltas to the freelancer and to the recruiter who owns the job"""
+        UserStats._check(deltas, APPLICATION_COUNTERS)
+        UserStats.add(cur, freelancer_id, **deltas)
+        recruiter_applications.add(cur, "SELECT recruiter_id AS user_id FROM jobs WHERE id = %s", (job_id,), deltas)
+
+    @staticmethod
+    def remove_job_applications(cur, job_id):
+        """Subtract every application of a job, before the job (and by cascade its applications) is deleted"""
+        negated = ', '.join(f"-SUM(ja.status = '{s}') AS applications_{s}" for s in APPLICATION_STATUSES)
+        columns = list(APPLICATION_COUNTERS)
+        cur.execute(UserStats._upsert_sql(columns, f"""
+            SELECT ja.freelancer_id AS user_id, -COUNT(*) AS applications_total, {negated}
+            FROM job_applications ja WHERE ja.job_id = %s
+            GROUP BY ja.freelancer_id
+            UNION ALL
+            SELECT j.recruiter_id, -COUNT(*), {negated}
+            FROM job_applications ja JOIN jobs j ON ja.job_id = j.id
+            WHERE ja.job_id = %s
+            GROUP BY j.recruiter_id
+        """), (job_id, job_id))
+
+    @staticmethod
+    def refresh_profile_completion(cur, profile_id):
+        cur.execute(f"""
+            SELECT fp.user_id, {', '.join(f'fp.{f}' for f in PROFILE_COMPLETION_FIELDS)},
+                   EXISTS(SELECT 1 FROM freelancer_skills fs WHERE fs.freelancer_profile_id = fp.id) AS has_skills
+            FROM freelancer_profiles fp WHERE fp.id = %s
+        """, (profile_id,))
+        row = cur.fetchone()
+        if row:
+            cur.execute("""
+                INSERT INTO user_stats (user_id, profile_completion) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE profile_completion = VALUES(profile_completion)
+            """, (row['user_id'], profile_completion(row, bool(row['has_skills']))))
+
+    @staticmethod
+    @read_only
+    def get(user_id):
+        """Counters for one user; all zero if the user has no activity yet"""
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(f"""
+                SELECT {', '.join(USER_STATS_COUNTERS)}, profile_completion
+                FROM user_stats WHERE user_id = %s
+            """, (user_id,))
+            row = cur.fetchone()
+            stats = dict(row) if row else dict.fromkeys(USER_STATS_COUNTERS + ('profile_completion',), 0)
+            for column, delta in recruiter_applications.pending(cur, [user_id]).get(user_id, {}).items():
+                stats[column] += delta
+            return stats
+        finally:
+            cur.close()
+            conn.close()
+
+    @staticmethod
+    def rebuild(cur, user_ids=None):
+        """Recompute counters from the source tables for user_ids (default: everyone)"""
+        user_filter, params = '', []
+        if user_ids:
+            user_filter = f"WHERE u.id IN ({','.join(['%s'] * len(user_ids))})"
+            params = list(user_ids)
+        status_sums = ', '.join(f"SUM(ja.status = '{s}') AS applications_{s}" for s in APPLICATION_STATUSES)
+        app_columns = APPLICATION_COUNTERS
+        app_values = ', '.join(f"COALESCE(sent.{c}, 0) + COALESCE(received.{c}, 0)" for c in app_columns)
+        cur.execute(f"""
+            INSERT INTO user_stats (user_id, {', '.join(USER_STATS_COUNTERS)})
+            SELECT u.id, COALESCE(posted.jobs_total, 0), COALESCE(posted.jobs_active, 0), {app_values}
+            FROM users u
+            LEFT JOIN (
+                SELECT recruiter_id, COUNT(*) AS jobs_total, SUM(is_active) AS jobs_active
+                FROM jobs GROUP BY recruiter_id
+            ) posted ON posted.recruiter_id = u.id
+            LEFT JOIN (
+                SELECT ja.freelancer_id AS user_id, COUNT(*) AS applications_total, {status_sums}
+                FROM job_applications ja GROUP BY ja.freelancer_id
+            ) sent ON sent.user_id = u.id
+            LEFT JOIN (
+                SELECT j.recruiter_id AS user_id, COUNT(*) AS applications_total, {status_sums}
+                FROM job_applications ja JOIN jobs j ON ja.job_id = j.id GROUP BY j.recruiter_id
+            ) received ON received.user_id = u.id
+            {user_filter}
+            ON DUPLICATE KEY UPDATE {', '.join(f'user_stats.{c} = VALUES({c})' for c in USER_STATS_COUNTERS)}
+        """, params)
+        rebuilt = cur.rowcount
+
+        profile_filter = user_filter.replace('u.id', 'fp.user_id')
+        cur.execute(f"""
+            SELECT fp.user_id, {', '.join(f'fp.{f}' for f in PROFILE_COMPLETION_FIELDS)},
+                   EXISTS(SELECT 1 FROM freelancer_skills fs WHERE fs.freelancer_profile_id = fp.id) AS has_skills
+            FROM freelancer_profiles fp {profile_filter}
+        """, params)
+        completions = [(row['user_id'], profile_completion(row, bool(row['has_skills']))) for row in cur.fetchall()]
+        if completions:
+            cur.executemany("""
+                INSERT INTO user_stats (user_id, profile_completion) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE profile_completion = VALUES(profile_completion)
+            """, completions)
+        # The recomputed rows already include what the slots held
+        if user_ids:
+            recruiter_applications.clear(cur, list(user_ids))
+        else:
+            cur.execute(f"DELETE FROM {recruiter_applications.slot_table}")
+        return rebuilt
@@ -0,0 +1,486 @@
+"""Job alerts for saved searches.
+
+A saved search holds the same filters Job.search takes. Rather than running
+every saved search against the jobs table, the searches themselves are indexed
+in memory, each under one anchor key taken from its most selective filter:
+
+    a skill, else a tech stack name, else a keyword, else the experience
+    level, else the job type, else the pay ranges it covers, else remote,
+    else a wildcard
+
+An all-of skill list needs only one of its skills as the anchor, since any
+job matching the search has all of them; an any-of list is filed under each
+one. A new job looks up the keys it could satisfy (each of its skills, tech
+stack names and words, its level, type, pay bucket and remote flag), and only
+the searches found there are checked against it in full. Boolean-mode keyword
+searches are checked with their FULLTEXT query, one query per search for the
+whole batch of jobs.
+
+Jobs are queued when they are created or reactivated and percolated in
+batches by a background thread. Matches are written in one transaction: a
+row in job_alerts per user and job (so a user hears about a job once, however
+many of their searches match it, and not again if it is reactivated) and a
+notification per alert, both inserted in bulk. Saved searches changed by other
+processes are picked up by a periodic reload.
+
+    python -m database.percolator backfill --since-id 1200
+    python -m database.percolator backfill 1201 1202 1207
+"""
+import os
+import sys
+import json
+import time
+import threading
+from database.db_config import get_pool
+from database.taxonomy import name_key
+from database.search_index import load_active_jobs, tokenize, pay_bucket, PAY_BUCKETS, PAY_BUCKET_LABELS
+
+PERCOLATE_INTERVAL = float(os.getenv('JOB_ALERT_INTERVAL', 5))
+RELOAD_INTERVAL = float(os.getenv('JOB_ALERT_RELOAD_INTERVAL', 60))
+BATCH_SIZE = int(os.getenv('JOB_ALERT_BATCH_SIZE', 500))
+
+WILDCARD = ('all',)
+
+
+def _pay_ranges():
+    lowers = (0,) + PAY_BUCKETS
+    uppers = PAY_BUCKETS + (None,)
+    return list(zip(PAY_BUCKET_LABELS, lowers, uppers))
+
+
+_PAY_RANGES = _pay_ranges()
+
+
+def _names(value):
+    return [name for name in value or () if name and name.strip()]
+
+
+class SavedQuery:
+    """One saved search, compiled for matching against job documents"""
+    __slots__ = ('id', 'user_id', 'name', 'level', 'job_type', 'remote', 'min_pay', 'max_pay',
+                 'skills', 'skills_any', 'techs', 'techs_any', 'terms', 'search', 'boolean')
+
+    def __init__(self, search_id, user_id, name, filters):
+        self.id = search_id
+        self.user_id = user_id
+        self.name = name
+        self.level = filters.get('experience_level') or None
+        self.job_type = filters.get('job_type') or None
+        self.remote = bool(filters.get('is_remote'))
+        # Same truthiness as Job.search_conditions: 0 means no bound
+        self.min_pay = float(filters['min_pay']) if filters.get('min_pay') else None
+        self.max_pay = float(filters['max_pay']) if filters.get('max_pay') else None
+        self.skills = frozenset(name_key(name) for name in _names(filters.get('skills')))
+        self.skills_any = filters.get('skills_match') == 'any'
+        self.techs = frozenset(name_key(name) for name in _names(filters.get('tech_stack')))
+        self.techs_any = filters.get('tech_match') == 'any'
+        self.search = filters.get('search') or None
+        self.terms = frozenset(tokenize(self.search)) if self.search else None
+        # Short words and stopwords only: job_search_match turns these into
+        # prefix queries, so they are checked in SQL like boolean searches
+        self.boolean = bool(self.search) and (filters.get('search_mode') == 'boolean' or not self.terms)
+        if self.boolean:
+            self.terms = None
+
+    def anchors(self):
+        """Keys to file this search under; a matching job has at least one of them"""
+        for kind, keys, any_of in (('skill', self.skills, self.skills_any),
+                                   ('tech', self.techs, self.techs_any)):
+            if keys:
+                return [(kind, key) for key in keys] if any_of else [(kind, min(keys))]
+        if self.terms:
+            return [('term', term) for term in self.terms]
+        if self.level:
+            return [('level', self.level)]
+        if self.job_type:
+            return [('type', self.job_type)]
+        if self.min_pay is not None or self.max_pay is not None:
+            return [('pay', label) for label, lower, upper in _PAY_RANGES
+                    if (self.max_pay is None or lower <= self.max_pay)
+                    and (self.min_pay is None or upper is None or self.min_pay < upper)]
+        if self.remote:
+            return [('remote', True)]
+        return [WILDCARD]
+
+    def matches(self, doc):
+        """Every filter but a boolean-mode keyword search"""
+        if self.level and doc['level'] != self.level:
+            return False
+        if self.job_type and doc['type'] != self.job_type:
+            return False
+        if self.remote and not doc['remote']:
+            return False
+        if self.min_pay is not None and doc['pay'] < self.min_pay:
+            return False
+        if self.max_pay is not None and doc['pay'] > self.max_pay:
+            return False
+        for keys, any_of, have in ((self.skills, self.skills_any, doc['skills']),
+                                   (self.techs, self.techs_any, doc['techs'])):
+            if keys and not (keys & have if any_of else keys <= have):
+                return False
+        if self.search and not self.boolean and not self.terms & doc['terms']:
+            return False
+        return True
+
+
+def job_document(row):
+    """What a saved search is matched against, from a search_index row"""
+    skill_names = (row.get('skill_names') or '').split('\n')
+    tech_names = (row.get('tech_names') or '').split('\n')
+    terms = set()
+    for field in ('title', 'description', 'requirements', 'skill_names', 'tech_names'):
+        terms.update(tokenize(row.get(field)))
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'level': row['experience_level'],
+        'type': row['job_type'],
+        'remote': bool(row['is_remote']),
+        'pay': float(row['pay_per_hour'] or 0),
+        'skills': {name_key(name) for name in skill_names if name},
+        'techs': {name_key(name) for name in tech_names if name},
+        'terms': terms
+    }
+
+
+def _probe_keys(doc):
+    keys = [WILDCARD, ('level', doc['level']), ('type', doc['type']), ('pay', pay_bucket(doc['pay']))]
+    if doc['remote']:
+        keys.append(('remote', True))
+    keys.extend(('skill', key) for key in doc['skills'])
+    keys.extend(('tech', key) for key in doc['techs'])
+    keys.extend(('term', term) for term in doc['terms'])
+    return keys
+
+
+def _decode(filters):
+    return json.loads(filters) if isinstance(filters, (str, bytes)) else (filters or {})
+
+
+_SEARCH_SELECT = """
+    SELECT ss.id, ss.user_id, ss.name, ss.filters
+    FROM saved_searches ss
+    JOIN users u ON ss.user_id = u.id
+    WHERE ss.is_active = TRUE AND u.is_active = TRUE
+"""
+
+
+class Percolator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries = {}      # saved search id -> SavedQuery
+        self._anchors = {}      # anchor key -> {saved search id: SavedQuery}
+        self._version = None
+        self._ready = False
+
+    @property
+    def ready(self):
+        return self._ready
+
+    # -------------------- Saved searches --------------------
+    def _add(self, query):
+        self._queries[query.id] = query
+        for key in query.anchors():
+            self._anchors.setdefault(key, {})[query.id] = query
+
+    def _remove(self, search_id):
+        query = self._queries.pop(search_id, None)
+        if query is None:
+            return
+        for key in query.anchors():
+            bucket = self._anchors.get(key)
+            if bucket is not None:
+                bucket.pop(search_id, None)
+                if not bucket:
+                    del self._anchors[key]
+
+    @staticmethod
+    def _fetch_version(cur):
+        # Deletes lower the count; activating or editing bumps updated_at
+        cur.execute("SELECT COUNT(*) AS total, MAX(updated_at) AS latest FROM saved_searches")
+        row = cur.fetchone()
+        return row['total'], row['latest']
+
+    def load(self):
+        """Read every active saved search"""
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            version = self._fetch_version(cur)
+            cur.execute(_SEARCH_SELECT)
+            rows = cur.fetchall()
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        queries = [SavedQuery(row['id'], row['user_id'], row['name'], _decode(row['filters'])) for row in rows]
+        with self._lock:
+            self._queries, self._anchors = {}, {}
+            for query in queries:
+                self._add(query)
+            self._version = version
+            self._ready = True
+        print(f"✅ Job alert searches loaded: {len(queries)}")
+
+    def reload_if_changed(self):
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            version = self._fetch_version(cur)
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        if version != self._version:
+            self.load()
+
+    def refresh(self, search_ids):
+        """Re-read the given saved searches; inactive or deleted ones are dropped"""
+        search_ids = list(set(search_ids))
+        if not search_ids or not self._ready:
+            return
+        placeholders = ','.join(['%s'] * len(search_ids))
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(_SEARCH_SELECT + f" AND ss.id IN ({placeholders})", search_ids)
+            rows = cur.fetchall()
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        with self._lock:
+            for search_id in search_ids:
+                self._remove(search_id)
+            for row in rows:
+                self._add(SavedQuery(row['id'], row['user_id'], row['name'], _decode(row['filters'])))
+
+    # -------------------- Matching --------------------
+    def match(self, docs):
+        """[(SavedQuery, doc)] for every saved search each job document passes,
+        apart from boolean-mode keyword searches, which still need checking"""
+        matched = []
+        with self._lock:
+            for doc in docs:
+                seen = set()
+                for key in _probe_keys(doc):
+                    for search_id, query in self._anchors.get(key, {}).items():
+                        if search_id in seen:
+                            continue
+                        seen.add(search_id)
+                        if query.matches(doc):
+                            matched.append((query, doc))
+        return matched
+
+    @staticmethod
+    def _check_boolean(cur, matched):
+        from database.models import job_search_match
+        pending = {}
+        for query, doc in matched:
+            if query.boolean:
+                pending.setdefault(query.id, (query, []))[1].append(doc)
+        if not pending:
+            return matched
+        passed = set()
+        for query, docs in pending.values():
+            match_sql, match_params = job_search_match(query.search, 'boolean')
+            job_ids = [doc['id'] for doc in docs]
+            if match_sql is None:
+                # No words at all; Job.search ignores such a search too
+                passed.update((query.id, job_id) for job_id in job_ids)
+                continue
+            placeholders = ','.join(['%s'] * len(job_ids))
+            cur.execute(f"SELECT j.id FROM jobs j WHERE j.id IN ({placeholders}) AND {match_sql}",
+                        job_ids + list(match_params))
+            passed.update((query.id, row['id']) for row in cur.fetchall())
+        return [(query, doc) for query, doc in matched if not query.boolean or (query.id, doc['id']) in passed]
+
+    def percolate(self, job_ids):
+        """Alert the owners of saved searches matching any of job_ids (inactive
+        ones are skipped); returns the number of notifications created"""
+        from database.models import Notification
+        if not self._ready:
+            self.load()
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids or not self._queries:
+            return 0
+        docs = [job_document(row) for row in load_active_jobs(job_ids)]
+        matched = self.match(docs)
+        if not matched:
+            return 0
+
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            matched = self._check_boolean(cur, matched)
+            alerts = {}
+            for query, doc in sorted(matched, key=lambda item: item[0].id):
+                alerts.setdefault((doc['id'], query.user_id), (query, doc))
+            matched_jobs = list({job_id for job_id, _ in alerts})
+            if not matched_jobs:
+                conn.commit()
+                return 0
+            # Locking the jobs' ranges of job_alerts makes a concurrent run
+            # for the same jobs wait here and then see what this one sent.
+            placeholders = ','.join(['%s'] * len(matched_jobs))
+            cur.execute(f"""
+                SELECT job_id, user_id FROM job_alerts
+                WHERE job_id IN ({placeholders})
+                FOR UPDATE
+            """, matched_jobs)
+            for row in cur.fetchall():
+                alerts.pop((row['job_id'], row['user_id']), None)
+            if not alerts:
+                conn.commit()
+                return 0
+            items = sorted(alerts.items())
+            cur.executemany("""
+                INSERT INTO job_alerts (user_id, job_id, saved_search_id)
+                VALUES (%s, %s, %s)
+            """, [(user_id, job_id, query.id) for (job_id, user_id), (query, _) in items])
+            Notification.create_many(cur, [{
+                'user_id': user_id,
+                'title': f"New job for \"{query.name}\"",
+                'message': f"{doc['title']} (${doc['pay']:g}/hr) matches your saved search.",
+                'notification_type': 'job',
+                'related_job_id': job_id
+            } for (job_id, user_id), (query, doc) in items])
+            conn.commit()
+            return len(items)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            return {'ready': self._ready, 'searches': len(self._queries), 'anchors': len(self._anchors),
+                    'wildcard': len(self._anchors.get(WILDCARD, {}))}
+
+
+percolator = Percolator()
+
+
+# ==================== Background alerts ====================
+class _Worker:
+    """Collects job ids queued by this process and percolates them in batches"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, job_ids):
+        with self._lock:
+            self._pending.update(job_ids)
+            full = len(self._pending) >= BATCH_SIZE
+        self.start()
+        if full:
+            self._wake.set()
+
+    def start(self):
+        # Threads do not survive fork; each worker process starts its own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='job-alerts', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_reload = time.monotonic() + RELOAD_INTERVAL
+        while True:
+            self._wake.wait(PERCOLATE_INTERVAL)
+            self._wake.clear()
+            try:
+                if time.monotonic() >= next_reload:
+                    next_reload = time.monotonic() + RELOAD_INTERVAL
+                    if percolator.ready:
+                        percolator.reload_if_changed()
+                self.flush()
+            except Exception as e:
+                print(f"❌ Job alerts failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = sorted(self._pending), set()
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = pending[start:start + BATCH_SIZE]
+            try:
+                sent = percolator.percolate(batch)
+                if sent:
+                    print(f"🔔 Sent {sent} job alerts for {len(batch)} jobs")
+            except Exception as e:
+                # Recover missed jobs with the backfill command
+                print(f"❌ Job alerts failed for jobs {batch[0]}-{batch[-1]}: {e}")
+
+
+_worker = _Worker()
+_enabled = os.getenv('JOB_ALERTS', 'true').lower() == 'true'
+
+
+def enqueue(job_id):
+    """Queue a job that was just created or reactivated"""
+    if _enabled:
+        _worker.enqueue([job_id])
+
+
+def refresh_searches(search_ids):
+    """Pick up saved searches created, changed or deleted by this process"""
+    if _enabled:
+        percolator.refresh(search_ids)
+
+
+def init_app(app):
+    if _enabled:
+        _worker.start()
+
+
+# ==================== Backfill ====================
+def backfill(job_ids=None, since_id=None, batch_size=BATCH_SIZE):
+    """Percolate the given jobs, or every active job with id > since_id, in
+    batches; already alerted users are skipped, so runs can overlap or repeat"""
+    if job_ids is None:
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT id FROM jobs WHERE is_active = TRUE AND id > %s ORDER BY id", (since_id or 0,))
+            job_ids = [row['id'] for row in cur.fetchall()]
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+    percolator.load()
+    sent = 0
+    for start in range(0, len(job_ids), batch_size):
+        batch = job_ids[start:start + batch_size]
+        count = percolator.percolate(batch)
+        sent += count
+        print(f"  jobs {batch[0]}-{batch[-1]}: {count} alerts")
+    return sent
+
+
+def main(argv):
+    if not argv or argv[0] != 'backfill':
+        print(__doc__)
+        return 1
+    args = argv[1:]
+    if args[:1] == ['--since-id'] and len(args) == 2:
+        sent = backfill(since_id=int(args[1]))
+    elif args and all(arg.isdigit() for arg in args):
+        sent = backfill(job_ids=[int(arg) for arg in args])
+    else:
+        print(__doc__)
+        return 1
+    print(f"✅ Backfill sent {sent} job alerts ({percolator.stats()})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
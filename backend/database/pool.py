@@ -0,0 +1,274 @@
+import os
+import time
+import threading
+from collections import deque
+import pymysql
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the timeout"""
+
+
+def run_callbacks(callbacks):
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ After-commit callback failed: {e}")
+
+
+class PooledConnection:
+    """Thin proxy around a PyMySQL connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._closed = False
+        self._on_commit = []
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        if self._pool.cursor_wrapper is not None:
+            cursor = self._pool.cursor_wrapper(cursor)
+        return cursor
+
+    def on_commit(self, callback):
+        """Run callback once the current transaction commits (dropped on rollback)"""
+        self._on_commit.append(callback)
+
+    def commit(self):
+        self._raw.commit()
+        callbacks, self._on_commit = self._on_commit, []
+        run_callbacks(callbacks)
+
+    def rollback(self):
+        self._on_commit = []
+        self._raw.rollback()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._on_commit = []
+        self._pool._release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded pool of PyMySQL connections.
+
+    - min_size connections are opened eagerly (prefill(), called by
+      db_config when it creates a pool, and again on first use after a
+      fork) and kept around
+    - at most max_size connections exist at any time; further checkouts wait
+      up to `timeout` seconds and then raise PoolTimeout
+    - connections idle for longer than `ping_after` seconds are pinged before
+      being handed out, and connections older than `max_lifetime` are recycled
+    - the pool resets itself after os.fork() so pre-fork servers never share
+      sockets between worker processes
+    - cursors are passed through `cursor_wrapper` when one is given
+    """
+
+    def __init__(self, connect_kwargs, min_size=1, max_size=10, timeout=5.0,
+                 ping_after=30.0, max_lifetime=1800.0, cursor_wrapper=None):
+        self.connect_kwargs = dict(connect_kwargs)
+        self.cursor_wrapper = cursor_wrapper
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.max_lifetime = max_lifetime
+        self._cond = threading.Condition(threading.Lock())
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        # idle entries are (raw_connection, created_at, returned_at)
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._failed_pings = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _check_fork(self):
+        # Sockets inherited from the parent must not be used (or closed, which
+        # would send COM_QUIT on the parent's session); just forget them.
+        if self._pid != os.getpid():
+            self._cond = threading.Condition(threading.Lock())
+            self._reset_state()
+            self.prefill()
+
+    def _open(self):
+        return pymysql.connect(**self.connect_kwargs), time.monotonic()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def fill(self):
+        """Open connections until min_size idle connections are available"""
+        self._check_fork()
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                raw, created_at = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((raw, created_at, time.monotonic()))
+                self._cond.notify()
+
+    def prefill(self):
+        """fill(), but only logging a failure: a checkout retries the connect
+        and reports the error to its caller"""
+        try:
+            self.fill()
+        except Exception as e:
+            print(f"⚠️ Could not open {self.min_size} pooled connection(s) up front: {e}")
+
+    def connection(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds (at most
+        the pool's own timeout)"""
+        self._check_fork()
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            with self._cond:
+                entry = None
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"Could not get a database connection within {timeout:g}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                self._in_use += 1
+
+            if entry is None:
+                try:
+                    raw, created_at = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                raw, created_at, returned_at = entry
+                if not self._validate(raw, created_at, returned_at):
+                    self._discard(raw)
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return PooledConnection(self, raw, created_at)
+
+    def _validate(self, raw, created_at, returned_at):
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if self.ping_after is not None and now - returned_at > self.ping_after:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._failed_pings += 1
+                return False
+        return True
+
+    def _release(self, raw, created_at):
+        if self._pid != os.getpid():
+            return
+        healthy = raw.open
+        if healthy:
+            # End the implicit transaction so the next borrower does not
+            # inherit an open snapshot or uncommitted writes.
+            try:
+                raw.rollback()
+            except Exception:
+                healthy = False
+        now = time.monotonic()
+        expired = healthy and self.max_lifetime and now - created_at > self.max_lifetime
+        if expired:
+            healthy = False
+        if not healthy:
+            self._discard(raw)
+        with self._cond:
+            if expired:
+                self._recycled += 1
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((raw, created_at, now))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on return)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'recycled': self._recycled,
+                'failed_pings': self._failed_pings,
+                'avg_checkout_ms': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'max_checkout_ms': round(self._wait_max * 1000, 3),
+            }
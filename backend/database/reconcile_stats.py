@@ -0,0 +1,53 @@
+"""Rebuild user_stats from the source tables.
+
+    python -m database.reconcile_stats             # every user
+    python -m database.reconcile_stats 12 57 ...   # selected users
+
+The counters are maintained transactionally by the models; run this after
+manual data fixes or if a dashboard looks off.
+"""
+import sys
+from database.db_config import get_pool
+from database.models import UserStats
+
+BATCH_SIZE = 1000
+
+
+def reconcile(user_ids=None):
+    """Recompute counters and return how many rows were rewritten"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    try:
+        if user_ids:
+            batches = [user_ids[i:i + BATCH_SIZE] for i in range(0, len(user_ids), BATCH_SIZE)]
+        else:
+            cur.execute("SELECT id FROM users ORDER BY id")
+            ids = [row['id'] for row in cur.fetchall()]
+            batches = [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+        rows = 0
+        for batch in batches:
+            # One short transaction per batch keeps row locks brief
+            rows += UserStats.rebuild(cur, batch)
+            conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def main(argv):
+    try:
+        user_ids = [int(arg) for arg in argv]
+    except ValueError:
+        print(__doc__)
+        return 1
+    rows = reconcile(user_ids or None)
+    print(f"✅ Reconciled user_stats ({rows} row changes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
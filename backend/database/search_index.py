@@ -0,0 +1,527 @@
+"""In-process BM25 index over active jobs.
+
+Active jobs are a small, hot set, so keyword searches can be ranked in memory
+instead of going to MySQL. The index covers title, description, requirements
+and skill / tech stack names, plus the columns the search filters use.
+Postings are kept per term as two parallel arrays (slot numbers and term
+frequencies) rather than dicts of sets.
+
+Every job occupies a slot. Experience level, job type, remote and each skill
+and tech stack name also get a bitmap of slots (a Python int, bit n set for
+slot n), so a filter such as "Python AND Django, remote, senior" is a few
+integer ANDs rather than joins.
+
+The index is built in a background thread at startup, and updated after
+commit whenever Job.create, Job.update, Job.toggle_active and Job.delete run in
+this process. Changes made by other processes are picked up by a periodic
+sync against jobs.updated_at. Until the first build finishes, search()
+returns None and callers use the FULLTEXT query instead.
+
+    python -m database.search_index "python django"
+"""
+import os
+import re
+import sys
+import math
+import time
+import threading
+from array import array
+from collections import Counter
+from functools import reduce
+from operator import or_
+from database.db_config import get_pool
+from database.taxonomy import name_key
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+# Must match the server's innodb_ft_min_token_size and default stopword list
+FT_MIN_TOKEN_SIZE = int(os.getenv('DB_FT_MIN_TOKEN_SIZE', 3))
+FT_STOPWORDS = frozenset("""
+    a about an are as at be by com de en for from how i in is it la of on or
+    that the this to was what when where who will with und www
+""".split())
+# Word tokens as InnoDB FULLTEXT splits them
+FT_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SYNC_INTERVAL = float(os.getenv('JOB_INDEX_SYNC_INTERVAL', 30))
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title words count this many times towards a document's term frequencies
+TITLE_WEIGHT = 2
+MAX_TF = 65535
+IN_CHUNK_SIZE = 1000
+
+# Tag of ranked cursors issued by search_page (see there)
+CURSOR_TAG = 'bm25'
+
+# Upper bounds of the pay_per_hour facet buckets; the last bucket is open
+PAY_BUCKETS = (25, 50, 75, 100, 150)
+FACET_TOP_SKILLS = 10
+
+
+def tokenize(text):
+    """Indexable words: lowercased, without short words and stopwords"""
+    return [t for t in FT_TOKEN_RE.findall((text or '').lower())
+            if len(t) >= FT_MIN_TOKEN_SIZE and t not in FT_STOPWORDS]
+
+
+def _bit_positions(bits):
+    """Slot numbers of the set bits of bits, lowest first"""
+    digits = bin(bits)[:1:-1]
+    return [slot for slot, digit in enumerate(digits) if digit == '1']
+
+
+def _split_names(names):
+    return tuple(sys.intern(name) for name in names.split('\n')) if names else ()
+
+
+def _pay_labels():
+    bounds = (0,) + PAY_BUCKETS
+    return [f"{lo}-{hi}" for lo, hi in zip(bounds, PAY_BUCKETS)] + [f"{PAY_BUCKETS[-1]}+"]
+
+
+PAY_BUCKET_LABELS = _pay_labels()
+
+
+def pay_bucket(pay):
+    for label, upper in zip(PAY_BUCKET_LABELS, PAY_BUCKETS):
+        if pay < upper:
+            return label
+    return PAY_BUCKET_LABELS[-1]
+
+
+def pay_bucket_sql(column):
+    """SQL expression giving the same label as pay_bucket()"""
+    cases = ' '.join(f"WHEN {column} < {upper} THEN '{label}'"
+                     for label, upper in zip(PAY_BUCKET_LABELS, PAY_BUCKETS))
+    return f"CASE {cases} ELSE '{PAY_BUCKET_LABELS[-1]}' END"
+
+
+def facet_result(levels, types, remote, pay, skills):
+    """Facet counts in the shape the API returns them"""
+    return {
+        'experience_level': dict(levels),
+        'job_type': dict(types),
+        'is_remote': {'true': remote.get(True, 0), 'false': remote.get(False, 0)},
+        'pay_per_hour': {label: pay.get(label, 0) for label in PAY_BUCKET_LABELS},
+        'skills': [{'name': name, 'count': count} for name, count in skills.most_common(FACET_TOP_SKILLS)]
+    }
+
+
+_JOB_SELECT = """
+    SELECT j.id, j.title, j.description, j.requirements, j.experience_level,
+           j.job_type, j.is_remote, j.pay_per_hour, j.created_at, j.updated_at,
+           (SELECT GROUP_CONCAT(s.name SEPARATOR '\\n')
+            FROM job_skills js JOIN skills s ON js.skill_id = s.id
+            WHERE js.job_id = j.id) AS skill_names,
+           (SELECT GROUP_CONCAT(ts.name SEPARATOR '\\n')
+            FROM job_tech_stacks jts JOIN tech_stacks ts ON jts.tech_stack_id = ts.id
+            WHERE jts.job_id = j.id) AS tech_names
+    FROM jobs j
+    WHERE j.is_active = TRUE
+"""
+
+
+def load_active_jobs(job_ids=None):
+    """Index rows (_JOB_SELECT) for every active job, or for those of job_ids
+    that are active"""
+    conn = get_pool().connection()
+    cur = conn.cursor()
+    try:
+        # Skill names can be long; GROUP_CONCAT truncates at 1024 by default
+        cur.execute("SET SESSION group_concat_max_len = 65536")
+        if job_ids is None:
+            cur.execute(_JOB_SELECT)
+            rows = list(cur.fetchall())
+        else:
+            rows = []
+            job_ids = list(job_ids)
+            for start in range(0, len(job_ids), IN_CHUNK_SIZE):
+                chunk = job_ids[start:start + IN_CHUNK_SIZE]
+                placeholders = ','.join(['%s'] * len(chunk))
+                cur.execute(_JOB_SELECT + f" AND j.id IN ({placeholders})", chunk)
+                rows.extend(cur.fetchall())
+        conn.commit()
+        return rows
+    finally:
+        cur.close()
+        conn.close()
+
+
+class JobIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self._dirty = set()
+        self._reset()
+
+    def _reset(self):
+        self._slots = {}                  # job id -> slot
+        self._job_ids = array('q')        # slot -> job id
+        self._alive = bytearray()
+        self._lengths = array('I')
+        self._postings = {}               # term -> (array('I') slots, array('H') tfs)
+        self._levels = []
+        self._types = []
+        self._remote = bytearray()
+        self._pay = array('d')
+        self._created = []
+        self._updated = []
+        self._skills = []
+        self._techs = []
+        self._bitmaps = {}                # ('skill', name_key) etc. -> int
+        self._alive_bits = 0
+        self._live = 0
+        self._total_length = 0
+
+    @property
+    def ready(self):
+        return self._ready
+
+    # -------------------- Writes --------------------
+    def _add(self, row):
+        terms = {}
+        for term in tokenize(row['title']):
+            terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+        for field in ('description', 'requirements', 'skill_names', 'tech_names'):
+            for term in tokenize(row.get(field)):
+                terms[term] = terms.get(term, 0) + 1
+
+        slot = len(self._job_ids)
+        self._slots[row['id']] = slot
+        self._job_ids.append(row['id'])
+        self._alive.append(1)
+        length = sum(terms.values())
+        self._lengths.append(length)
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[sys.intern(term)] = (array('I'), array('H'))
+            postings[0].append(slot)
+            postings[1].append(min(tf, MAX_TF))
+        self._levels.append(sys.intern(row['experience_level'] or ''))
+        self._types.append(sys.intern(row['job_type'] or ''))
+        self._remote.append(1 if row['is_remote'] else 0)
+        self._pay.append(float(row['pay_per_hour'] or 0))
+        self._created.append(str(row['created_at']))
+        self._updated.append(row['updated_at'])
+        self._skills.append(_split_names(row.get('skill_names')))
+        self._techs.append(_split_names(row.get('tech_names')))
+        self._mark(slot)
+        self._live += 1
+        self._total_length += length
+
+    def _mark(self, slot):
+        """Set slot's bit in the live bitmap and in each of its value bitmaps"""
+        bit = 1 << slot
+        self._alive_bits |= bit
+        keys = [('level', self._levels[slot]), ('type', self._types[slot])]
+        if self._remote[slot]:
+            keys.append(('remote', True))
+        keys.extend(('skill', name_key(name)) for name in self._skills[slot])
+        keys.extend(('tech', name_key(name)) for name in self._techs[slot])
+        for key in keys:
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | bit
+
+    def _remove(self, job_id):
+        slot = self._slots.pop(job_id, None)
+        if slot is None:
+            return
+        self._alive[slot] = 0
+        # Value bitmaps are always ANDed with the live one, so they keep the bit
+        self._alive_bits &= ~(1 << slot)
+        self._live -= 1
+        self._total_length -= self._lengths[slot]
+
+    def _compact(self):
+        """Drop removed slots once they outnumber the live ones"""
+        dead = len(self._job_ids) - self._live
+        if dead < 1000 or dead < self._live:
+            return
+        remap = array('i', [-1]) * len(self._job_ids)
+        job_ids, lengths, pay, remote = array('q'), array('I'), array('d'), bytearray()
+        levels, types, created, updated, skills, techs = [], [], [], [], [], []
+        for slot, alive in enumerate(self._alive):
+            if not alive:
+                continue
+            remap[slot] = len(job_ids)
+            job_ids.append(self._job_ids[slot])
+            lengths.append(self._lengths[slot])
+            pay.append(self._pay[slot])
+            remote.append(self._remote[slot])
+            levels.append(self._levels[slot])
+            types.append(self._types[slot])
+            created.append(self._created[slot])
+            updated.append(self._updated[slot])
+            skills.append(self._skills[slot])
+            techs.append(self._techs[slot])
+        postings = {}
+        for term, (slots, tfs) in self._postings.items():
+            new_slots, new_tfs = array('I'), array('H')
+            for slot, tf in zip(slots, tfs):
+                if remap[slot] >= 0:
+                    new_slots.append(remap[slot])
+                    new_tfs.append(tf)
+            if new_slots:
+                postings[term] = (new_slots, new_tfs)
+        self._job_ids, self._lengths, self._pay, self._remote = job_ids, lengths, pay, remote
+        self._levels, self._types, self._created, self._updated = levels, types, created, updated
+        self._skills, self._techs = skills, techs
+        self._alive = bytearray([1]) * len(job_ids)
+        self._slots = {job_id: slot for slot, job_id in enumerate(job_ids)}
+        self._postings = postings
+        self._bitmaps, self._alive_bits = {}, 0
+        for slot in range(len(job_ids)):
+            self._mark(slot)
+
+    def build(self):
+        """Load every active job; ids refreshed during the load are reloaded after"""
+        started = time.monotonic()
+        with self._lock:
+            self._dirty = set()
+        rows = load_active_jobs()
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._add(row)
+            dirty, self._dirty = self._dirty, set()
+            self._ready = True
+        if dirty:
+            self.refresh(dirty)
+        print(f"✅ Job search index built: {len(rows)} jobs in {time.monotonic() - started:.2f}s")
+
+    def refresh(self, job_ids):
+        """Re-read the given jobs; inactive or deleted ones leave the index"""
+        job_ids = set(job_ids)
+        if not job_ids:
+            return
+        with self._lock:
+            if not self._ready:
+                self._dirty.update(job_ids)
+                return
+        rows = load_active_jobs(job_ids)
+        with self._lock:
+            for job_id in job_ids:
+                self._remove(job_id)
+            for row in rows:
+                self._add(row)
+            self._compact()
+
+    def sync(self):
+        """Pick up jobs created, changed or removed by other processes"""
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT id, updated_at FROM jobs WHERE is_active = TRUE")
+            current = {row['id']: row['updated_at'] for row in cur.fetchall()}
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        with self._lock:
+            known = {job_id: self._updated[slot] for job_id, slot in self._slots.items()}
+        stale = [job_id for job_id, updated in current.items() if known.get(job_id, -1) != updated]
+        stale.extend(job_id for job_id in known if job_id not in current)
+        self.refresh(stale)
+        return len(stale)
+
+    # -------------------- Reads --------------------
+    def _candidates(self, filters):
+        """Set of live slots passing filters, or None when nothing is filtered;
+        call with the lock held.
+
+        skills / tech_stack are lists of names, matched case-insensitively;
+        skills_match / tech_match choose 'all' (the default) or 'any'.
+        """
+        required = []
+        if filters.get('experience_level'):
+            required.append(self._bitmaps.get(('level', filters['experience_level']), 0))
+        if filters.get('job_type'):
+            required.append(self._bitmaps.get(('type', filters['job_type']), 0))
+        if filters.get('is_remote'):
+            required.append(self._bitmaps.get(('remote', True), 0))
+        for kind, names_key, match_key in (('skill', 'skills', 'skills_match'),
+                                           ('tech', 'tech_stack', 'tech_match')):
+            keys = {name_key(name) for name in filters.get(names_key) or () if name and name.strip()}
+            if not keys:
+                continue
+            bitmaps = [self._bitmaps.get((kind, key), 0) for key in keys]
+            if filters.get(match_key) == 'any':
+                required.append(reduce(or_, bitmaps))
+            else:
+                required.extend(bitmaps)
+        # 0 / '' mean no bound, as in Job.search_conditions
+        min_pay, max_pay = filters.get('min_pay') or None, filters.get('max_pay') or None
+        if not required and min_pay is None and max_pay is None:
+            return None
+
+        bits = self._alive_bits
+        for bitmap in required:
+            bits &= bitmap
+            if not bits:
+                return set()
+        slots = _bit_positions(bits)
+        if min_pay is not None:
+            slots = [slot for slot in slots if self._pay[slot] >= float(min_pay)]
+        if max_pay is not None:
+            slots = [slot for slot in slots if self._pay[slot] <= float(max_pay)]
+        return set(slots)
+
+    def search(self, text, filters=None):
+        """[(score, created_at, job_id)] best first, or None when the index
+        cannot answer (not built yet, or no indexable words in text)"""
+        terms = set(tokenize(text))
+        if not self._ready or not terms:
+            return None
+        with self._lock:
+            candidates = self._candidates(filters or {})
+            scores = self._score(terms)
+            ranked = [(round(score, 6), self._created[slot], self._job_ids[slot])
+                      for slot, score in scores.items() if candidates is None or slot in candidates]
+        ranked.sort(reverse=True)
+        return ranked
+
+    def listing(self, filters=None):
+        """[(created_at, job_id)] newest first for every job passing filters,
+        or None before the index is built"""
+        if not self._ready:
+            return None
+        with self._lock:
+            candidates = self._candidates(filters or {})
+            if candidates is None:
+                candidates = self._slots.values()
+            listed = [(self._created[slot], self._job_ids[slot]) for slot in candidates]
+        listed.sort(reverse=True)
+        return listed
+
+    def _score(self, terms):
+        """{slot: BM25 score} for live slots containing any of terms; call with the lock held"""
+        scores = {}
+        if not self._live:
+            return scores
+        avg_length = self._total_length / self._live
+        alive = self._alive
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            slots, tfs = postings
+            df = sum(alive[slot] for slot in slots)
+            if not df:
+                continue
+            idf = math.log(1 + (self._live - df + 0.5) / (df + 0.5))
+            for slot, tf in zip(slots, tfs):
+                if not alive[slot]:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[slot] / avg_length)
+                scores[slot] = scores.get(slot, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def facets(self, text=None, filters=None):
+        """Facet counts over every job matching text and filters, or None when
+        the index cannot answer (see search())"""
+        if not self._ready:
+            return None
+        if text:
+            terms = set(tokenize(text))
+            if not terms:
+                return None
+        levels, types, remote, pay, skills = Counter(), Counter(), Counter(), Counter(), Counter()
+        with self._lock:
+            candidates = self._candidates(filters or {})
+            if text:
+                slots = [slot for slot in self._score(terms) if candidates is None or slot in candidates]
+            else:
+                slots = self._slots.values() if candidates is None else candidates
+            for slot in slots:
+                levels[self._levels[slot]] += 1
+                types[self._types[slot]] += 1
+                remote[bool(self._remote[slot])] += 1
+                pay[pay_bucket(self._pay[slot])] += 1
+                skills.update(self._skills[slot])
+        return facet_result(levels, types, remote, pay, skills)
+
+    def search_page(self, text, filters, size, cursor=None):
+        """(page of (score, created_at, job_id), next_cursor), or None as for
+        search(). Without text the page holds (created_at, job_id), newest first.
+
+        Listing cursors are plain (created_at, id), the same as the SQL
+        path's, so they keep working whichever path serves the next page.
+        Ranked cursors are tagged CURSOR_TAG: BM25 scores and FULLTEXT
+        relevance are on different scales, so a cursor from one ranking is
+        rejected (InvalidCursor) by the other rather than skipping or
+        repeating rows.
+        """
+        ranked = self.search(text, filters) if text else self.listing(filters)
+        if ranked is None:
+            return None
+        tag = CURSOR_TAG if text else None
+        if cursor:
+            after = tuple(decode_cursor(cursor, 3 if text else 2, tag))
+            try:
+                ranked = [entry for entry in ranked if entry < after]
+            except TypeError:
+                raise InvalidCursor('Invalid cursor')
+        if len(ranked) <= size:
+            return ranked, None
+        ranked = ranked[:size]
+        return ranked, encode_cursor(ranked[-1], tag)
+
+    def stats(self):
+        with self._lock:
+            return {'ready': self._ready, 'jobs': self._live, 'slots': len(self._job_ids),
+                    'terms': len(self._postings)}
+
+
+job_index = JobIndex()
+
+
+class _Maintainer:
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='job-search-index', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not job_index.ready:
+            try:
+                job_index.build()
+            except Exception as e:
+                print(f"❌ Job search index build failed: {e}")
+                time.sleep(SYNC_INTERVAL)
+        while True:
+            time.sleep(SYNC_INTERVAL)
+            try:
+                job_index.sync()
+            except Exception as e:
+                print(f"❌ Job search index sync failed: {e}")
+
+
+_maintainer = _Maintainer()
+
+
+def init_app(app):
+    if os.getenv('JOB_SEARCH_INDEX', 'true').lower() == 'true':
+        _maintainer.start()
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 1
+    job_index.build()
+    print(f"📊 {job_index.stats()}")
+    for score, created_at, job_id in (job_index.search(' '.join(argv)) or [])[:20]:
+        print(f"  {score:8.3f}  job {job_id}  ({created_at})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,203 @@
+import math
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_app_context
+from database.pool import run_callbacks
+from database import identity_map
+
+_local = threading.local()
+
+
+class DbSession:
+    """One pooled connection shared by every model call in an app context.
+
+    Outside of a transaction() block each commit() is a real commit, exactly as
+    if the model had its own connection. Inside transaction() commits are
+    deferred to the end of the outermost block, and any rollback() marks the
+    whole unit of work as failed so it is rolled back instead of committed.
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.replica_conn = None
+        self.wrote = False
+        self.depth = 0
+        self.rollback_only = False
+        self._on_commit = []
+        # Limits for bounded work such as fan-out calls; see bound()
+        self.checkout_timeout = None
+        self.max_execution_time = None
+
+    def connection(self, get_pool):
+        if self.conn is None:
+            self.conn = get_pool().connection(self.checkout_timeout)
+            self._apply_limit(self.conn)
+        return RequestConnection(self)
+
+    def replica_connection(self, replica):
+        if self.replica_conn is None:
+            self.replica_conn = replica.pool.connection(self.checkout_timeout)
+            self._apply_limit(self.replica_conn)
+        return RequestConnection(self, replica=True)
+
+    def bound(self, seconds):
+        """Wait at most seconds for a pooled connection, and have MySQL abort
+        any SELECT of this session running longer (MAX_EXECUTION_TIME); call
+        before the first query"""
+        self.checkout_timeout = seconds
+        self.max_execution_time = max(1, math.ceil(seconds * 1000))
+
+    def _apply_limit(self, conn, ms=None):
+        if not self.max_execution_time:
+            return
+        cur = conn.cursor()
+        try:
+            cur.execute("SET SESSION MAX_EXECUTION_TIME = %s",
+                        (self.max_execution_time if ms is None else ms,))
+        finally:
+            cur.close()
+
+    def on_commit(self, callback):
+        self._on_commit.append(callback)
+
+    def commit(self):
+        if self.depth:
+            return
+        self._commit()
+
+    def _commit(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.wrote = True
+        callbacks, self._on_commit = self._on_commit, []
+        run_callbacks(callbacks)
+
+    def rollback(self):
+        if self.depth:
+            self.rollback_only = True
+        self._on_commit = []
+        # Rows cached during the transaction may show writes that are now gone
+        identity_map.clear()
+        if self.conn is not None:
+            self.conn.rollback()
+
+    def begin(self):
+        self.depth += 1
+
+    def end(self, failed):
+        self.depth -= 1
+        if self.depth:
+            if failed:
+                self.rollback_only = True
+            return
+        if failed or self.rollback_only:
+            self.rollback_only = False
+            self.rollback()
+        else:
+            self._commit()
+
+    def close(self):
+        """Give the connection back to the pool, rolling back anything unfinished"""
+        self.depth = 0
+        self.rollback_only = False
+        self._on_commit = []
+        conn, self.conn = self.conn, None
+        replica_conn, self.replica_conn = self.replica_conn, None
+        for pooled in (conn, replica_conn):
+            if pooled is None:
+                continue
+            try:
+                # Pooled connections keep session variables; reset the cap
+                self._apply_limit(pooled, 0)
+            except Exception as e:
+                print(f"⚠️ Could not reset MAX_EXECUTION_TIME: {e}")
+            pooled.close()
+        self.checkout_timeout = None
+        self.max_execution_time = None
+
+
+class RequestConnection:
+    """What get_db_connection() hands to models while a session is active"""
+
+    def __init__(self, session, replica=False):
+        self._session = session
+        self._replica = replica
+
+    @property
+    def _conn(self):
+        return self._session.replica_conn if self._replica else self._session.conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def on_commit(self, callback):
+        self._session.on_commit(callback)
+
+    def commit(self):
+        if not self._replica:
+            self._session.commit()
+
+    def rollback(self):
+        if self._replica:
+            self._conn.rollback()
+        else:
+            self._session.rollback()
+
+    def close(self):
+        # The connection lives until the app context is torn down.
+        pass
+
+
+def current_session():
+    """Return the active DbSession, or None when connections are not shared"""
+    if has_app_context():
+        session = g.get('_db_session')
+        if session is None:
+            session = g._db_session = DbSession()
+        return session
+    return getattr(_local, 'session', None)
+
+
+@contextmanager
+def transaction():
+    """Run the enclosed model calls as one transaction on a shared connection"""
+    owns_session = False
+    session = current_session()
+    if session is None:
+        # Scripts and CLI commands have no app context; share a connection
+        # for the duration of the block only.
+        session = _local.session = DbSession()
+        owns_session = True
+    session.begin()
+    try:
+        yield session
+    except BaseException:
+        session.end(failed=True)
+        raise
+    else:
+        session.end(failed=False)
+    finally:
+        if owns_session:
+            _local.session = None
+            session.close()
+
+
+def transactional(f):
+    """Decorator form of transaction() for route handlers"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        with transaction():
+            return f(*args, **kwargs)
+    return decorated
+
+
+def init_app(app):
+    @app.teardown_appcontext
+    def release_db_session(exc):
+        session = g.pop('_db_session', None)
+        if session is not None:
+            session.close()
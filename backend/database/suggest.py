@@ -0,0 +1,190 @@
+"""Prefix autocomplete for skill and tech stack names.
+
+Each table is held in memory as a sorted array of casefolded names, so the
+names starting with a prefix are one contiguous range found with two binary
+searches. Matches are ranked by usage (how many jobs and freelancer profiles
+list the name), then shorter names first. Ranked results for one- and
+two-character prefixes, whose ranges are the widest, are kept until the names
+or counts change.
+
+Names created through taxonomy.resolve() are added once their transaction
+commits. Usage counts, and names created by other processes, are reloaded in
+the background every SUGGEST_REFRESH_INTERVAL seconds.
+
+    python -m database.suggest skills py
+"""
+import os
+import sys
+import time
+import heapq
+import threading
+from bisect import bisect_left
+from database.db_config import get_pool
+from database import taxonomy
+from database.taxonomy import name_key
+
+REFRESH_INTERVAL = float(os.getenv('SUGGEST_REFRESH_INTERVAL', 300))
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+CACHED_PREFIX_LENGTH = 2
+# Sorts after every character a name can contain
+_PREFIX_END = '\U0010ffff'
+
+
+class Suggester:
+    def __init__(self, taxonomy, usage_tables):
+        """usage_tables: (table, id column) pairs whose rows each count as one use"""
+        self.taxonomy = taxonomy
+        self.usage_tables = usage_tables
+        self._lock = threading.Lock()
+        self._keys = []         # sorted name_key()s
+        self._entries = []      # (name, id) for each key
+        self._ids = set()
+        self._usage = {}        # id -> number of uses
+        self._cache = {}        # short prefix -> ranked (name, id) list
+        self._ready = False
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def _usage_sql(self):
+        counts = ' UNION ALL '.join(
+            f"SELECT {column} AS item_id, COUNT(*) AS uses FROM {table} GROUP BY {column}"
+            for table, column in self.usage_tables)
+        return f"""
+            SELECT t.id, t.name, COALESCE(SUM(u.uses), 0) AS uses
+            FROM {self.taxonomy.table} t
+            LEFT JOIN ({counts}) u ON u.item_id = t.id
+            GROUP BY t.id, t.name
+        """
+
+    def load(self):
+        """Read every name with its usage count"""
+        conn = get_pool().connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(self._usage_sql())
+            rows = cur.fetchall()
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        entries = sorted((name_key(row['name']), sys.intern(row['name']), row['id']) for row in rows)
+        with self._lock:
+            self._keys = [key for key, _, _ in entries]
+            self._entries = [(name, item_id) for _, name, item_id in entries]
+            self._ids = {item_id for _, _, item_id in entries}
+            self._usage = {row['id']: int(row['uses']) for row in rows}
+            self._cache = {}
+            self._ready = True
+
+    def add(self, rows):
+        """Insert names not seen yet (taxonomy listener); they start unused"""
+        with self._lock:
+            if not self._ready:
+                return
+            for row in rows:
+                if row['id'] in self._ids:
+                    continue
+                key = name_key(row['name'])
+                at = bisect_left(self._keys, key)
+                self._keys.insert(at, key)
+                self._entries.insert(at, (sys.intern(row['name']), row['id']))
+                self._ids.add(row['id'])
+                self._usage.setdefault(row['id'], 0)
+                for length in range(1, CACHED_PREFIX_LENGTH + 1):
+                    self._cache.pop(key[:length], None)
+
+    def _rank(self, entry):
+        name, item_id = entry
+        return -self._usage.get(item_id, 0), len(name), name
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """[{id, name, uses}] for names starting with prefix, most used first"""
+        key = name_key(prefix or '')
+        if not key:
+            return []
+        limit = max(1, min(limit or DEFAULT_LIMIT, MAX_LIMIT))
+        with self._lock:
+            ranked = self._cache.get(key) if len(key) <= CACHED_PREFIX_LENGTH else None
+            if ranked is None:
+                start = bisect_left(self._keys, key)
+                end = bisect_left(self._keys, key + _PREFIX_END, start)
+                ranked = heapq.nsmallest(MAX_LIMIT, self._entries[start:end], key=self._rank)
+                if len(key) <= CACHED_PREFIX_LENGTH:
+                    self._cache[key] = ranked
+            return [{'id': item_id, 'name': name, 'uses': self._usage.get(item_id, 0)}
+                    for name, item_id in ranked[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {'ready': self._ready, 'names': len(self._keys), 'cached_prefixes': len(self._cache)}
+
+
+SUGGESTERS = {
+    'skills': Suggester(taxonomy.skills, (('job_skills', 'skill_id'), ('freelancer_skills', 'skill_id'))),
+    'tech_stacks': Suggester(taxonomy.tech_stacks, (('job_tech_stacks', 'tech_stack_id'),
+                                                    ('freelancer_tech_stacks', 'tech_stack_id')))
+}
+for _suggester in SUGGESTERS.values():
+    _suggester.taxonomy.subscribe(_suggester.add)
+
+
+def suggest(kind, prefix, limit=DEFAULT_LIMIT):
+    """Suggestions from SUGGESTERS[kind]; loads it on first use if the
+    background refresh has not yet"""
+    suggester = SUGGESTERS[kind]
+    if not suggester.ready:
+        suggester.load()
+    return suggester.suggest(prefix, limit)
+
+
+class _Refresher:
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='taxonomy-suggest', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            for kind, suggester in SUGGESTERS.items():
+                try:
+                    suggester.load()
+                except Exception as e:
+                    print(f"❌ Loading {kind} suggestions failed: {e}")
+            time.sleep(REFRESH_INTERVAL)
+
+
+_refresher = _Refresher()
+
+
+def init_app(app):
+    if os.getenv('TAXONOMY_SUGGEST_REFRESH', 'true').lower() == 'true':
+        _refresher.start()
+
+
+def main(argv):
+    if len(argv) != 2 or argv[0] not in SUGGESTERS:
+        print(__doc__)
+        return 1
+    suggester = SUGGESTERS[argv[0]]
+    suggester.load()
+    started = time.perf_counter()
+    results = suggester.suggest(argv[1], MAX_LIMIT)
+    print(f"📊 {suggester.stats()} in {(time.perf_counter() - started) * 1000:.3f}ms")
+    for item in results:
+        print(f"  {item['uses']:6d}  {item['name']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
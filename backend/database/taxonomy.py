@@ -0,0 +1,129 @@
+import sys
+import threading
+import unicodedata
+
+IN_CHUNK_SIZE = 1000
+
+
+def name_key(name):
+    """Cache key for a taxonomy name.
+
+    The tables use utf8mb4_unicode_ci, which ignores case, accents and
+    trailing spaces, so "Café" and "cafe " are the same row there; the key
+    folds names the same way (compatibility decomposition without combining
+    marks, then casefold) so that ids map back to every name the database
+    equates.
+    """
+    decomposed = unicodedata.normalize('NFKD', name.strip())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class Taxonomy:
+    """Interned name -> id map for a lookup table (skills, tech_stacks).
+
+    The whole table is loaded on first use. Names created through resolve()
+    are only added to the map once their transaction commits, so a rollback
+    can never leave an id in the cache that does not exist. Names created by
+    other processes are picked up on the next miss.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = {}
+        self._loaded = False
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """Call listener(rows) with every batch of id / name rows cached"""
+        self._listeners.append(listener)
+
+    def _remember(self, rows):
+        with self._lock:
+            for row in rows:
+                name = sys.intern(row['name'])
+                self._ids[name_key(name)] = row['id']
+                self._names[row['id']] = name
+        for listener in self._listeners:
+            listener(rows)
+
+    def load(self, cur):
+        cur.execute(f"SELECT id, name FROM {self.table}")
+        rows = cur.fetchall()
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+        self._remember(rows)
+        self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+            self._loaded = False
+
+    def name(self, item_id):
+        return self._names.get(item_id)
+
+    def names(self):
+        """Snapshot of {id: name} for everything currently cached"""
+        with self._lock:
+            return dict(self._names)
+
+    def _select(self, cur, names):
+        rows = []
+        for start in range(0, len(names), IN_CHUNK_SIZE):
+            chunk = names[start:start + IN_CHUNK_SIZE]
+            placeholders = ','.join(['%s'] * len(chunk))
+            cur.execute(f"SELECT id, name FROM {self.table} WHERE name IN ({placeholders})", chunk)
+            rows.extend(cur.fetchall())
+        return rows
+
+    def resolve(self, conn, cur, names, create=True):
+        """Map names to ids, creating missing ones; returns {name_key(name): id}.
+
+        At most three statements however many names are passed: a SELECT for
+        names not in the cache, one multi-row INSERT ... ON DUPLICATE KEY for
+        the ones that do not exist yet and a SELECT for their ids. Raises
+        ValueError if a name still has no id (with create=False, names that
+        do not exist are left out instead).
+        """
+        wanted = {}
+        for name in names:
+            if name and name.strip():
+                wanted.setdefault(name_key(name), name.strip())
+        if not wanted:
+            return {}
+        if not self._loaded:
+            self.load(cur)
+
+        with self._lock:
+            ids = {key: self._ids[key] for key in wanted if key in self._ids}
+        missing = [wanted[key] for key in wanted if key not in ids]
+        if missing:
+            rows = self._select(cur, missing)
+            self._remember(rows)
+            ids.update((name_key(row['name']), row['id']) for row in rows)
+            missing = [wanted[key] for key in wanted if key not in ids]
+
+        if missing and create:
+            cur.execute(
+                f"INSERT INTO {self.table} (name) VALUES {','.join(['(%s)'] * len(missing))} "
+                f"ON DUPLICATE KEY UPDATE name = name",
+                missing
+            )
+            rows = self._select(cur, missing)
+            ids.update((name_key(row['name']), row['id']) for row in rows)
+            # Rows we just inserted are invisible to other connections until
+            # commit, so only cache them once that happens.
+            conn.on_commit(lambda: self._remember(rows))
+            unresolved = [wanted[key] for key in wanted if key not in ids]
+            if unresolved:
+                raise ValueError(f"Could not resolve {self.table} names: {', '.join(unresolved)}")
+
+        return ids
+
+
+skills = Taxonomy('skills')
+tech_stacks = Taxonomy('tech_stacks')
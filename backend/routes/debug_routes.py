@@ -0,0 +1,30 @@
+import os
+from flask import Blueprint, current_app, request, jsonify
+from database.instrumentation import query_stats, N_PLUS_ONE_THRESHOLD, SLOW_QUERY_MS
+
+debug_bp = Blueprint('debug', __name__, url_prefix='/api/debug')
+
+@debug_bp.before_request
+def debug_only():
+    if not (current_app.debug or os.getenv('SQL_DEBUG_ENDPOINT', 'false').lower() == 'true'):
+        return jsonify({'success': False, 'message': 'Not found'}), 404
+
+@debug_bp.route('/queries', methods=['GET'])
+def get_queries():
+    """Aggregated SQL statistics per statement fingerprint"""
+    order_by = request.args.get('order_by', 'total_ms')
+    limit = request.args.get('limit', 50, type=int)
+    queries = query_stats.snapshot(order_by=order_by)[:limit]
+    return jsonify({
+        'success': True,
+        'slow_query_ms': SLOW_QUERY_MS,
+        'n_plus_one_threshold': N_PLUS_ONE_THRESHOLD,
+        'count': len(queries),
+        'queries': queries
+    }), 200
+
+@debug_bp.route('/queries', methods=['DELETE'])
+def reset_queries():
+    """Clear the aggregated SQL statistics"""
+    query_stats.reset()
+    return jsonify({'success': True, 'message': 'Query statistics reset'}), 200
@@ -109,9 +109,13 @@
 
 
 from flask import Blueprint, current_app, request, jsonify
-from database.models import FreelancerProfile, Job, JobApplication, Notification, User
+from database.models import FreelancerProfile, Job, JobApplication, Notification, SavedSearch, User, \
+    MATCH_MODES, parse_choice, parse_names
+from database.session import transaction
 from services.email_instance import email_service   # ✅ the global instance
 from utils.auth_utils import token_required, freelancer_required
+from utils.pagination import InvalidCursor, page_args
+from utils.executor import fan_out
 from datetime import datetime
 import traceback
 
@@ -123,19 +127,19 @@ freelancer_bp = Blueprint('freelancer', __name__, url_prefix='/api/freelancer')
 @freelancer_required
 def get_dashboard():
     try:
-        # Get freelancer profile and stats
-        profile = FreelancerProfile.get_by_user_id(request.user_id)
-        stats = FreelancerProfile.get_stats(request.user_id)
-        recent_applications = JobApplication.get_recent_by_freelancer(request.user_id, limit=5)
-        recommended_jobs = Job.get_recommended_for_freelancer(request.user_id, limit=5)
+        # Independent parts run concurrently; a failed part comes back empty
+        user_id = request.user_id
+        parts, errors = fan_out({
+            'profile': lambda: FreelancerProfile.get_by_user_id(user_id),
+            'stats': lambda: FreelancerProfile.get_stats(user_id),
+            'recent_applications': lambda: JobApplication.get_recent_by_freelancer(user_id, limit=5),
+            'recommended_jobs': lambda: Job.get_recommended_for_freelancer(user_id, limit=5)
+        }, defaults={'stats': {}, 'recent_applications': [], 'recommended_jobs': []})
 
-        return jsonify({
-            'success': True,
-            'profile': profile,
-            'stats': stats,
-            'recent_applications': recent_applications,
-            'recommended_jobs': recommended_jobs
-        }), 200
+        response = {'success': True, **parts}
+        if errors:
+            response['errors'] = errors
+        return jsonify(response), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -175,16 +179,33 @@ def search_jobs():
     try:
         filters = {
             'search': request.args.get('search', ''),
-            'experience_level': request.args.get('experience_level', ''),
+            'search_mode': request.args.get('search_mode', ''),
+            'experience_level': parse_choice(request.args.get('experience_level')),
             'min_pay': request.args.get('min_pay', type=float),
             'max_pay': request.args.get('max_pay', type=float),
-            'job_type': request.args.get('job_type', ''),
-            'is_remote': request.args.get('is_remote') == 'true'
+            'job_type': parse_choice(request.args.get('job_type')),
+            'is_remote': request.args.get('is_remote') == 'true',
+            'skills': parse_names(request.args.get('skills')),
+            'skills_match': request.args.get('skills_match', 'all'),
+            'tech_stack': parse_names(request.args.get('tech_stack')),
+            'tech_match': request.args.get('tech_match', 'all')
         }
+        if filters['skills_match'] not in MATCH_MODES or filters['tech_match'] not in MATCH_MODES:
+            return jsonify({
+                'success': False,
+                'message': f"skills_match and tech_match must be one of: {', '.join(MATCH_MODES)}"
+            }), 400
         # Remove empty filters
-        filters = {k: v for k, v in filters.items() if v not in (None, '', False)}
-        jobs = Job.search(filters)
-        return jsonify({'success': True, 'jobs': jobs}), 200
+        filters = {k: v for k, v in filters.items() if v not in (None, '', False, [])}
+        limit, cursor = page_args()
+        with_facets = request.args.get('facets', 'false').lower() == 'true'
+        jobs = Job.search(filters, limit=limit, cursor=cursor, facets=with_facets)
+        result = {'success': True, 'jobs': jobs, 'next_cursor': jobs.next_cursor}
+        if with_facets:
+            result['facets'] = jobs.facets
+        return jsonify(result), 200
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -212,40 +233,46 @@ def apply_for_job(job_id):
         if not data.get('cover_letter'):
             return jsonify({'success': False, 'message': 'Cover letter is required'}), 400
 
-        application_id = JobApplication.create(
-            job_id=job_id,
-            freelancer_id=request.user_id,
-            application_data=data
-        )
+        # Application, counter update and recruiter notification commit together
+        with transaction():
+            application_id, error = JobApplication.apply(
+                job_id=job_id,
+                freelancer_id=request.user_id,
+                application_data=data
+            )
 
-        if not application_id:
-            return jsonify({
-                'success': False,
-                'message': 'You have already applied for this job or job not found'
-            }), 400
+            if error == JobApplication.ALREADY_APPLIED:
+                return jsonify({'success': False, 'message': 'You have already applied for this job'}), 400
+            if error == JobApplication.NOT_FOUND:
+                return jsonify({'success': False, 'message': 'Job or freelancer profile not found'}), 404
+            if not application_id:
+                raise RuntimeError('Could not create the application')
+
+            # Loaded once here and handed to the email below
+            job = Job.get_by_id(job_id)
+            freelancer = User.find_by_id(request.user_id)
+            if job:
+                # Create in-app notification for recruiter
+                freelancer_name = f"{freelancer['first_name']} {freelancer['last_name']}"
+                notification_id = Notification.create(
+                    user_id=job['recruiter_id'],
+                    title='New Job Application',
+                    message=f'{freelancer_name} has applied for {job["title"]}',
+                    notification_type='application',
+                    related_application_id=application_id,
+                    related_job_id=job_id
+                )
+                if not notification_id:
+                    raise RuntimeError('Could not notify the recruiter')
 
-        # Get job details for email
-        job = Job.get_by_id(job_id)
         if job:
             # Retrieve email service from app config
             email_service = current_app.config.get('EMAIL_SERVICE')
             if email_service:
-                email_service.send_application_submitted_notification(application_id)
+                email_service.send_application_submitted_notification(application_id, job=job, freelancer=freelancer)
             else:
                 print("⚠️ Email service not available")
 
-            # Create in-app notification for recruiter
-            freelancer = User.find_by_id(request.user_id)
-            freelancer_name = f"{freelancer['first_name']} {freelancer['last_name']}"
-            Notification.create(
-                user_id=job['recruiter_id'],
-                title='New Job Application',
-                message=f'{freelancer_name} has applied for {job["title"]}',
-                notification_type='application',
-                related_application_id=application_id,
-                related_job_id=job_id
-            )
-
         return jsonify({
             'success': True,
             'message': 'Application submitted successfully! The recruiter has been notified.',
@@ -262,8 +289,45 @@ def apply_for_job(job_id):
 @freelancer_required
 def get_my_applications():
     try:
-        applications = JobApplication.get_by_freelancer(request.user_id)
-        return jsonify({'success': True, 'applications': applications}), 200
+        limit, cursor = page_args()
+        applications = JobApplication.get_by_freelancer(request.user_id, limit=limit, cursor=cursor)
+        return jsonify({'success': True, 'applications': applications, 'next_cursor': applications.next_cursor}), 200
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# ==================== Saved Searches ====================
+@freelancer_bp.route('/saved-searches', methods=['GET', 'POST'])
+@token_required
+@freelancer_required
+def saved_searches():
+    try:
+        if request.method == 'GET':
+            return jsonify({'success': True, 'saved_searches': SavedSearch.get_by_user(request.user_id)}), 200
+
+        data = request.get_json() or {}
+        name = (data.get('name') or '').strip()
+        if not name:
+            return jsonify({'success': False, 'message': 'Name is required'}), 400
+        try:
+            search_id = SavedSearch.create(request.user_id, name[:100], data.get('filters') or {})
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        if not search_id:
+            return jsonify({'success': False, 'message': 'Failed to save search'}), 500
+        return jsonify({'success': True, 'message': 'Search saved', 'saved_search_id': search_id}), 201
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@freelancer_bp.route('/saved-searches/<int:search_id>', methods=['DELETE'])
+@token_required
+@freelancer_required
+def delete_saved_search(search_id):
+    try:
+        if not SavedSearch.delete(search_id, request.user_id):
+            return jsonify({'success': False, 'message': 'Saved search not found'}), 404
+        return jsonify({'success': True, 'message': 'Saved search deleted'}), 200
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
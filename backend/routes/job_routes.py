@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from database.db_config import get_db_connection
-from database.models import Job
+from database.counters import job_applications, job_views
+from database.models import Job, MATCH_MODES, SEARCH_MODES, parse_choice, parse_names
 from utils.auth_utils import token_required
+from utils.pagination import InvalidCursor, page_args
 import traceback
 
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
@@ -11,94 +13,81 @@ def get_jobs():
     """Get all active jobs with filters"""
     try:
         search = request.args.get('search', '')
-        experience_level = request.args.get('experience_level', '')
+        experience_level = parse_choice(request.args.get('experience_level'))
         min_pay = request.args.get('min_pay', '')
         max_pay = request.args.get('max_pay', '')
-        job_type = request.args.get('job_type', '')
+        job_type = parse_choice(request.args.get('job_type'))
         is_remote = request.args.get('is_remote', '')
 
-        connection = get_db_connection()
-        cursor = connection.cursor()
+        skills = parse_names(request.args.get('skills'))
+        skills_match = request.args.get('skills_match', 'all')
+        tech_stack = parse_names(request.args.get('tech_stack'))
+        tech_match = request.args.get('tech_match', 'all')
 
-        query = """
-            SELECT j.*, 
-                   rp.company_name,
-                   CONCAT(u.first_name, ' ', u.last_name) as recruiter_name
-            FROM jobs j
-            JOIN recruiter_profiles rp ON j.recruiter_profile_id = rp.id
-            JOIN users u ON j.recruiter_id = u.id
-            WHERE j.is_active = TRUE
-        """
-        params = []
-
-        if search:
-            query += """ AND (
-                LOWER(j.title) LIKE LOWER(%s) OR 
-                LOWER(j.description) LIKE LOWER(%s) OR 
-                LOWER(j.requirements) LIKE LOWER(%s)
-            )"""
-            search_term = f'%{search}%'
-            params.extend([search_term, search_term, search_term])
-
-        if experience_level:
-            query += " AND j.experience_level = %s"
-            params.append(experience_level)
-
-        if min_pay:
-            try:
-                min_pay_val = float(min_pay)
-                query += " AND j.pay_per_hour >= %s"
-                params.append(min_pay_val)
-            except ValueError:
-                pass
-
-        if max_pay:
-            try:
-                max_pay_val = float(max_pay)
-                query += " AND j.pay_per_hour <= %s"
-                params.append(max_pay_val)
-            except ValueError:
-                pass
-
-        if job_type and job_type != 'All Types':
-            query += " AND j.job_type = %s"
-            params.append(job_type)
-
-        if is_remote and is_remote.lower() == 'true':
-            query += " AND j.is_remote = TRUE"
-
-        query += " ORDER BY j.created_at DESC"
-
-        cursor.execute(query, params)
-        jobs = cursor.fetchall()
-
-        # Get skills for each job
-        for job in jobs:
-            cursor.execute("""
-                SELECT s.name
-                FROM job_skills js
-                JOIN skills s ON js.skill_id = s.id
-                WHERE js.job_id = %s
-            """, (job['id'],))
-            job['required_skills'] = [s['name'] for s in cursor.fetchall()]
-
-            cursor.execute("""
-                SELECT ts.name
-                FROM job_tech_stacks jts
-                JOIN tech_stacks ts ON jts.tech_stack_id = ts.id
-                WHERE jts.job_id = %s
-            """, (job['id'],))
-            job['tech_stack'] = [t['name'] for t in cursor.fetchall()]
+        search_mode = request.args.get('search_mode', 'natural')
+        limit, page_cursor = page_args()
 
-        cursor.close()
-        connection.close()
+        if search_mode not in SEARCH_MODES:
+            return jsonify({
+                'success': False,
+                'message': f"search_mode must be one of: {', '.join(SEARCH_MODES)}",
+                'jobs': []
+            }), 400
 
-        return jsonify({
+        if skills_match not in MATCH_MODES or tech_match not in MATCH_MODES:
+            return jsonify({
+                'success': False,
+                'message': f"skills_match and tech_match must be one of: {', '.join(MATCH_MODES)}",
+                'jobs': []
+            }), 400
+
+        try:
+            min_pay_val = float(min_pay) if min_pay else None
+        except ValueError:
+            min_pay_val = None
+        try:
+            max_pay_val = float(max_pay) if max_pay else None
+        except ValueError:
+            max_pay_val = None
+        is_remote = is_remote.lower() == 'true'
+
+        filters = {
+            'search': search,
+            'search_mode': search_mode,
+            'experience_level': experience_level,
+            'job_type': job_type,
+            'is_remote': is_remote,
+            'min_pay': min_pay_val,
+            'max_pay': max_pay_val,
+            'skills': skills,
+            'skills_match': skills_match,
+            'tech_stack': tech_stack,
+            'tech_match': tech_match
+        }
+
+        # Index, FULLTEXT or plain keyset paging, as for freelancer search
+        with_facets = request.args.get('facets', 'false').lower() == 'true'
+        jobs = Job.search(filters, limit=limit, cursor=page_cursor, facets=with_facets)
+        for job in jobs:
+            job['recruiter_name'] = f"{job.pop('first_name')} {job.pop('last_name')}"
+
+        result = {
             'success': True,
             'count': len(jobs),
-            'jobs': jobs
-        }), 200
-
+            'jobs': jobs,
+            'next_cursor': jobs.next_cursor
+        }
+        # Counts per filter value over all matches, not just this page
+        if with_facets:
+            result['facets'] = jobs.facets
+        return jsonify(result), 200
+
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'jobs': []
+        }), 400
     except Exception as e:
         traceback.print_exc()
         return jsonify({
@@ -128,29 +117,12 @@ def get_job(job_id):
         job = cursor.fetchone()
 
         if job:
-            # Get required skills
-            cursor.execute("""
-                SELECT s.id, s.name
-                FROM job_skills js
-                JOIN skills s ON js.skill_id = s.id
-                WHERE js.job_id = %s
-            """, (job_id,))
-            job['required_skills'] = [s['name'] for s in cursor.fetchall()]
-
-            # Get tech stack
-            cursor.execute("""
-                SELECT ts.id, ts.name
-                FROM job_tech_stacks jts
-                JOIN tech_stacks ts ON jts.tech_stack_id = ts.id
-                WHERE jts.job_id = %s
-            """, (job_id,))
-            job['tech_stack'] = [t['name'] for t in cursor.fetchall()]
-
-            # Increment view count
-            cursor.execute("""
-                UPDATE jobs SET views_count = views_count + 1 WHERE id = %s
-            """, (job_id,))
-            connection.commit()
+            Job.attach_skills(cursor, [job])
+            job_applications.attach(cursor, [job])
+
+            # Count the view; written in batches by the write-behind buffer
+            job_views.add(job_id)
+            job['views_count'] += job_views.pending(job_id)
 
         cursor.close()
         connection.close()
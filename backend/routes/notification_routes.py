@@ -62,8 +62,12 @@
 from flask import Blueprint, request, jsonify
 from database.models import Notification
 from utils.auth_utils import token_required
+from utils.pagination import InvalidCursor, page_args
 
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
+# The newest 50 unless the client asks for another page size, as before
+# the list was paged
+NOTIFICATIONS_PAGE_SIZE = 50
 
 @notifications_bp.route('', methods=['GET'])
 @token_required
@@ -71,19 +75,23 @@ def get_notifications():
     """Get user notifications"""
     try:
         unread_only = request.args.get('unread_only', 'false').lower() == 'true'
-        limit = request.args.get('limit', 50, type=int)
+        limit, cursor = page_args()
 
         notifications = Notification.get_by_user(
             request.user_id,
             unread_only=unread_only,
-            limit=limit
+            limit=NOTIFICATIONS_PAGE_SIZE if limit is None else limit,
+            cursor=cursor
         )
 
         return jsonify({
             'success': True,
             'count': len(notifications),
-            'notifications': notifications
+            'notifications': notifications,
+            'next_cursor': notifications.next_cursor
         }), 200
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
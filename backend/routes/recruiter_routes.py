@@ -117,8 +117,11 @@
 
 from flask import Blueprint, current_app, request, jsonify
 from database.models import RecruiterProfile, Job, JobApplication, Notification, User
+from database.session import transaction
 from services.email_instance import email_service
 from utils.auth_utils import token_required, recruiter_required
+from utils.pagination import InvalidCursor, page_args
+from utils.executor import fan_out
 from datetime import datetime
 import traceback
 
@@ -130,18 +133,19 @@ recruiter_bp = Blueprint('recruiter', __name__, url_prefix='/api/recruiter')
 @recruiter_required
 def get_dashboard():
     try:
-        profile = RecruiterProfile.get_by_user_id(request.user_id)
-        stats = RecruiterProfile.get_stats(request.user_id)
-        recent_jobs = Job.get_recent_by_recruiter(request.user_id, limit=5)
-        recent_applications = JobApplication.get_recent_for_recruiter(request.user_id, limit=5)
-
-        return jsonify({
-            'success': True,
-            'profile': profile,
-            'stats': stats,
-            'recent_jobs': recent_jobs,
-            'recent_applications': recent_applications
-        }), 200
+        # Independent parts run concurrently; a failed part comes back empty
+        user_id = request.user_id
+        parts, errors = fan_out({
+            'profile': lambda: RecruiterProfile.get_by_user_id(user_id),
+            'stats': lambda: RecruiterProfile.get_stats(user_id),
+            'recent_jobs': lambda: Job.get_recent_by_recruiter(user_id, limit=5),
+            'recent_applications': lambda: JobApplication.get_recent_for_recruiter(user_id, limit=5)
+        }, defaults={'stats': {}, 'recent_jobs': [], 'recent_applications': []})
+
+        response = {'success': True, **parts}
+        if errors:
+            response['errors'] = errors
+        return jsonify(response), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -181,8 +185,11 @@ def profile():
 @recruiter_required 
 def get_my_jobs():
     try:
-        jobs = Job.get_by_recruiter(request.user_id)
-        return jsonify({'success': True, 'jobs': jobs}), 200
+        limit, cursor = page_args()
+        jobs = Job.get_by_recruiter(request.user_id, limit=limit, cursor=cursor)
+        return jsonify({'success': True, 'jobs': jobs, 'next_cursor': jobs.next_cursor}), 200
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
     
@@ -303,12 +310,14 @@ def update_job(job_id):
 @recruiter_required
 def get_all_applications():
     try:
-        jobs = Job.get_by_recruiter(request.user_id)
-        job_ids = [job['id'] for job in jobs]
+        limit, cursor = page_args()
+        job_ids = Job.get_ids_by_recruiter(request.user_id)
         if not job_ids:
-            return jsonify({'success': True, 'applications': []})
-        applications = JobApplication.get_by_job_ids(job_ids)
-        return jsonify({'success': True, 'applications': applications})
+            return jsonify({'success': True, 'applications': [], 'next_cursor': None})
+        applications = JobApplication.get_by_job_ids(job_ids, limit=limit, cursor=cursor)
+        return jsonify({'success': True, 'applications': applications, 'next_cursor': applications.next_cursor})
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -383,8 +392,12 @@ def get_job_applications(job_id):
         if not job or job['recruiter_id'] != request.user_id:
             return jsonify({'success': False, 'message': 'Job not found'}), 404
 
-        applications = JobApplication.get_by_job(job_id)
-        return jsonify({'success': True, 'applications': applications}), 200
+        include_details = request.args.get('include_details', 'false').lower() == 'true'
+        limit, cursor = page_args()
+        applications = JobApplication.get_by_job(job_id, include_details=include_details, limit=limit, cursor=cursor)
+        return jsonify({'success': True, 'applications': applications, 'next_cursor': applications.next_cursor}), 200
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -421,19 +434,33 @@ def update_application_status(application_id):
                 'message': f'Invalid status. Must be one of: {", ".join(valid_statuses)}'
             }), 400
 
-        application = JobApplication.update_status(
-            application_id,
-            data['status'],
-            data.get('recruiter_notes')
-        )
-
-        if not application:
-            return jsonify({'success': False, 'message': 'Application not found'}), 404
+        # Status change and in-app notification commit together
+        with transaction():
+            application = JobApplication.update_status(
+                application_id,
+                data['status'],
+                data.get('recruiter_notes')
+            )
 
-        # Get job and freelancer details
-        job = Job.get_by_id(application['job_id'])
-        freelancer = User.find_by_id(application['freelancer_id'])
-        freelancer_name = f"{freelancer['first_name']} {freelancer['last_name']}"
+            if not application:
+                return jsonify({'success': False, 'message': 'Application not found'}), 404
+
+            # Get job and freelancer details
+            job = Job.get_by_id(application['job_id'])
+            freelancer = User.find_by_id(application['freelancer_id'])
+            freelancer_name = f"{freelancer['first_name']} {freelancer['last_name']}"
+
+            # In-app notification
+            notification_id = Notification.create(
+                user_id=application['freelancer_id'],
+                title=f'Application {data["status"].title()}',
+                message=f'Your application for {job["title"]} has been {data["status"]}',
+                notification_type='application',
+                related_application_id=application_id,
+                related_job_id=application['job_id']
+            )
+            if not notification_id:
+                raise RuntimeError('Could not notify the freelancer')
 
         # Send email to freelancer using app config
         email_service = current_app.config.get('EMAIL_SERVICE')
@@ -448,16 +475,6 @@ def update_application_status(application_id):
                 user_id=freelancer['id']
             )
 
-        # In-app notification
-        Notification.create(
-            user_id=application['freelancer_id'],
-            title=f'Application {data["status"].title()}',
-            message=f'Your application for {job["title"]} has been {data["status"]}',
-            notification_type='application',
-            related_application_id=application_id,
-            related_job_id=application['job_id']
-        )
-
         return jsonify({
             'success': True,
             'message': f'Application {data["status"]} successfully. Freelancer has been notified.'
@@ -0,0 +1,22 @@
+from flask import Blueprint, request, jsonify
+from database import suggest
+from utils.auth_utils import token_required
+
+taxonomy_bp = Blueprint('taxonomy', __name__, url_prefix='/api/taxonomy')
+
+@taxonomy_bp.route('/suggest', methods=['GET'])
+@token_required
+def suggest_names():
+    """Skill or tech stack names starting with q, most used first"""
+    try:
+        kind = request.args.get('type', 'skills')
+        if kind not in suggest.SUGGESTERS:
+            return jsonify({
+                'success': False,
+                'message': f"type must be one of: {', '.join(suggest.SUGGESTERS)}"
+            }), 400
+        limit = request.args.get('limit', suggest.DEFAULT_LIMIT, type=int)
+        suggestions = suggest.suggest(kind, request.args.get('q', ''), limit)
+        return jsonify({'success': True, 'suggestions': suggestions}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
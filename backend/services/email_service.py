@@ -1258,19 +1258,26 @@ class EmailService:
         """
         return self.send_email(to_email, subject, self._base_template(inner), user_id)
 
-    def send_application_submitted_notification(self, application_id):
+    def send_application_submitted_notification(self, application_id, job=None, freelancer=None):
         
-        """Send notification to recruiter – fetches all data from DB."""
+        """Send notification to recruiter – job and freelancer are fetched from DB unless passed in."""
         try:
             from database.models import JobApplication, Job, User
-            app = JobApplication.get_by_id(application_id)
-            if not app:
-                print(f"❌ Application {application_id} not found")
-                return False
-            job = Job.get_by_id(app['job_id'])
-            freelancer = User.find_by_id(app['freelancer_id'])
-            recruiter = User.find_by_id(job['recruiter_id'])
-            if not all([job, freelancer, recruiter]):
+            if job is None or freelancer is None:
+                app = JobApplication.get_by_id(application_id)
+                if not app:
+                    print(f"❌ Application {application_id} not found")
+                    return False
+                job = job or Job.get_by_id(app['job_id'])
+                if not job:
+                    return False
+                # Freelancer and recruiter in one query
+                users = User.find_by_ids([app['freelancer_id'], job['recruiter_id']])
+                freelancer = freelancer or users.get(app['freelancer_id'])
+                recruiter = users.get(job['recruiter_id'])
+            else:
+                recruiter = User.find_by_id(job['recruiter_id'])
+            if not freelancer or not recruiter:
                 return False
 
             to_email = recruiter['email']
@@ -0,0 +1,92 @@
+import re
+import pytest
+
+
+class FakeCursor:
+    """Records statements; rows come from the owning FakeDb's handler"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = 0
+        self.lastrowid = None
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.db.statements.append((' '.join(sql.split()), params))
+        result = self.db.handler(' '.join(sql.split()), params)
+        if isinstance(result, Exception):
+            raise result
+        if isinstance(result, int):
+            # A write: result is its rowcount
+            self._rows, self.rowcount = [], result
+            if result:
+                self.db.last_insert_id += 1
+                self.lastrowid = self.db.last_insert_id
+            return
+        self._rows = list(result or [])
+        self.rowcount = len(self._rows)
+
+    def executemany(self, sql, seq):
+        for params in seq:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, db):
+        self.db = db
+        self._on_commit = []
+
+    def cursor(self, *args):
+        return FakeCursor(self.db)
+
+    def on_commit(self, callback):
+        self._on_commit.append(callback)
+
+    def commit(self):
+        self.db.commits += 1
+        callbacks, self._on_commit = self._on_commit, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        self.db.rollbacks += 1
+        self._on_commit = []
+
+    def close(self):
+        self.db.closed += 1
+
+
+class FakeDb:
+    """A pool whose connections log every statement.
+
+    handler(sql, params) returns the rows for a statement, the rowcount of a
+    write, or an exception to raise; sql has its whitespace collapsed. The
+    default returns no rows.
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda sql, params: [])
+        self.statements = []
+        self.commits = self.rollbacks = self.closed = 0
+        self.last_insert_id = 0
+
+    def connection(self, timeout=None):
+        return FakeConn(self)
+
+    def sql(self, pattern):
+        """Statements whose SQL matches the regex pattern"""
+        return [(sql, params) for sql, params in self.statements if re.search(pattern, sql, re.I)]
+
+
+@pytest.fixture
+def fake_db():
+    return FakeDb()
@@ -0,0 +1,160 @@
+import re
+from collections import defaultdict
+import pytest
+from database.counters import ShardedColumns, ShardedCounter
+
+
+class Store:
+    """Just enough of jobs, job_counter_slots, job_applications, totals and
+    totals_slots for the statements the sharded counters issue"""
+
+    def __init__(self):
+        self.jobs = {}                      # id -> applications_count
+        self.applications = defaultdict(int)  # job_id -> rows in job_applications
+        self.job_slots = defaultdict(int)   # (job_id, counter, slot) -> delta
+        self.totals = {}                    # user_id -> {column: value}
+        self.total_slots = {}               # (user_id, slot) -> {column: value}
+
+    def __call__(self, sql, params):
+        params = list(params or [])
+        if sql.startswith('INSERT INTO job_counter_slots'):
+            job_id, counter, slot, n = params
+            self.job_slots[job_id, counter, slot] += n
+        elif sql.startswith('SELECT DISTINCT job_id FROM job_counter_slots'):
+            return [{'job_id': j} for j in {j for j, c, _ in self.job_slots if c == params[0]}]
+        elif sql.startswith('SELECT job_id, SUM(delta)'):
+            ids, counter = set(params[:-1]), params[-1]
+            sums = defaultdict(int)
+            for (j, c, _), delta in self.job_slots.items():
+                if c == counter and j in ids:
+                    sums[j] += delta
+            return [{'job_id': j, 'delta': d} for j, d in sums.items()]
+        elif sql.startswith('DELETE FROM job_counter_slots'):
+            ids, counter = set(params[:-1]), params[-1]
+            self.job_slots = defaultdict(int, {k: v for k, v in self.job_slots.items()
+                                               if not (k[0] in ids and k[1] == counter)})
+        elif sql.startswith('SELECT id FROM jobs WHERE id IN'):
+            return [{'id': j} for j in params if j in self.jobs]
+        elif sql == 'SELECT id FROM jobs ORDER BY id':
+            return [{'id': j} for j in sorted(self.jobs)]
+        elif sql.startswith('SELECT id, applications_count AS value'):
+            return [{'id': j, 'value': self.jobs[j]} for j in params if j in self.jobs]
+        elif sql.startswith('SELECT job_id AS job_id, COUNT(*)'):
+            return [{'job_id': j, 'total': self.applications[j]} for j in params if self.applications[j]]
+        elif sql.startswith('UPDATE jobs SET applications_count'):
+            pairs = len(params) // 3
+            values = dict(zip(params[0:2 * pairs:2], params[1:2 * pairs:2]))
+            relative = 'applications_count + CASE' in sql
+            for j, v in values.items():
+                self.jobs[j] = self.jobs[j] + v if relative else v
+        elif sql.startswith('INSERT INTO totals_slots'):
+            columns = re.search(r'\(user_id, slot, ([^)]*)\)', sql).group(1).split(', ')
+            slot, values, (user_id,) = params[0], params[1:1 + len(columns)], params[1 + len(columns):]
+            row = self.total_slots.setdefault((user_id, slot), defaultdict(int))
+            for c, v in zip(columns, values):
+                row[c] += v
+        elif sql.startswith('SELECT DISTINCT user_id AS row_key FROM totals_slots'):
+            return [{'row_key': u} for u in {u for u, _ in self.total_slots}]
+        elif sql.startswith('SELECT user_id AS row_key'):
+            sums = {}
+            for (u, _), row in self.total_slots.items():
+                if u in params:
+                    target = sums.setdefault(u, {'row_key': u, 'a': None, 'b': None})
+                    for c, v in row.items():
+                        target[c] = (target[c] or 0) + v
+            return list(sums.values())
+        elif sql.startswith('DELETE FROM totals_slots'):
+            self.total_slots = {k: v for k, v in self.total_slots.items() if k[0] not in params}
+        elif sql.startswith('INSERT INTO totals'):
+            user_id, a, b = params
+            row = self.totals.setdefault(user_id, {'a': 0, 'b': 0})
+            row['a'] += a
+            row['b'] += b
+        return []
+
+
+@pytest.fixture
+def store(fake_db):
+    fake_db.handler = Store()
+    return fake_db
+
+
+@pytest.fixture
+def totals():
+    return ShardedColumns('totals', 'totals', 'totals_slots', 'user_id', ('a', 'b'), slots=4)
+
+
+def key(user_id):
+    return "SELECT %s AS user_id", (user_id,)
+
+
+def test_columns_add_to_slots_and_sum_them(store, totals):
+    cur = store.connection().cursor()
+    for _ in range(10):
+        totals.add(cur, *key(7), {'a': 1, 'b': 0})
+    totals.add(cur, *key(7), {'b': -2})
+    totals.add(cur, *key(8), {'a': 0})
+    assert len(store.sql('^INSERT INTO totals_slots')) == 11
+    assert totals.pending(cur, [7, 8]) == {7: {'a': 10, 'b': -2}}
+    assert totals.pending(cur, []) == {}
+    with pytest.raises(ValueError, match='Not a totals counter: c'):
+        totals.add(cur, *key(7), {'c': 1})
+
+
+def test_columns_rollup_folds_slots_into_the_row(store, totals):
+    conn = store.connection()
+    cur = conn.cursor()
+    totals.add(cur, *key(7), {'a': 3})
+    totals.add(cur, *key(8), {'b': 2})
+    assert totals.rollup(conn, batch_size=1) == 2
+    assert store.handler.totals == {7: {'a': 3, 'b': 0}, 8: {'a': 0, 'b': 2}}
+    assert store.handler.total_slots == {} and store.commits == 3
+    assert totals.rollup(conn) == 0
+
+
+def test_columns_clear_drops_only_the_given_rows(store, totals):
+    cur = store.connection().cursor()
+    totals.add(cur, *key(7), {'a': 1})
+    totals.add(cur, *key(8), {'a': 1})
+    totals.clear(cur, [7])
+    assert totals.pending(cur, [7, 8]) == {8: {'a': 1, 'b': 0}}
+
+
+@pytest.fixture
+def applications():
+    return ShardedCounter('applications', 'applications_count', 'job_applications', 'job_id', slots=4)
+
+
+def test_counter_attach_adds_unrolled_slots(store, applications):
+    cur = store.connection().cursor()
+    for _ in range(5):
+        applications.add(cur, 1)
+    applications.add(cur, 2, -1)
+    jobs = applications.attach(cur, [{'id': 1, 'applications_count': 2}, {'id': 2, 'applications_count': 1},
+                                     {'id': 3, 'applications_count': None}])
+    assert [job['applications_count'] for job in jobs] == [7, 0, 0]
+
+
+def test_counter_rollup_skips_deleted_jobs(store, applications):
+    store.handler.jobs.update({1: 2, 2: 0})
+    conn = store.connection()
+    cur = conn.cursor()
+    applications.add(cur, 1, 3)
+    applications.add(cur, 9, 1)
+    assert applications.rollup(conn) == 1
+    assert store.handler.jobs == {1: 5, 2: 0}
+    # Slots of a job that no longer exists are left alone
+    assert applications.pending(cur, [1, 9]) == {9: 1}
+
+
+def test_counter_reconcile_resets_drifted_jobs_from_the_source(store, applications, capsys):
+    db = store.handler
+    db.jobs.update({1: 4, 2: 1, 3: 0})
+    db.applications.update({1: 5, 2: 1})
+    conn = store.connection()
+    applications.add(conn.cursor(), 1, 1)
+    applications.add(conn.cursor(), 3, 2)
+    assert applications.reconcile(conn) == 1
+    assert db.jobs == {1: 5, 2: 1, 3: 0}
+    assert not db.job_slots
+    assert 'applications for job 3 drifted: 2 != 0' in capsys.readouterr().out
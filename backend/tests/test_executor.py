@@ -0,0 +1,83 @@
+import time
+import pytest
+from flask import Flask
+from database import db_config, session as db_session
+from database.pool import ConnectionPool, PoolTimeout
+from utils import executor
+from utils.executor import fan_out
+
+
+@pytest.fixture
+def app(monkeypatch, fake_db):
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+    app = Flask(__name__)
+    db_session.init_app(app)
+    return app
+
+
+def query(sql):
+    def call():
+        cur = db_config.get_db_connection().cursor()
+        cur.execute(sql)
+        return cur.fetchall()
+    return call
+
+
+def test_workers_leave_pool_connections_for_requests():
+    assert 1 <= executor.MAX_WORKERS < db_config.POOL_MAX_SIZE
+
+
+def test_results_errors_and_defaults(app):
+    def fail():
+        raise ValueError('boom')
+
+    with app.test_request_context('/'):
+        results, errors = fan_out({
+            'jobs': query("SELECT * FROM jobs"),
+            'broken': fail,
+            'slow': (lambda: time.sleep(0.3), 0.05),
+        }, defaults={'slow': []})
+    assert results == {'jobs': [], 'broken': None, 'slow': []}
+    assert errors == {'broken': 'boom', 'slow': 'timeout'}
+
+
+def test_each_call_caps_its_queries_and_resets_the_connection(app, fake_db):
+    with app.test_request_context('/'):
+        fan_out({'jobs': (query("SELECT * FROM jobs"), 0.5)})
+    caps = [params[0] for sql, params in fake_db.sql('MAX_EXECUTION_TIME')]
+    assert len(caps) == 2 and 0 < caps[0] <= 500 and caps[1] == 0
+    assert fake_db.statements[1][0] == "SELECT * FROM jobs"
+
+
+def test_checkout_waits_no_longer_than_the_call(app, monkeypatch):
+    waits = []
+
+    class Pool:
+        def connection(self, timeout=None):
+            waits.append(timeout)
+            raise PoolTimeout('exhausted')
+    monkeypatch.setattr(db_config, 'get_pool', lambda: Pool())
+    with app.test_request_context('/'):
+        _, errors = fan_out({'jobs': (query("SELECT 1"), 0.5)})
+    assert errors == {'jobs': 'exhausted'}
+    assert 0 < waits[0] <= 0.5
+
+
+def test_pool_checkout_timeout_is_capped_by_the_pool_timeout():
+    class Pool(ConnectionPool):
+        def _open(self):
+            raise AssertionError('pool is full')
+    pool = Pool({}, min_size=0, max_size=1, timeout=0.05)
+    pool._size = 1
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.connection(timeout=10)
+    assert time.monotonic() - started < 1
+
+
+def test_calls_queued_past_their_deadline_are_not_started():
+    ran = []
+    run = executor._bounded(lambda: ran.append(1), time.monotonic() - 1)
+    with pytest.raises(executor.FutureTimeout):
+        run()
+    assert ran == []
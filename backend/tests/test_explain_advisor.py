@@ -0,0 +1,28 @@
+from flask import Flask
+from database import counters, db_config, explain_advisor
+
+
+def test_advise_rolls_back_and_drops_view_counts(monkeypatch, fake_db):
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+    monkeypatch.setattr(explain_advisor, '_sample_ids', lambda cur: {})
+
+    def collect(app, ids):
+        # What GET /api/jobs/<id> does inside the catalog
+        counters.job_views.add(4242)
+        return {'SELECT * FROM jobs WHERE id = ?': ("SELECT * FROM jobs WHERE id = %s", (4242,))}
+    monkeypatch.setattr(explain_advisor, 'collect', collect)
+    monkeypatch.setattr(explain_advisor, 'explain', lambda cur, sql, params, min_rows: ([], []))
+
+    report = explain_advisor.advise(Flask(__name__))
+
+    assert [entry['fingerprint'] for entry in report] == ['SELECT * FROM jobs WHERE id = ?']
+    assert counters.job_views.pending(4242) == 0
+    assert fake_db.commits == 0 and fake_db.rollbacks >= 1
+
+
+def test_view_counts_resume_after_the_suspended_block():
+    views = counters.BufferedCounter('jobs', 'views_count', interval=3600)
+    with views.suspended():
+        views.add(1)
+    views.add(2)
+    assert (views.pending(1), views.pending(2)) == (0, 1)
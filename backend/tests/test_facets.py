@@ -0,0 +1,66 @@
+import pytest
+from database import db_config
+from database.models import Job
+from database.search_index import FACET_TOP_SKILLS, PAY_BUCKET_LABELS, pay_bucket
+
+GROUPS = [
+    {'experience_level': 'senior', 'job_type': 'contract', 'is_remote': 1, 'pay_bucket': pay_bucket(80), 'count': 3},
+    {'experience_level': 'senior', 'job_type': 'full-time', 'is_remote': 0, 'pay_bucket': pay_bucket(80), 'count': 2},
+    {'experience_level': 'junior', 'job_type': 'contract', 'is_remote': 0, 'pay_bucket': pay_bucket(10), 'count': 1},
+]
+SKILLS = [{'name': 'Python', 'count': 4}, {'name': 'Go', 'count': 2}]
+
+
+@pytest.fixture
+def db(monkeypatch, fake_db):
+    def handler(sql, params):
+        if 'JOIN job_skills' in sql:
+            return SKILLS
+        if 'GROUP BY experience_level' in sql:
+            return GROUPS
+        return []
+    fake_db.handler = handler
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+    return fake_db
+
+
+def test_counts_are_summed_per_facet(db):
+    facets = Job.facets({})
+    assert facets['experience_level'] == {'senior': 5, 'junior': 1}
+    assert facets['job_type'] == {'contract': 4, 'full-time': 2}
+    assert facets['is_remote'] == {'true': 3, 'false': 3}
+    assert list(facets['pay_per_hour']) == PAY_BUCKET_LABELS
+    assert facets['pay_per_hour'][pay_bucket(80)] == 5 and facets['pay_per_hour'][pay_bucket(10)] == 1
+    assert facets['skills'] == [{'name': 'Python', 'count': 4}, {'name': 'Go', 'count': 2}]
+
+
+def test_matching_jobs_are_a_derived_table_not_a_cte(db):
+    Job.facets({'search': 'python -php', 'search_mode': 'boolean', 'experience_level': 'senior'})
+    assert len(db.statements) == 2
+    for sql, params in db.statements:
+        assert not sql.lstrip().upper().startswith('WITH')
+        assert ') AS matched' in sql
+        assert params[:2] == ['python -php', 'senior']
+    assert db.statements[1][1][-1] == FACET_TOP_SKILLS
+
+
+def test_index_answers_unless_the_search_is_boolean(db, monkeypatch):
+    from database import models
+    asked = []
+
+    def facets(text, filters):
+        asked.append(text)
+        return {'from': 'index'}
+    monkeypatch.setattr(models.job_index, 'facets', facets)
+    assert Job.facets({'search': 'python'}) == {'from': 'index'}
+    assert Job.facets({}) == {'from': 'index'}
+    assert not db.statements
+    assert Job.facets({'search': 'python', 'search_mode': 'boolean'})['experience_level'] == {'senior': 5, 'junior': 1}
+    assert asked == ['python', None]
+
+
+def test_database_answers_until_the_index_is_built(db, monkeypatch):
+    from database import models
+    monkeypatch.setattr(models.job_index, 'facets', lambda text, filters: None)
+    assert Job.facets({'search': 'python'})['job_type'] == {'contract': 4, 'full-time': 2}
+    assert len(db.statements) == 2
@@ -0,0 +1,76 @@
+import pytest
+from flask import Flask
+from database import instrumentation
+from database.instrumentation import InstrumentedCursor, QueryStats, fingerprint, request_summary
+
+
+@pytest.mark.parametrize('sql, expected', [
+    ("SELECT * FROM jobs WHERE id = 42", "SELECT * FROM jobs WHERE id = ?"),
+    ("SELECT * FROM jobs WHERE id = %s", "SELECT * FROM jobs WHERE id = ?"),
+    ("SELECT * FROM users WHERE email = 'a@b.c'", "SELECT * FROM users WHERE email = ?"),
+    ('SELECT * FROM users WHERE email = "it\\"s"', "SELECT * FROM users WHERE email = ?"),
+    ("SELECT * FROM users WHERE name = %(name)s", "SELECT * FROM users WHERE name = ?"),
+    ("SELECT pay_per_hour FROM jobs WHERE pay_per_hour > 12.5", "SELECT pay_per_hour FROM jobs WHERE pay_per_hour > ?"),
+    ("SELECT  *\n  FROM jobs -- trailing\n WHERE /* hint */ id = 1", "SELECT * FROM jobs WHERE id = ?"),
+])
+def test_fingerprint_replaces_literals(sql, expected):
+    assert fingerprint(sql) == expected
+
+
+def test_fingerprint_collapses_in_lists_of_any_length():
+    one = fingerprint("SELECT * FROM jobs WHERE id IN (%s)")
+    many = fingerprint("SELECT * FROM jobs WHERE id IN (1, 2, 3, 4)")
+    assert one == many == "SELECT * FROM jobs WHERE id IN (...)"
+
+
+def test_fingerprint_collapses_multi_row_values():
+    one = fingerprint("INSERT INTO skills (name) VALUES (%s)")
+    many = fingerprint("INSERT INTO skills (name) VALUES (%s), (%s), ('Go')")
+    assert one == many == "INSERT INTO skills (name) VALUES (...)"
+
+
+def test_fingerprint_keeps_identifiers_with_digits():
+    assert fingerprint("SELECT utf8mb4 FROM t1") == "SELECT utf8mb4 FROM t1"
+
+
+def test_query_stats_aggregates_per_fingerprint(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'SLOW_QUERY_MS', 100)
+    stats = QueryStats()
+    stats.record('SELECT ?', 10.0, 1)
+    stats.record('SELECT ?', 150.0, 3)
+    stats.record('UPDATE t SET a = ?', 1.0, -1)
+    first, second = stats.snapshot()
+    assert first['fingerprint'] == 'SELECT ?'
+    assert (first['count'], first['total_ms'], first['max_ms'], first['avg_ms']) == (2, 160.0, 150.0, 80.0)
+    assert (first['rows'], first['slow']) == (4, 1)
+    assert second['rows'] == 0
+
+
+def test_query_stats_stops_at_max_fingerprints(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'MAX_FINGERPRINTS', 2)
+    stats = QueryStats()
+    for fp in ('a', 'b', 'c'):
+        stats.record(fp, 1.0, 0)
+    stats.record('a', 1.0, 0)
+    assert {row['fingerprint']: row['count'] for row in stats.snapshot()} == {'a': 2, 'b': 1}
+
+
+class FakeCursor:
+    rowcount = 1
+
+    def execute(self, query, args=None):
+        pass
+
+
+def test_request_summary_flags_repeated_fingerprints(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'query_stats', QueryStats())
+    monkeypatch.setattr(instrumentation, 'N_PLUS_ONE_THRESHOLD', 3)
+    app = Flask(__name__)
+    with app.app_context():
+        cur = InstrumentedCursor(FakeCursor())
+        cur.execute("SELECT * FROM jobs")
+        for job_id in (1, 2, 3):
+            cur.execute("SELECT * FROM job_skills WHERE job_id = %s", (job_id,))
+        summary = request_summary()
+    assert summary['count'] == 4
+    assert summary['n_plus_one'] == {"SELECT * FROM job_skills WHERE job_id = ?": 3}
@@ -0,0 +1,72 @@
+import pytest
+from pymysql.err import IntegrityError
+from flask import Flask
+from database import db_config, identity_map, session as db_session
+from database.models import JobApplication
+from database.session import current_session, transaction
+
+
+@pytest.fixture
+def db(monkeypatch, fake_db):
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+    fake_db.result = 1
+
+    def handler(sql, params):
+        if sql.startswith('INSERT INTO job_applications'):
+            return fake_db.result
+        return []
+    fake_db.handler = handler
+    return fake_db
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    db_session.init_app(app)
+    return app
+
+
+def apply(job_id=42, freelancer_id=7):
+    return JobApplication.apply(job_id, freelancer_id, {'cover_letter': 'Hello', 'proposed_rate': 50})
+
+
+def test_apply_inserts_from_the_profile_in_one_statement(db, monkeypatch):
+    forgotten = []
+    monkeypatch.setattr(identity_map, 'forget', lambda kind, key: forgotten.append((kind, key)))
+    assert apply() == (1, None)
+    insert, job_slot, freelancer_stats, recruiter_slot = db.statements
+    assert 'SELECT j.id, fp.user_id, fp.id' in insert[0] and 'JOIN freelancer_profiles fp ON fp.user_id = %s' in insert[0]
+    assert insert[1][0] == 'Hello' and insert[1][-2:] == (7, 42)
+    assert job_slot[0].startswith('INSERT INTO job_counter_slots') and job_slot[1][0] == 42
+    assert freelancer_stats[0].startswith('INSERT INTO user_stats ') and freelancer_stats[1][0] == 7
+    assert recruiter_slot[0].startswith('INSERT INTO user_stats_slots ') and recruiter_slot[1][-1] == 42
+    assert forgotten == [('job', 42)]
+    assert db.commits == 1
+
+
+def test_missing_job_or_profile_inserts_nothing(db):
+    db.result = 0
+    assert apply() == (None, JobApplication.NOT_FOUND)
+    assert len(db.statements) == 1 and db.commits == 0
+
+
+def test_duplicate_entry_is_already_applied_and_keeps_the_transaction(db, app):
+    db.result = IntegrityError(1062, "Duplicate entry '42-7' for key 'unique_application'")
+    with app.app_context():
+        with transaction():
+            assert apply() == (None, JobApplication.ALREADY_APPLIED)
+            assert not current_session().rollback_only
+        assert (db.commits, db.rollbacks) == (1, 0)
+
+
+def test_other_integrity_errors_roll_back(db, capsys):
+    db.result = IntegrityError(1452, 'Cannot add or update a child row: a foreign key constraint fails')
+    assert apply() == (None, None)
+    assert db.rollbacks == 1 and db.commits == 0
+    assert 'foreign key' in capsys.readouterr().out
+
+
+def test_create_returns_only_the_id(db):
+    assert JobApplication.create(42, 7, {}) == 1
+    db.result = 0
+    assert JobApplication.create(42, 7, {}) is None
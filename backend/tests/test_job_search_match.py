@@ -0,0 +1,32 @@
+import pytest
+from database.models import boolean_query, job_search_match
+
+
+@pytest.mark.parametrize('search, against', [
+    ('python -php', 'python -php'),
+    ('"python', 'python'),
+    ('+-python', 'python'),
+    ('python*(', 'python*'),
+    ('+"machine learning" ~java', '+"machine learning" ~java'),
+    ('(react OR vue) >node <php', 'react or vue >node <php'),
+    ('rest-ful c++', 'rest ful c'),
+    ('@3 "" * django', '3 django'),
+])
+def test_boolean_query_keeps_only_well_formed_terms(search, against):
+    assert boolean_query(search) == against
+
+
+def test_boolean_search_binds_the_rebuilt_query():
+    sql, params = job_search_match('+python* -"php dev', 'boolean')
+    assert sql.endswith('AGAINST (%s IN BOOLEAN MODE)')
+    assert params == ['+python* php dev']
+
+
+def test_natural_search_is_bound_as_typed():
+    sql, params = job_search_match(' python "developer ', 'natural')
+    assert 'IN NATURAL LANGUAGE MODE' in sql and params == ['python "developer']
+
+
+def test_short_words_become_prefix_terms_and_no_words_no_match():
+    assert job_search_match('"ui', 'boolean')[1] == ['+ui*']
+    assert job_search_match('+-"*(', 'boolean') == (None, [])
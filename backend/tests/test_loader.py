@@ -0,0 +1,118 @@
+import pytest
+from flask import Flask
+from database import identity_map, loader
+from database.loader import Loader
+
+
+class Batch:
+    """Multi-get over a dict that records the keys of every call"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, keys):
+        self.calls.append(list(keys))
+        return {key: self.rows[key] for key in keys if key in self.rows}
+
+
+@pytest.fixture
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+
+def test_deferred_keys_are_fetched_in_one_batch():
+    batch = Batch({1: {'id': 1}, 2: {'id': 2}})
+    items = Loader(batch)
+    deferred = [items.defer(key) for key in (1, 2, 1, 3)]
+    assert [d.get() for d in deferred] == [{'id': 1}, {'id': 2}, {'id': 1}, None]
+    assert batch.calls == [[1, 2, 3]]
+
+
+def test_loaded_keys_and_misses_are_not_fetched_again():
+    batch = Batch({1: {'id': 1}})
+    items = Loader(batch)
+    items.load(1)
+    items.load(2)
+    assert items.load(1) == {'id': 1}
+    assert items.load(2) is None
+    assert batch.calls == [[1], [2]]
+
+
+def test_load_dispatches_everything_deferred_so_far():
+    batch = Batch({1: {'id': 1}, 2: {'id': 2}})
+    items = Loader(batch)
+    later = items.defer(2)
+    assert items.load(1) == {'id': 1}
+    assert later.get() == {'id': 2}
+    assert batch.calls == [[2, 1]]
+
+
+def test_none_key_never_reaches_the_batch():
+    batch = Batch({})
+    items = Loader(batch)
+    assert items.load(None) is None
+    assert batch.calls == []
+
+
+def test_load_many_drops_missing_keys():
+    items = Loader(Batch({1: {'id': 1}, 3: {'id': 3}}))
+    assert items.load_many([1, 2, 3]) == {1: {'id': 1}, 3: {'id': 3}}
+
+
+def test_results_are_copies():
+    items = Loader(Batch({1: {'id': 1, 'skills': []}}))
+    items.load(1)['skills'].append('Python')
+    assert items.load(1) == {'id': 1, 'skills': []}
+
+
+def test_prime_and_clear():
+    batch = Batch({1: {'id': 1, 'fresh': True}})
+    items = Loader(batch)
+    items.prime(1, {'id': 1, 'fresh': False})
+    assert items.load(1)['fresh'] is False
+    items.clear(1)
+    assert items.load(1)['fresh'] is True
+    assert batch.calls == [[1]]
+
+
+def test_outside_an_app_context_each_call_gets_a_new_loader():
+    batch = Batch({})
+    assert loader.loader('users', batch) is not loader.loader('users', batch)
+
+
+def test_loaders_are_shared_within_a_request(app_context):
+    batch = Batch({})
+    assert loader.loader('users', batch) is loader.loader('users', batch)
+    assert loader.loader('users', batch) is not loader.loader('jobs', batch)
+
+
+def test_model_writes_invalidate_every_loader(app_context):
+    batch = Batch({1: {'id': 1}})
+    users = loader.loader('users', batch)
+    jobs = loader.loader('jobs', batch)
+    users.load(1)
+    jobs.load(1)
+    identity_map.forget('application', 5)
+    users.load(1)
+    jobs.load(1)
+    assert batch.calls == [[1], [1], [1], [1]]
+
+
+def test_identity_map_caches_hits_and_returns_copies(app_context):
+    calls = []
+
+    @identity_map.mapped('job')
+    def get_job(job_id):
+        calls.append(job_id)
+        return {'id': job_id, 'tags': []} if job_id == 1 else None
+
+    get_job(1)['tags'].append('x')
+    assert get_job(1) == {'id': 1, 'tags': []}
+    assert get_job(2) is None
+    assert get_job(2) is None
+    assert calls == [1, 2, 2]
+    identity_map.forget('job', 1)
+    get_job(1)
+    assert calls == [1, 2, 2, 1]
@@ -0,0 +1,111 @@
+import pytest
+from database import migrate
+from database.migrate import SchemaOutOfDate, check_schema, discover
+
+
+class Schema:
+    """schema_migrations and GET_LOCK as a FakeDb handler sees them"""
+
+    def __init__(self):
+        self.applied = {}
+        self.lock_free = True
+
+    def __call__(self, sql, params):
+        if sql.startswith('SELECT GET_LOCK'):
+            return [{'got': 1 if self.lock_free else 0}]
+        if sql.startswith('SELECT version, name, checksum'):
+            return [dict(version=v, name=n, checksum=c, applied_at=None)
+                    for v, (n, c) in sorted(self.applied.items())]
+        if sql.startswith('INSERT INTO schema_migrations'):
+            version, name, checksum = params
+            self.applied[version] = (name, checksum)
+        if sql.startswith('DELETE FROM schema_migrations'):
+            del self.applied[params[0]]
+        if 'information_schema.tables' in sql and "'schema_migrations'" in sql:
+            return [{'1': 1}]
+        return []
+
+
+@pytest.fixture
+def migrations(tmp_path, monkeypatch):
+    def write(version, name, up="CREATE TABLE t (id INT)", down="DROP TABLE t"):
+        (tmp_path / f"{version:04d}_{name}.py").write_text(
+            f"def up(cur):\n    cur.execute({up!r})\n\n\ndef down(cur):\n    cur.execute({down!r})\n")
+    monkeypatch.setattr(migrate, 'MIGRATIONS_DIR', str(tmp_path))
+    write(1, 'first', up="CREATE TABLE a (id INT)", down="DROP TABLE a")
+    write(2, 'second', up="CREATE TABLE b (id INT)", down="DROP TABLE b")
+    (tmp_path / 'helpers.py').write_text('')
+    return write
+
+
+@pytest.fixture
+def db(monkeypatch, fake_db):
+    fake_db.handler = schema = Schema()
+    monkeypatch.setattr(migrate, 'get_pool', lambda: fake_db)
+    fake_db.schema = schema
+    return fake_db
+
+
+def test_discover_orders_by_version_and_rejects_duplicates(migrations):
+    assert [(m.version, m.name) for m in discover()] == [(1, 'first'), (2, 'second')]
+    migrations(2, 'again')
+    with pytest.raises(RuntimeError, match='Duplicate'):
+        discover()
+
+
+def test_migrate_applies_pending_under_the_lock(migrations, db):
+    assert migrate.migrate() == [1, 2]
+    statements = [sql for sql, _ in db.statements]
+    lock = next(i for i, sql in enumerate(statements) if sql.startswith('SELECT GET_LOCK'))
+    release = next(i for i, sql in enumerate(statements) if sql.startswith('SELECT RELEASE_LOCK'))
+    assert lock < statements.index('CREATE TABLE a (id INT)') < statements.index('CREATE TABLE b (id INT)') < release
+    assert db.sql('lock_wait_timeout')
+    assert db.commits == 2
+    # Nothing left to do
+    assert migrate.migrate() == []
+
+
+def test_migrate_stops_at_the_target(migrations, db):
+    assert migrate.migrate(target=1) == [1]
+    assert sorted(db.schema.applied) == [1]
+
+
+def test_migrate_refuses_while_another_process_holds_the_lock(migrations, db):
+    db.schema.lock_free = False
+    with pytest.raises(RuntimeError, match='Another process'):
+        migrate.migrate()
+    assert not db.sql('CREATE TABLE a') and db.rollbacks == 1
+
+
+def test_changed_migration_is_reported_not_reapplied(migrations, db, capsys):
+    migrate.migrate()
+    migrations(1, 'first', up="CREATE TABLE a (id BIGINT)")
+    assert migrate.migrate() == []
+    assert 'changed after it was applied' in capsys.readouterr().out
+
+
+def test_rollback_reverts_the_newest_first(migrations, db):
+    migrate.migrate()
+    assert migrate.rollback(2) == [2, 1]
+    assert db.sql('^DROP TABLE b') and db.schema.applied == {}
+
+
+def test_check_schema_raises_while_migrations_are_pending(migrations, db, monkeypatch):
+    monkeypatch.delenv('MIGRATE_ON_START', raising=False)
+    monkeypatch.delenv('SCHEMA_CHECK', raising=False)
+    with pytest.raises(SchemaOutOfDate, match='0001_first, 0002_second'):
+        check_schema()
+    # The check itself writes nothing
+    assert not db.sql('CREATE|INSERT|GET_LOCK')
+    monkeypatch.setenv('MIGRATE_ON_START', 'true')
+    check_schema()
+    assert sorted(db.schema.applied) == [1, 2]
+    monkeypatch.delenv('MIGRATE_ON_START')
+    check_schema()
+
+
+def test_shipped_migrations_are_numbered_in_sequence_and_reversible():
+    shipped = discover()
+    assert [m.version for m in shipped] == list(range(1, len(shipped) + 1))
+    for m in shipped:
+        assert callable(m.module.up) and callable(m.module.down)
@@ -0,0 +1,77 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from flask import Flask
+from utils import pagination
+from utils.pagination import (InvalidCursor, Page, decode_cursor, encode_cursor, keyset_condition,
+                              order_by, page_args, page_size)
+
+
+def test_cursor_round_trip_stringifies_dates_and_decimals():
+    cursor = encode_cursor([datetime(2024, 5, 1, 12, 30), Decimal('1.50'), 7])
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 3) == ['2024-05-01 12:30:00', '1.50', 7]
+
+
+@pytest.mark.parametrize('cursor', ['not base64!', encode_cursor([1]), encode_cursor([[1], 2]), 'e30'])
+def test_decode_rejects_malformed_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
+
+
+def test_tagged_cursor_only_decodes_with_its_tag():
+    cursor = encode_cursor([0.5, '2024-01-01 00:00:00', 3], 'bm25')
+    assert decode_cursor(cursor, 3, 'bm25') == [0.5, '2024-01-01 00:00:00', 3]
+    with pytest.raises(InvalidCursor, match='different ordering'):
+        decode_cursor(cursor, 3, 'fulltext')
+    with pytest.raises(InvalidCursor, match='different ordering'):
+        decode_cursor(encode_cursor([0.5, '2024-01-01 00:00:00', 3]), 3, 'bm25')
+
+
+def test_keyset_condition_single_column():
+    sql, params = keyset_condition(('j.id',), encode_cursor([10]))
+    assert sql == "j.id < %s"
+    assert params == [10]
+
+
+def test_keyset_condition_expands_row_comparison():
+    sql, params = keyset_condition(('j.created_at', 'j.id'), encode_cursor(['2024-01-01 00:00:00', 10]))
+    assert sql == "(j.created_at < %s OR (j.created_at = %s AND j.id < %s))"
+    assert params == ['2024-01-01 00:00:00', '2024-01-01 00:00:00', 10]
+
+
+def test_keyset_condition_repeats_expression_params():
+    columns = (('MATCH(title) AGAINST (%s)', ['python']), 'j.id')
+    sql, params = keyset_condition(columns, encode_cursor([1.5, 10], 'fulltext'), 'fulltext')
+    assert sql == "(MATCH(title) AGAINST (%s) < %s OR (MATCH(title) AGAINST (%s) = %s AND j.id < %s))"
+    assert params == ['python', 1.5, 'python', 1.5, 10]
+
+
+def test_order_by_is_descending():
+    assert order_by(('j.created_at', 'j.id')) == " ORDER BY j.created_at DESC, j.id DESC"
+
+
+def test_page_from_rows_sets_cursor_only_when_more_rows_exist():
+    rows = [{'created_at': f'2024-01-0{n}', 'id': n} for n in (5, 4, 3)]
+    page = Page.from_rows(rows, 2, ('created_at', 'id'))
+    assert [row['id'] for row in page] == [5, 4]
+    assert decode_cursor(page.next_cursor, 2) == ['2024-01-04', 4]
+    last = Page.from_rows(rows[:2], 2, ('created_at', 'id'))
+    assert len(last) == 2 and last.next_cursor is None
+
+
+def test_page_size(monkeypatch):
+    monkeypatch.setattr(pagination, 'DEFAULT_PAGE_SIZE', 50)
+    monkeypatch.setattr(pagination, 'MAX_PAGE_SIZE', 100)
+    assert page_size() == 50
+    assert page_size(0) == 1
+    assert page_size(1000) == 100
+    assert page_size('20') == 20
+
+
+def test_page_args_reads_the_query_string():
+    app = Flask(__name__)
+    with app.test_request_context('/?limit=10&cursor=abc'):
+        assert page_args() == (10, 'abc')
+    with app.test_request_context('/?limit=x&cursor='):
+        assert page_args() == (None, None)
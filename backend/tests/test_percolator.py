@@ -0,0 +1,139 @@
+import pytest
+from database.percolator import WILDCARD, Percolator, SavedQuery, job_document
+from database.search_index import pay_bucket
+
+
+def query(search_id, **filters):
+    return SavedQuery(search_id, 100 + search_id, f'search {search_id}', filters)
+
+
+def doc(job_id=1, title='Backend developer', description='', level='senior', job_type='contract',
+        remote=False, pay=60, skills=(), techs=()):
+    return job_document({
+        'id': job_id, 'title': title, 'description': description, 'requirements': '',
+        'experience_level': level, 'job_type': job_type, 'is_remote': remote, 'pay_per_hour': pay,
+        'skill_names': '\n'.join(skills), 'tech_names': '\n'.join(techs),
+    })
+
+
+def percolator(*queries):
+    p = Percolator()
+    for q in queries:
+        p._add(q)
+    return p
+
+
+def matched_ids(p, *docs):
+    return sorted((q.id, d['id']) for q, d in p.match(docs))
+
+
+@pytest.mark.parametrize('filters, anchors', [
+    ({'skills': ['Python', 'Django'], 'tech_stack': ['MERN'], 'search': 'api'}, [('skill', 'django')]),
+    ({'skills': ['Python', 'Go'], 'skills_match': 'any'}, [('skill', 'go'), ('skill', 'python')]),
+    ({'tech_stack': ['MERN'], 'search': 'api'}, [('tech', 'mern')]),
+    ({'search': 'python api', 'experience_level': 'senior'}, [('term', 'api'), ('term', 'python')]),
+    ({'experience_level': 'senior', 'job_type': 'contract'}, [('level', 'senior')]),
+    ({'job_type': 'contract', 'is_remote': True}, [('type', 'contract')]),
+    ({'is_remote': True}, [('remote', True)]),
+    ({}, [WILDCARD]),
+])
+def test_anchor_is_the_most_selective_filter(filters, anchors):
+    assert sorted(query(1, **filters).anchors()) == sorted(anchors)
+
+
+def test_boolean_searches_are_not_anchored_on_terms():
+    assert query(1, search='python -php', search_mode='boolean').anchors() == [WILDCARD]
+    # Only short words / stopwords: checked in SQL as a prefix query
+    assert query(2, search='ui of').boolean
+
+
+def test_pay_range_anchors_cover_every_bucket_it_overlaps():
+    anchors = query(1, min_pay=30, max_pay=80).anchors()
+    labels = [label for _, label in anchors]
+    assert pay_bucket(30) in labels and pay_bucket(80) in labels
+    assert pay_bucket(10) not in labels and pay_bucket(200) not in labels
+    assert [label for _, label in query(2, min_pay=200).anchors()] == [pay_bucket(200)]
+
+
+def test_zero_pay_is_no_bound():
+    q = query(1, min_pay=0, max_pay='')
+    assert q.min_pay is None and q.max_pay is None
+    assert q.anchors() == [WILDCARD]
+
+
+def test_match_checks_every_filter():
+    p = percolator(
+        query(1, skills=['python', 'DJANGO']),
+        query(2, skills=['Python', 'Go'], skills_match='any', is_remote=True),
+        query(3, search='backend', experience_level='senior', max_pay=50),
+        query(4, tech_stack=['MERN']),
+        query(5, job_type='contract', min_pay=40),
+        query(6),
+    )
+    job = doc(1, skills=('Python', 'Django'), pay=60)
+    remote_go = doc(2, title='Go developer', level='junior', remote=True, pay=30, skills=('Go',))
+    assert matched_ids(p, job, remote_go) == [(1, 1), (2, 2), (5, 1), (6, 1), (6, 2)]
+
+
+def test_each_search_matches_a_job_once_whatever_its_anchors():
+    p = percolator(query(1, skills=['Python', 'Django'], skills_match='any'))
+    assert matched_ids(p, doc(1, skills=('Python', 'Django'))) == [(1, 1)]
+
+
+def test_keyword_search_matches_title_description_and_skills():
+    p = percolator(query(1, search='kubernetes'))
+    assert matched_ids(p, doc(1, title='Kubernetes admin'), doc(2, description='we run kubernetes'),
+                       doc(3, skills=('Kubernetes',)), doc(4)) == [(1, 1), (1, 2), (1, 3)]
+
+
+def test_accented_names_match():
+    p = percolator(query(1, skills=['Cafe']))
+    assert matched_ids(p, doc(1, skills=('Café',))) == [(1, 1)]
+
+
+def test_removed_searches_stop_matching():
+    p = percolator(query(1, skills=['Python', 'Go'], skills_match='any'), query(2))
+    p._remove(1)
+    assert matched_ids(p, doc(1, skills=('Python',))) == [(2, 1)]
+    assert ('skill', 'python') not in p._anchors
+
+
+def test_boolean_matches_wait_for_the_fulltext_check():
+    p = percolator(query(1, search='python -php', search_mode='boolean'))
+    (q, d), = p.match([doc(1)])
+    assert q.boolean and d['id'] == 1
+
+
+class FakeCursor:
+    def __init__(self, matching_ids):
+        self.matching_ids = matching_ids
+        self.queries = []
+
+    def execute(self, sql, params):
+        self.queries.append((sql, params))
+        self.result = [{'id': job_id} for job_id in params if job_id in self.matching_ids]
+
+    def fetchall(self):
+        return self.result
+
+
+def test_boolean_searches_are_checked_with_one_query_per_search():
+    boolean, natural = query(1, search='python -php', search_mode='boolean'), query(2, search='backend')
+    matched = [(boolean, doc(1)), (boolean, doc(2)), (natural, doc(3))]
+    cur = FakeCursor({2})
+    kept = Percolator._check_boolean(cur, matched)
+    assert [(q.id, d['id']) for q, d in kept] == [(1, 2), (2, 3)]
+    assert len(cur.queries) == 1
+    sql, params = cur.queries[0]
+    assert 'IN BOOLEAN MODE' in sql and params == [1, 2, 'python -php']
+
+
+def test_saved_search_filters_drop_ui_sentinels():
+    from database.models import SavedSearch
+    assert SavedSearch.normalize({'job_type': 'All Types', 'experience_level': 'All Levels',
+                                  'skills': 'Python, Go', 'skills_match': 'any', 'min_pay': '0'}) == \
+        {'skills': ['Python', 'Go'], 'skills_match': 'any', 'min_pay': 0.0}
+    with pytest.raises(ValueError):
+        SavedSearch.normalize({'job_type': 'All Types'})
+    with pytest.raises(ValueError):
+        SavedSearch.normalize({'salary': 10})
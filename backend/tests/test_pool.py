@@ -0,0 +1,138 @@
+import pytest
+from database import pool as pool_module
+from database.pool import ConnectionPool, PoolTimeout
+
+
+class FakeRaw:
+    def __init__(self):
+        self.open = True
+        self.rollbacks = 0
+        self.closed = False
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def ping(self, reconnect=False):
+        if not self.open:
+            raise ConnectionError('gone')
+
+    def close(self):
+        self.closed = True
+        self.open = False
+
+
+class FakePool(ConnectionPool):
+    def __init__(self, **kwargs):
+        self.opened = []
+        super().__init__({}, **kwargs)
+
+    def _open(self):
+        raw = FakeRaw()
+        self.opened.append(raw)
+        return raw, pool_module.time.monotonic()
+
+
+def test_checkout_reuses_released_connection():
+    pool = FakePool(min_size=0, max_size=2)
+    conn = pool.connection()
+    raw = conn._raw
+    conn.close()
+    assert raw.rollbacks == 1
+    assert pool.connection()._raw is raw
+    assert len(pool.opened) == 1
+
+
+def test_close_twice_releases_once():
+    pool = FakePool(min_size=0, max_size=2)
+    conn = pool.connection()
+    conn.close()
+    conn.close()
+    assert pool.stats()['idle'] == 1
+    assert pool.stats()['in_use'] == 0
+
+
+def test_exhausted_pool_times_out():
+    pool = FakePool(min_size=0, max_size=1, timeout=0.05)
+    pool.connection()
+    with pytest.raises(PoolTimeout):
+        pool.connection()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_dead_connection_is_discarded_on_release():
+    pool = FakePool(min_size=0, max_size=1)
+    conn = pool.connection()
+    conn._raw.open = False
+    conn.close()
+    assert pool.stats()['size'] == 0
+    assert pool.connection()._raw is pool.opened[1]
+
+
+def test_failed_ping_opens_a_new_connection():
+    pool = FakePool(min_size=0, max_size=1, ping_after=0)
+    conn = pool.connection()
+    raw = conn._raw
+    conn.close()
+    raw.open = False
+    assert pool.connection()._raw is not raw
+    assert pool.stats()['failed_pings'] == 1
+
+
+def test_fill_opens_min_size():
+    pool = FakePool(min_size=3, max_size=5)
+    pool.fill()
+    assert pool.stats()['idle'] == 3
+
+
+def test_fork_forgets_inherited_connections(monkeypatch):
+    pool = FakePool(min_size=2, max_size=2)
+    pool.fill()
+    held = pool.connection()
+    inherited = list(pool.opened)
+
+    monkeypatch.setattr(pool_module.os, 'getpid', lambda: pool._pid + 1)
+    conn = pool.connection()
+    assert conn._raw not in inherited
+    # The child opens its own min_size connections
+    assert (pool.stats()['size'], pool.stats()['idle']) == (2, 1)
+    # Returning a parent connection must neither close it nor pool it
+    held.close()
+    assert not any(raw.closed for raw in inherited)
+    assert pool.stats()['idle'] == 1
+
+
+def test_on_commit_runs_after_commit_and_not_after_rollback():
+    pool = FakePool(min_size=0, max_size=1)
+    conn = pool.connection()
+    conn._raw.commit = lambda: None
+    ran = []
+    conn.on_commit(lambda: ran.append('rolled back'))
+    conn.rollback()
+    conn.on_commit(lambda: ran.append('committed'))
+    conn.commit()
+    assert ran == ['committed']
+
+
+def test_prefill_logs_instead_of_raising(capsys):
+    pool = FakePool(min_size=2, max_size=2)
+
+    def refuse():
+        raise ConnectionError('refused')
+    pool._open = refuse
+    pool.prefill()
+    assert 'refused' in capsys.readouterr().out
+    assert pool.stats()['size'] == 0
+
+
+def test_db_config_opens_min_size_when_it_creates_a_pool(monkeypatch):
+    from database import db_config
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(FakeRaw())
+        return opened[-1]
+    monkeypatch.setattr(pool_module.pymysql, 'connect', connect)
+    monkeypatch.setenv('DB_POOL_MIN_SIZE', '3')
+    pool = db_config._make_pool({})
+    assert len(opened) == 3
+    assert pool.stats()['idle'] == 3
@@ -0,0 +1,332 @@
+from datetime import datetime, timedelta
+import random
+import pytest
+from database import search_index
+from database.search_index import CURSOR_TAG, JobIndex, _bit_positions, pay_bucket, tokenize
+from database.taxonomy import name_key
+from utils.pagination import InvalidCursor, encode_cursor
+
+START = datetime(2024, 1, 1)
+
+
+def job(job_id, title='', description='', level='mid', job_type='contract', remote=False, pay=50,
+        skills=(), techs=(), active=True):
+    return {
+        'id': job_id, 'title': title, 'description': description, 'requirements': '',
+        'experience_level': level, 'job_type': job_type, 'is_remote': remote, 'pay_per_hour': pay,
+        'created_at': START + timedelta(hours=job_id), 'updated_at': START + timedelta(hours=job_id),
+        'skill_names': '\n'.join(skills) or None, 'tech_names': '\n'.join(techs) or None,
+        'active': active,
+    }
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    """The rows load_active_jobs() sees; edit them and refresh() the index"""
+    rows = {}
+
+    def load_active_jobs(job_ids=None):
+        ids = rows if job_ids is None else [i for i in job_ids if i in rows]
+        return [dict(rows[i]) for i in ids if rows[i]['active']]
+
+    monkeypatch.setattr(search_index, 'load_active_jobs', load_active_jobs)
+    return rows
+
+
+def build(jobs, *rows):
+    for row in rows:
+        jobs[row['id']] = row
+    index = JobIndex()
+    index.build()
+    return index
+
+
+def ids(ranked):
+    return [entry[-1] for entry in ranked]
+
+
+def test_tokenize_drops_short_words_and_stopwords():
+    assert tokenize('The Python API for a REST-ful app') == ['python', 'api', 'rest', 'ful', 'app']
+
+
+def test_search_before_build_or_without_words_defers_to_sql(jobs):
+    assert JobIndex().search('python') is None
+    index = build(jobs, job(1, 'Python developer'))
+    assert index.search('the a of') is None
+
+
+def test_bm25_ranks_title_and_rare_terms_higher(jobs):
+    index = build(
+        jobs,
+        job(1, 'Backend engineer', 'We use python daily'),
+        job(2, 'Python engineer', 'Backend work'),
+        job(3, 'Frontend engineer', 'React'),
+        job(4, 'Data engineer', 'Python and Spark pipelines'),
+    )
+    ranked = ids(index.search('python'))
+    assert ranked[0] == 2 and sorted(ranked) == [1, 2, 4]
+    # "engineer" is in every document, so it barely moves the ranking
+    assert ids(index.search('python engineer'))[0] == 2
+    scores = [score for score, _, _ in index.search('python')]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_bm25_prefers_shorter_documents_at_equal_term_frequency(jobs):
+    index = build(
+        jobs,
+        job(1, 'Engineer', 'python ' + 'backend services ' * 10),
+        job(2, 'Engineer', 'python backend'),
+        job(3, 'Designer', 'figma'),
+    )
+    assert ids(index.search('python')) == [2, 1]
+
+
+def test_skill_names_are_searchable(jobs):
+    index = build(jobs, job(1, 'Engineer', skills=('Django',)), job(2, 'Engineer'))
+    assert ids(index.search('django')) == [1]
+
+
+def test_refresh_tombstones_inactive_jobs(jobs):
+    index = build(jobs, job(1, 'Python developer'), job(2, 'Python engineer'))
+    jobs[1]['active'] = False
+    index.refresh([1])
+    assert ids(index.search('python')) == [2]
+    assert ids(index.listing()) == [2]
+    stats = index.stats()
+    assert (stats['jobs'], stats['slots']) == (1, 2)
+
+
+def test_refresh_reindexes_changed_jobs(jobs):
+    index = build(jobs, job(1, 'Python developer'))
+    jobs[1] = job(1, 'Golang developer')
+    index.refresh([1])
+    assert index.search('python') == []
+    assert ids(index.search('golang')) == [1]
+
+
+def test_compaction_keeps_results_and_bitmaps(jobs):
+    rows = [job(i, f'Role {i} python', level='senior' if i % 2 else 'junior', skills=('Go',) if i % 3 == 0 else ())
+            for i in range(1, 2501)]
+    index = build(jobs, *rows)
+    removed = range(1, 2001)
+    for i in removed:
+        jobs[i]['active'] = False
+    index.refresh(removed)
+
+    stats = index.stats()
+    assert stats['jobs'] == stats['slots'] == 500
+    expected = [i for i in range(2500, 2000, -1)]
+    assert ids(index.listing()) == expected
+    assert sorted(ids(index.search('python'))) == sorted(expected)
+    assert ids(index.listing({'experience_level': 'senior', 'skills': ['go']})) == \
+        [i for i in expected if i % 2 and i % 3 == 0]
+
+
+def test_bitmap_filters(jobs):
+    index = build(
+        jobs,
+        job(1, level='senior', job_type='contract', remote=True, pay=80, skills=('Python', 'Django')),
+        job(2, level='senior', job_type='full-time', pay=40, skills=('Python',), techs=('MERN',)),
+        job(3, level='junior', job_type='contract', remote=True, pay=20, skills=('Go',)),
+    )
+
+    def listed(**filters):
+        return ids(index.listing(filters))
+
+    assert listed() == [3, 2, 1]
+    assert listed(experience_level='senior') == [2, 1]
+    assert listed(job_type='contract', is_remote=True) == [3, 1]
+    assert listed(skills=['python', 'DJANGO']) == [1]
+    assert listed(skills=['Django', 'Go'], skills_match='any') == [3, 1]
+    assert listed(skills=['Python'], tech_stack=['mern']) == [2]
+    assert listed(skills=['Rust']) == []
+    assert listed(min_pay=30, max_pay=90) == [2, 1]
+    assert listed(min_pay=0, max_pay=0) == [3, 2, 1]
+    assert listed(experience_level='lead') == []
+
+
+def test_accented_filter_names_match_the_indexed_name(jobs):
+    index = build(jobs, job(1, skills=('Café',)))
+    assert ids(index.listing({'skills': ['cafe']})) == [1]
+
+
+def test_search_applies_filters(jobs):
+    index = build(jobs, job(1, 'Python developer', remote=True), job(2, 'Python engineer'))
+    assert ids(index.search('python', {'is_remote': True})) == [1]
+
+
+def test_search_page_walks_every_result_once(jobs):
+    index = build(jobs, *[job(i, 'Python developer') for i in range(1, 8)])
+    seen, cursor = [], None
+    while True:
+        page, cursor = index.search_page(None, {}, 3, cursor)
+        seen.extend(ids(page))
+        if cursor is None:
+            break
+    assert seen == list(range(7, 0, -1))
+
+    page, cursor = index.search_page('python', {}, 5)
+    rest, last = index.search_page('python', {}, 5, cursor)
+    assert len(page) == 5 and len(rest) == 2 and last is None
+    assert set(ids(page)) | set(ids(rest)) == set(range(1, 8))
+
+
+def test_ranked_cursors_belong_to_the_bm25_ranking(jobs):
+    index = build(jobs, job(1, 'Python developer'), job(2, 'Python engineer'))
+    _, cursor = index.search_page('python', {}, 1)
+    assert cursor is not None
+    with pytest.raises(InvalidCursor, match='different ordering'):
+        index.search_page('python', {}, 1, encode_cursor([1.0, '2024-01-01 00:00:00', 1], 'fulltext'))
+    with pytest.raises(InvalidCursor):
+        index.search_page(None, {}, 1, cursor)
+    assert index.search_page('python', {}, 1, encode_cursor([99.0, '2030-01-01', 9], CURSOR_TAG))[0]
+
+
+def test_facets_count_matching_jobs(jobs):
+    index = build(
+        jobs,
+        job(1, 'Python developer', level='senior', remote=True, pay=80, skills=('Python',)),
+        job(2, 'Python engineer', level='junior', pay=10, skills=('Python', 'Go')),
+        job(3, 'Designer', level='junior', pay=10),
+    )
+    facets = index.facets('python')
+    assert facets['experience_level'] == {'senior': 1, 'junior': 1}
+    assert facets['is_remote'] == {'true': 1, 'false': 1}
+    assert facets['pay_per_hour'][pay_bucket(80)] == 1
+    assert facets['pay_per_hour'][pay_bucket(10)] == 1
+    assert facets['skills'] == [{'name': 'Python', 'count': 2}, {'name': 'Go', 'count': 1}]
+    assert index.facets(None, {'experience_level': 'junior'})['experience_level'] == {'junior': 2}
+
+
+def test_reloaded_rows_are_filtered_like_the_sql_path():
+    from database.models import Job
+    row = {'experience_level': 'senior', 'job_type': 'contract', 'is_remote': True, 'pay_per_hour': 60,
+           'required_skills': ['Python', 'Django'], 'tech_stack': []}
+    assert Job.matches_filters(row, {'experience_level': 'senior', 'skills': ['python'], 'min_pay': 50})
+    assert Job.matches_filters(row, {'skills': ['Go', 'Django'], 'skills_match': 'any', 'max_pay': 0})
+    assert not Job.matches_filters(row, {'skills': ['Go', 'Django']})
+    assert not Job.matches_filters(row, {'tech_stack': ['MERN']})
+    assert not Job.matches_filters(row, {'experience_level': 'junior'})
+    assert not Job.matches_filters(dict(row, is_remote=False), {'is_remote': True})
+    assert not Job.matches_filters(row, {'max_pay': 50})
+
+
+# -------------------- Slot bitmaps --------------------
+LEVELS = ('junior', 'mid', 'senior')
+TYPES = ('contract', 'full-time')
+SKILLS = ('Python', 'Go', 'Django', 'Café')
+TECHS = ('MERN', 'LAMP')
+
+
+@pytest.mark.parametrize('bits, slots', [
+    (0, []), (1, [0]), (0b1010, [1, 3]), (1 << 200 | 1 << 64 | 1, [0, 64, 200]),
+])
+def test_bit_positions(bits, slots):
+    assert _bit_positions(bits) == slots
+
+
+def candidates(index, **filters):
+    with index._lock:
+        found = index._candidates(filters)
+    return None if found is None else sorted(index._job_ids[slot] for slot in found)
+
+
+def test_no_filters_means_no_candidate_set(jobs):
+    index = build(jobs, job(1), job(2))
+    assert candidates(index) is None
+    assert candidates(index, min_pay=0, max_pay='', skills=['  ']) is None
+    assert candidates(index, skills=['Rust']) == []
+
+
+def test_removed_slots_leave_the_live_bitmap_only(jobs):
+    index = build(jobs, job(1, level='senior', skills=('Go',)), job(2, level='senior'))
+    slot = index._slots[1]
+    jobs[1]['active'] = False
+    index.refresh([1])
+    assert not index._alive_bits >> slot & 1
+    assert index._bitmaps['level', 'senior'] >> slot & 1
+    assert candidates(index, experience_level='senior') == [2]
+    assert candidates(index, skills=['go']) == []
+
+
+def test_a_changed_job_moves_to_a_new_slot(jobs):
+    index = build(jobs, job(1, level='junior', skills=('Go',)))
+    old = index._slots[1]
+    jobs[1] = job(1, level='senior', skills=('Python',))
+    index.refresh([1])
+    assert index._slots[1] != old
+    assert candidates(index, experience_level='junior') == []
+    assert candidates(index, experience_level='senior', skills=['python']) == [1]
+
+
+def matches(row, filters):
+    """The filters applied row by row, as Job.search_conditions does in SQL"""
+    if filters.get('experience_level') and row['experience_level'] != filters['experience_level']:
+        return False
+    if filters.get('job_type') and row['job_type'] != filters['job_type']:
+        return False
+    if filters.get('is_remote') and not row['is_remote']:
+        return False
+    if filters.get('min_pay') and row['pay_per_hour'] < filters['min_pay']:
+        return False
+    if filters.get('max_pay') and row['pay_per_hour'] > filters['max_pay']:
+        return False
+    for names_key, match_key, row_key in (('skills', 'skills_match', 'skill_names'),
+                                          ('tech_stack', 'tech_match', 'tech_names')):
+        wanted = {name_key(name) for name in filters.get(names_key) or ()}
+        if wanted:
+            have = {name_key(name) for name in (row[row_key] or '').split('\n') if name}
+            if not (wanted & have if filters.get(match_key) == 'any' else wanted <= have):
+                return False
+    return True
+
+
+def test_bitmaps_agree_with_row_by_row_filtering_through_churn_and_compaction(jobs):
+    rng = random.Random(23)
+
+    def random_job(job_id):
+        return job(job_id, level=rng.choice(LEVELS), job_type=rng.choice(TYPES), remote=rng.random() < 0.3,
+                   pay=rng.randrange(5, 200), skills=rng.sample(SKILLS, rng.randrange(3)),
+                   techs=rng.sample(TECHS, rng.randrange(2)))
+
+    def random_filters():
+        filters = {}
+        if rng.random() < 0.5:
+            filters['experience_level'] = rng.choice(LEVELS)
+        if rng.random() < 0.3:
+            filters['job_type'] = rng.choice(TYPES)
+        if rng.random() < 0.2:
+            filters['is_remote'] = True
+        if rng.random() < 0.3:
+            filters['min_pay'] = rng.randrange(0, 100)
+        if rng.random() < 0.5:
+            filters['skills'] = [name.upper() for name in rng.sample(SKILLS, rng.randrange(1, 3))]
+            filters['skills_match'] = rng.choice(('all', 'any'))
+        if rng.random() < 0.3:
+            filters['tech_stack'] = [rng.choice(TECHS).lower()]
+        return filters
+
+    index = build(jobs, *[random_job(i) for i in range(1, 1501)])
+    compacted, compact = [], index._compact
+
+    def counting_compact():
+        before = len(index._job_ids)
+        compact()
+        if len(index._job_ids) < before:
+            compacted.append(before)
+    index._compact = counting_compact
+    for _ in range(3):
+        changed = rng.sample(sorted(jobs), 700)
+        for job_id in changed:
+            if rng.random() < 0.6:
+                jobs[job_id]['active'] = not jobs[job_id]['active']
+            else:
+                jobs[job_id] = dict(random_job(job_id), active=jobs[job_id]['active'])
+        index.refresh(changed)
+        live = [row for row in jobs.values() if row['active']]
+        for _ in range(40):
+            filters = random_filters()
+            expected = sorted(row['id'] for row in live if matches(row, filters))
+            found = candidates(index, **filters)
+            assert found == expected if found is not None else expected == sorted(row['id'] for row in live)
+    assert compacted
@@ -0,0 +1,99 @@
+import pytest
+from flask import Flask
+from database import db_config, session as db_session
+from database.session import current_session, transaction, transactional
+
+
+@pytest.fixture
+def app(monkeypatch, fake_db):
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+    app = Flask(__name__)
+    db_session.init_app(app)
+    return app
+
+
+def write(sql="UPDATE jobs SET title = 'x'"):
+    conn = db_config.get_db_connection()
+    cur = conn.cursor()
+    cur.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def test_calls_in_one_app_context_share_a_connection(app, fake_db):
+    with app.app_context():
+        first, second = db_config.get_db_connection(), db_config.get_db_connection()
+        assert first._conn is second._conn
+        first.close()
+        assert fake_db.closed == 0
+    assert fake_db.closed == 1
+
+
+def test_commit_outside_a_transaction_is_a_real_commit(app, fake_db):
+    with app.app_context():
+        write()
+        write()
+        assert fake_db.commits == 2
+
+
+def test_nested_transactions_commit_once_at_the_outermost_end(app, fake_db):
+    ran = []
+    with app.app_context():
+        with transaction():
+            write()
+            db_config.get_db_connection().on_commit(lambda: ran.append('outer'))
+            with transaction():
+                write()
+                db_config.get_db_connection().on_commit(lambda: ran.append('inner'))
+            assert fake_db.commits == 0 and ran == []
+        assert fake_db.commits == 1
+        assert ran == ['outer', 'inner']
+        assert current_session().wrote
+
+
+def test_a_failed_inner_block_rolls_back_the_whole_unit(app, fake_db):
+    ran = []
+    with app.app_context():
+        with transaction():
+            write()
+            db_config.get_db_connection().on_commit(lambda: ran.append('committed'))
+            with pytest.raises(ValueError):
+                with transaction():
+                    write()
+                    raise ValueError('inner failure')
+            # The outer block carries on, but can no longer commit
+            write()
+        assert (fake_db.commits, fake_db.rollbacks) == (0, 1)
+        assert ran == [] and not current_session().rollback_only
+
+
+def test_model_rollback_inside_a_transaction_marks_it_rollback_only(app, fake_db):
+    with app.app_context():
+        with transaction():
+            write()
+            db_config.get_db_connection().rollback()
+            write()
+        assert fake_db.commits == 0 and fake_db.rollbacks == 2
+
+
+def test_transactional_without_an_app_context_owns_its_session(monkeypatch, fake_db):
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+
+    @transactional
+    def handler():
+        write()
+        write()
+        return current_session()
+
+    session = handler()
+    assert session.conn is None and current_session() is None
+    assert (fake_db.commits, fake_db.closed) == (1, 1)
+
+
+def test_a_failed_transaction_rolls_back_and_teardown_returns_the_connection(app, fake_db):
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            with transaction():
+                write()
+                raise RuntimeError('handler failed')
+    assert (fake_db.commits, fake_db.rollbacks, fake_db.closed) == (0, 1, 1)
@@ -0,0 +1,123 @@
+import pytest
+from database import suggest
+from database.suggest import MAX_LIMIT, Suggester
+from database.taxonomy import Taxonomy
+
+ROWS = [
+    {'id': 1, 'name': 'Python', 'uses': 40},
+    {'id': 2, 'name': 'PyTorch', 'uses': 12},
+    {'id': 3, 'name': 'Pyro', 'uses': 12},
+    {'id': 4, 'name': 'PHP', 'uses': 30},
+    {'id': 5, 'name': 'Perl', 'uses': 0},
+    {'id': 6, 'name': 'Go', 'uses': 25},
+    {'id': 7, 'name': 'Café Script', 'uses': 1},
+]
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+
+    def fetchall(self):
+        return [dict(row) for row in self.rows]
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def connection(self):
+        return FakeConn(self.rows)
+
+
+@pytest.fixture
+def suggester(monkeypatch):
+    monkeypatch.setattr(suggest, 'get_pool', lambda: FakePool(ROWS))
+    s = Suggester(Taxonomy('skills'), (('job_skills', 'skill_id'), ('freelancer_skills', 'skill_id')))
+    s.load()
+    return s
+
+
+def names(results):
+    return [item['name'] for item in results]
+
+
+def test_prefix_range_is_case_insensitive(suggester):
+    assert names(suggester.suggest('PY')) == ['Python', 'Pyro', 'PyTorch']
+    assert names(suggester.suggest('pyt')) == ['Python', 'PyTorch']
+    assert names(suggester.suggest('pytho')) == ['Python']
+    assert suggester.suggest('pz') == []
+
+
+def test_ranked_by_usage_then_shorter_names(suggester):
+    assert names(suggester.suggest('p')) == ['Python', 'PHP', 'Pyro', 'PyTorch', 'Perl']
+    assert suggester.suggest('p')[0] == {'id': 1, 'name': 'Python', 'uses': 40}
+
+
+def test_accents_are_folded(suggester):
+    assert names(suggester.suggest('cafe')) == ['Café Script']
+
+
+def test_limit_is_clamped(suggester):
+    assert names(suggester.suggest('p', limit=2)) == ['Python', 'PHP']
+    assert len(suggester.suggest('p', limit=1000)) == 5
+    assert suggester.suggest('  ') == []
+    assert suggester.suggest(None) == []
+
+
+def test_short_prefixes_are_cached_until_names_change(suggester):
+    suggester.suggest('p')
+    suggester.suggest('py')
+    suggester.suggest('pyt')
+    assert suggester.stats()['cached_prefixes'] == 2
+    suggester.add([{'id': 8, 'name': 'Pydantic'}])
+    assert suggester.stats()['cached_prefixes'] == 0
+    assert names(suggester.suggest('pyd')) == ['Pydantic']
+    assert 'Pydantic' in names(suggester.suggest('py', limit=MAX_LIMIT))
+
+
+def test_add_before_load_is_ignored():
+    s = Suggester(Taxonomy('skills'), ())
+    s.add([{'id': 1, 'name': 'Python'}])
+    assert s.stats()['names'] == 0
+
+
+def test_add_skips_known_ids(suggester):
+    suggester.add([{'id': 1, 'name': 'Python'}])
+    assert suggester.stats()['names'] == len(ROWS)
+
+
+def test_usage_sql_counts_every_usage_table(suggester):
+    sql = suggester._usage_sql()
+    assert 'FROM job_skills GROUP BY skill_id' in sql
+    assert 'FROM freelancer_skills GROUP BY skill_id' in sql
+    assert 'UNION ALL' in sql
+
+
+def test_taxonomy_listeners_see_remembered_rows():
+    seen = []
+    taxonomy = Taxonomy('skills')
+    taxonomy.subscribe(seen.extend)
+    taxonomy._remember([{'id': 1, 'name': 'Rust'}])
+    assert seen == [{'id': 1, 'name': 'Rust'}]
+    assert taxonomy.name(1) == 'Rust'
@@ -0,0 +1,95 @@
+import pytest
+from database import taxonomy
+from database.taxonomy import Taxonomy, name_key
+
+
+class SkillsTable:
+    """A skills table compared the way utf8mb4_unicode_ci compares names"""
+
+    def __init__(self, *names):
+        self.rows = [{'id': i, 'name': name} for i, name in enumerate(names, 1)]
+        self.refuse = set()
+
+    def __call__(self, sql, params):
+        if sql == "SELECT id, name FROM skills":
+            return list(self.rows)
+        if sql.startswith("SELECT id, name FROM skills WHERE name IN"):
+            keys = {name_key(name) for name in params}
+            return [row for row in self.rows if name_key(row['name']) in keys]
+        if sql.startswith("INSERT INTO skills"):
+            known = {name_key(row['name']) for row in self.rows}
+            for name in params:
+                if name_key(name) not in known | self.refuse:
+                    known.add(name_key(name))
+                    self.rows.append({'id': len(self.rows) + 1, 'name': name})
+        return []
+
+
+@pytest.fixture
+def db(fake_db):
+    fake_db.handler = SkillsTable('Python', 'Café', 'Go')
+    return fake_db
+
+
+def resolve(db, names, create=True, skills=None):
+    skills = skills or Taxonomy('skills')
+    conn = db.connection()
+    return skills, conn, skills.resolve(conn, conn.cursor(), names, create)
+
+
+@pytest.mark.parametrize('a, b', [
+    ('Café', 'cafe'), ('CAFE ', 'café'), ('Straße', 'STRASSE'), ('ﬁle', 'file'), ('Ｐｙｔｈｏｎ', 'python'),
+])
+def test_name_key_folds_like_the_collation(a, b):
+    assert name_key(a) == name_key(b)
+
+
+def test_name_key_keeps_different_names_apart():
+    assert name_key('C#') != name_key('C')
+    assert name_key('Go') != name_key('Goo')
+
+
+def test_known_names_resolve_from_the_cache(db):
+    skills, conn, ids = resolve(db, ['python', ' CAFE', 'Go', 'go'])
+    assert ids == {'python': 1, 'cafe': 2, 'go': 3}
+    assert db.statements == [("SELECT id, name FROM skills", None)]
+    assert skills.name(2) == 'Café'
+
+
+def test_new_names_take_one_insert_and_are_cached_after_commit(db):
+    skills, conn, ids = resolve(db, ['Rust', 'rust', 'Elixir', 'Python'])
+    assert ids == {'rust': 4, 'elixir': 5, 'python': 1}
+    inserts = db.sql('^INSERT')
+    assert len(inserts) == 1 and inserts[0][1] == ['Rust', 'Elixir']
+    assert len(db.statements) == 4
+    assert skills.name(4) is None
+    conn.commit()
+    assert skills.name(4) == 'Rust'
+
+
+def test_rolled_back_names_never_reach_the_cache(db):
+    skills, conn, _ = resolve(db, ['Rust'])
+    conn.rollback()
+    conn.commit()
+    assert skills.name(4) is None
+
+
+def test_names_created_elsewhere_are_found_on_a_miss(db):
+    skills, _, _ = resolve(db, ['Python'])
+    db.handler.rows.append({'id': 9, 'name': 'Zig'})
+    _, _, ids = resolve(db, ['zig'], create=False, skills=skills)
+    assert ids == {'zig': 9} and skills.name(9) == 'Zig'
+    assert not db.sql('^INSERT')
+
+
+def test_unknown_names_are_dropped_without_create_and_raise_with_it(db):
+    assert resolve(db, ['Nope'], create=False)[2] == {}
+    db.handler.refuse.add('nope')
+    with pytest.raises(ValueError, match='Nope'):
+        resolve(db, ['Nope'])
+
+
+def test_lookups_are_chunked(db, monkeypatch):
+    monkeypatch.setattr(taxonomy, 'IN_CHUNK_SIZE', 2)
+    resolve(db, ['a1', 'b2', 'c3', 'Python'], create=False)
+    assert len(db.sql('WHERE name IN')) == 2
@@ -0,0 +1,88 @@
+import pytest
+from database import db_config, reconcile_stats
+from database.models import USER_STATS_COUNTERS, UserStats, profile_completion
+
+PROFILE = {'user_id': 7, 'bio': 'Hi', 'hourly_rate': 40, 'education': '', 'experience': None,
+           'years_of_experience': 3, 'has_skills': 1}
+
+
+def test_add_upserts_only_nonzero_whitelisted_deltas(fake_db):
+    cur = fake_db.connection().cursor()
+    UserStats.add(cur, 7, jobs_total=1, jobs_active=0)
+    (sql, params), = fake_db.statements
+    assert sql.startswith('INSERT INTO user_stats (user_id, jobs_total) SELECT * FROM (SELECT %s AS user_id')
+    assert 'user_stats.jobs_total = user_stats.jobs_total + VALUES(jobs_total)' in sql
+    assert params == [7, 1]
+    UserStats.add(cur, 7, jobs_total=0)
+    assert len(fake_db.statements) == 1
+    with pytest.raises(ValueError, match='views_count'):
+        UserStats.add(cur, 7, views_count=1)
+
+
+def test_add_application_counts_for_the_freelancer_and_the_recruiters_slot(fake_db):
+    cur = fake_db.connection().cursor()
+    UserStats.add_application(cur, 7, 42, applications_total=1, applications_applied=1)
+    freelancer, recruiter = fake_db.statements
+    assert freelancer[0].startswith('INSERT INTO user_stats ') and freelancer[1] == [7, 1, 1]
+    assert recruiter[0].startswith('INSERT INTO user_stats_slots ')
+    assert 'FROM jobs WHERE id = %s' in recruiter[0] and recruiter[1][-3:] == [1, 1, 42]
+    with pytest.raises(ValueError):
+        UserStats.add_application(cur, 7, 42, jobs_total=1)
+
+
+def test_profile_completion():
+    assert profile_completion(PROFILE, True) == 66
+    assert profile_completion(PROFILE, False) == 60
+    assert profile_completion({}, False) == 0
+
+
+def rebuild_db(fake_db):
+    def handler(sql, params):
+        if sql.startswith('SELECT fp.user_id'):
+            return [PROFILE]
+        return []
+    fake_db.handler = handler
+    return fake_db.connection().cursor()
+
+
+def test_rebuild_for_some_users_recomputes_them_and_drops_their_slots(fake_db):
+    UserStats.rebuild(rebuild_db(fake_db), [7, 8])
+    rebuild, profiles, completion, clear = fake_db.statements
+    assert rebuild[0].startswith(f"INSERT INTO user_stats (user_id, {', '.join(USER_STATS_COUNTERS)})")
+    assert 'WHERE u.id IN (%s,%s)' in rebuild[0] and rebuild[1] == [7, 8]
+    assert 'WHERE fp.user_id IN (%s,%s)' in profiles[0] and profiles[1] == [7, 8]
+    assert completion[1] == (7, 66)
+    assert clear == ("DELETE FROM user_stats_slots WHERE user_id IN (%s,%s)", [7, 8])
+
+
+def test_rebuild_for_everyone_empties_the_slot_table(fake_db):
+    UserStats.rebuild(rebuild_db(fake_db))
+    assert 'WHERE u.id IN' not in fake_db.statements[0][0]
+    assert fake_db.statements[-1] == ("DELETE FROM user_stats_slots", None)
+
+
+def test_get_adds_pending_slot_deltas(monkeypatch, fake_db):
+    def handler(sql, params):
+        if sql.startswith('SELECT jobs_total'):
+            return [dict.fromkeys(USER_STATS_COUNTERS + ('profile_completion',), 1)]
+        if 'FROM user_stats_slots' in sql:
+            return [{'row_key': 7, 'applications_total': 2, 'applications_applied': 2,
+                     'applications_reviewed': None, 'applications_shortlisted': None,
+                     'applications_accepted': None, 'applications_rejected': None}]
+        return []
+    fake_db.handler = handler
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake_db)
+    stats = UserStats.get(7)
+    assert (stats['applications_total'], stats['applications_applied'], stats['applications_reviewed']) == (3, 3, 1)
+    fake_db.handler = lambda sql, params: []
+    assert UserStats.get(8) == dict.fromkeys(USER_STATS_COUNTERS + ('profile_completion',), 0)
+
+
+def test_reconcile_commits_each_batch(monkeypatch, fake_db):
+    fake_db.handler = lambda sql, params: [{'id': i} for i in range(1, 6)] if sql.startswith('SELECT id FROM users') else []
+    monkeypatch.setattr(reconcile_stats, 'get_pool', lambda: fake_db)
+    monkeypatch.setattr(reconcile_stats, 'BATCH_SIZE', 2)
+    reconcile_stats.reconcile()
+    batches = [params for sql, params in fake_db.sql('^INSERT INTO user_stats \\(user_id, jobs_total')]
+    assert batches == [[1, 2], [3, 4], [5]]
+    assert fake_db.commits == 3
@@ -0,0 +1,112 @@
+import os
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import copy_current_request_context, current_app, has_app_context, has_request_context
+from database.db_config import POOL_MAX_SIZE
+from database.session import current_session
+
+# Every worker holds a pooled connection while it runs, so the workers must
+# leave connections for request threads: half the pool by default, and never
+# more than all but one connection.
+MAX_WORKERS = max(1, min(int(os.getenv('FANOUT_MAX_WORKERS', POOL_MAX_SIZE // 2)), POOL_MAX_SIZE - 1))
+DEFAULT_TIMEOUT = float(os.getenv('FANOUT_TIMEOUT', 3))
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """The process-wide bounded pool shared by every fan-out"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fanout')
+    return _executor
+
+
+def _in_context(fn):
+    # Each worker gets its own app context, so its own g and its own pooled
+    # connection; the request (and request.user_id) is shared read-only.
+    if has_request_context():
+        return copy_current_request_context(fn)
+    if has_app_context():
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                return fn()
+        return run
+    return fn
+
+
+def _bounded(fn, deadline):
+    # future.cancel() cannot stop a call that has started, so a timed-out
+    # worker would otherwise keep its thread and pooled connection until its
+    # queries finish. The call's session waits for a connection only until
+    # the deadline, and MySQL aborts each of its SELECTs after the time left.
+    def run():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # Queued behind other calls for the whole timeout; nobody waits
+            # for the result any more
+            raise FutureTimeout()
+        session = current_session()
+        if session is not None:
+            session.bound(remaining)
+        return fn()
+    return run
+
+
+def fan_out(calls, timeout=None, defaults=None):
+    """Run independent read-only calls concurrently.
+
+    calls maps a name to a zero-argument callable, or to (callable, timeout)
+    for a per-call timeout in seconds. Returns (results, errors): a call that
+    raises or times out gets defaults[name] (or None) in results and a message
+    in errors, so one slow or failing part never takes the others down.
+    Calls use their own connections and cannot see the request's uncommitted
+    writes.
+
+    A timed-out call is not interrupted: its result is dropped, but the worker
+    runs on until its current statement ends. A call waits for a pooled
+    connection no longer than the time left until its deadline, and each
+    SELECT it makes is capped at that time by MAX_EXECUTION_TIME, so a worker
+    and its connection are tied up for at most about the timeout per
+    statement still to run. Calls still queued at their deadline are not
+    started. Writes and calls made outside an app context are not capped.
+    """
+    defaults = defaults or {}
+    executor = get_executor()
+    started = time.monotonic()
+    futures = {}
+    for name, call in calls.items():
+        fn, call_timeout = call if isinstance(call, tuple) else (call, timeout)
+        deadline = started + (call_timeout if call_timeout is not None else DEFAULT_TIMEOUT)
+        futures[name] = (executor.submit(_in_context(_bounded(fn, deadline))), deadline)
+
+    results, errors = {}, {}
+    for name, (future, deadline) in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            future.cancel()
+            print(f"⏱️ Fan-out call '{name}' timed out")
+            results[name] = defaults.get(name)
+            errors[name] = 'timeout'
+        except Exception as e:
+            print(f"❌ Fan-out call '{name}' failed: {e}")
+            traceback.print_exc()
+            results[name] = defaults.get(name)
+            errors[name] = str(e)
+    return results, errors
+
+
+def shutdown(wait=True):
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
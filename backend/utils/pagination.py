@@ -0,0 +1,95 @@
+import os
+import json
+import base64
+from datetime import date, datetime
+from decimal import Decimal
+from flask import request
+
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 100))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(list):
+    """A page of rows; next_cursor is None on the last page"""
+
+    def __init__(self, rows=(), next_cursor=None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+    @classmethod
+    def from_rows(cls, rows, size, keys, tag=None):
+        """Build a page from a query run with LIMIT size + 1"""
+        rows = list(rows)
+        if len(rows) <= size:
+            return cls(rows)
+        rows = rows[:size]
+        return cls(rows, encode_cursor([rows[-1][k] for k in keys], tag))
+
+
+def page_size(limit=None):
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def page_args():
+    """(limit, cursor) from the query string of the current request"""
+    return request.args.get('limit', type=int), request.args.get('cursor') or None
+
+
+def encode_cursor(values, tag=None):
+    """Opaque cursor for values. A tag names the ordering the values belong
+    to, for orderings whose first key is not comparable across code paths
+    (e.g. relevance scores from different rankers)."""
+    values = [str(v) if isinstance(v, (date, datetime, Decimal)) else v for v in values]
+    if tag is not None:
+        values = [tag] + values
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size, tag=None):
+    """The size values of a cursor from encode_cursor(values, tag)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if tag is not None:
+        if not isinstance(values, list) or not values or values[0] != tag:
+            raise InvalidCursor('Cursor belongs to a different ordering of these results; '
+                                'start again from the first page')
+        values = values[1:]
+    if not isinstance(values, list) or len(values) != size or \
+            not all(isinstance(v, (str, int, float)) for v in values):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def keyset_condition(columns, cursor, tag=None):
+    """WHERE condition for the rows after `cursor` when ordered by columns DESC.
+
+    Each column is a SQL expression, or an (expression, params) pair for
+    expressions with placeholders. Expands (a, b) < (x, y) into
+    a < x OR (a = x AND b < y), which MySQL can resolve as an index range.
+    """
+    values = decode_cursor(cursor, len(columns), tag)
+    sql, params = None, []
+    for column, value in reversed(list(zip(columns, values))):
+        expr, expr_params = column if isinstance(column, tuple) else (column, [])
+        if sql is None:
+            sql = f"{expr} < %s"
+            params = list(expr_params) + [value]
+        else:
+            sql = f"({expr} < %s OR ({expr} = %s AND {sql}))"
+            params = list(expr_params) + [value] + list(expr_params) + [value] + params
+    return sql, params
+
+
+def order_by(columns):
+    return ' ORDER BY ' + ', '.join(f"{c} DESC" for c in columns)
@@ -72,6 +72,11 @@ const api = axios.create({
     headers: { 'Content-Type': 'application/json' },
 });
 
+// Time of our last write, echoed back so reads that follow it are served
+// from the primary database rather than a replica that may lag behind
+const WROTE_AT_HEADER = 'X-DB-Wrote-At';
+let lastWriteAt = null;
+
 // Request interceptor to add token
 api.interceptors.request.use(
     config => {
@@ -79,6 +84,9 @@ api.interceptors.request.use(
         if (token) {
             config.headers.Authorization = `Bearer ${token}`;
         }
+        if (lastWriteAt) {
+            config.headers[WROTE_AT_HEADER] = lastWriteAt;
+        }
         return config;
     },
     error => Promise.reject(error)
@@ -86,7 +94,13 @@ api.interceptors.request.use(
 
 // Response interceptor for token refresh and error handling
 api.interceptors.response.use(
-    response => response,
+    response => {
+        const wroteAt = response.headers[WROTE_AT_HEADER.toLowerCase()];
+        if (wroteAt) {
+            lastWriteAt = wroteAt;
+        }
+        return response;
+    },
     async error => {
         const originalRequest = error.config;
         if (error.response?.status === 401 && !originalRequest._retry) {
@@ -115,4 +129,23 @@ api.interceptors.response.use(
     }
 );
 
+// List endpoints return one page at a time plus a next_cursor; follow the
+// cursors and concatenate the pages under `key` (e.g. 'jobs').
+export async function fetchAllPages(url, key, params = {}) {
+    let data = null;
+    let cursor = null;
+    do {
+        const query = new URLSearchParams(cursor ? { ...params, cursor } : params).toString();
+        const response = await api.get(query ? `${url}?${query}` : url);
+        if (data === null) {
+            data = response.data;
+        } else {
+            data[key] = data[key].concat(response.data[key] || []);
+        }
+        cursor = response.data.success === false ? null : response.data.next_cursor;
+    } while (cursor);
+    data.next_cursor = null;
+    return data;
+}
+
 export default api;
\ No newline at end of file
@@ -88,7 +88,7 @@
 // }
 
 // export default new FreelancerService();
-import api from './api';
+import api, { fetchAllPages } from './api';
 
 class FreelancerService {
     async getDashboard() {
@@ -107,9 +107,7 @@ class FreelancerService {
     }
 
     async searchJobs(filters) {
-        const params = new URLSearchParams(filters).toString();
-        const response = await api.get(`/freelancer/jobs/search?${params}`);
-        return response.data;
+        return fetchAllPages('/freelancer/jobs/search', 'jobs', filters);
     }
 
     async getJobDetails(jobId) {
@@ -128,8 +126,7 @@ class FreelancerService {
     }
 
     async getApplications() {
-        const response = await api.get('/freelancer/applications');
-        return response.data;
+        return fetchAllPages('/freelancer/applications', 'applications');
     }
 }
 
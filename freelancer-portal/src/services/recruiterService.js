@@ -1,4 +1,4 @@
-import api from './api';
+import api, { fetchAllPages } from './api';
 
 class RecruiterService {
     async getDashboard() {
@@ -27,13 +27,11 @@ class RecruiterService {
     }
 
     async getMyJobs() {
-        const response = await api.get('/recruiter/jobs');
-        return response.data;
+        return fetchAllPages('/recruiter/jobs', 'jobs');
     }
 
     async getJobApplications(jobId) {
-        const response = await api.get(`/recruiter/jobs/${jobId}/applications`);
-        return response.data;
+        return fetchAllPages(`/recruiter/jobs/${jobId}/applications`, 'applications');
     }
 
     async updateApplicationStatus(applicationId, statusData) {